@@ -1,14 +1,22 @@
-from typing import Any, List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
+from app.core.pagination import encode_cursor, decode_cursor
 from app.middleware.auth import get_current_admin_user
 from app.models.user import User
-from app.models.test import Test, UserTestResult
+from app.models.test import Test, Question, UserTestResult, QuestionStatistic
 from app.models.course import Course, UserCourse
+from app.crud import analytics as analytics_crud
+from app.crud import test_results as test_results_crud
+from app.crud import test_stats as test_stats_crud
+from app.crud import user_reports as user_reports_crud
+from app.services import data_export, item_statistics
+from app.services.platform_counters import platform_counters
+from app.services.personality_scoring import personality_scorer
 
 router = APIRouter(tags=["admin"])
 
@@ -18,74 +26,82 @@ def get_usage_report(
     current_admin: User = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Generate a usage report
+    Generate a usage report from the platform counters
     """
-    # Count users
-    total_users = db.query(func.count(User.id)).scalar() or 0
-    
-    # Count new users in last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    new_users = db.query(func.count(User.id)).filter(
-        User.registration_date >= thirty_days_ago
-    ).scalar() or 0
-    
-    # Count tests taken
-    total_tests_taken = db.query(func.count(UserTestResult.id)).scalar() or 0
-    
-    # Count courses enrolled
-    total_course_enrollments = db.query(func.count(UserCourse.id)).scalar() or 0
-    
-    # Active users in last 7 days
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    active_users = db.query(func.count(User.id)).filter(
-        User.last_login >= seven_days_ago
-    ).scalar() or 0
+    return platform_counters.get_usage_report(db)
+
+@router.post("/reports/usage/rebuild", response_model=Dict)
+def rebuild_usage_counters(
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Recompute the platform counters from the source tables
+    """
+    totals = platform_counters.rebuild(db)
     
     return {
-        "total_users": total_users,
-        "new_users_last_30_days": new_users,
-        "total_tests_taken": total_tests_taken,
-        "total_course_enrollments": total_course_enrollments,
-        "active_users_last_7_days": active_users,
-        "report_generated_at": datetime.utcnow()
+        "status": "success",
+        "totals": totals
     }
 
 @router.get("/reports/users", response_model=List[Dict])
 def get_users_report(
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Get a list of all users
+    Get a page of users with their test and course counts. Pass the `cursor`
+    of the last received row to get the next page.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    result = []
-    for user in users:
-        # Count tests taken by this user
-        tests_taken = db.query(func.count(UserTestResult.id)).filter(
-            UserTestResult.user_id == user.id
-        ).scalar() or 0
-        
-        # Count courses enrolled by this user
-        courses_enrolled = db.query(func.count(UserCourse.id)).filter(
-            UserCourse.user_id == user.id
-        ).scalar() or 0
-        
-        result.append({
-            "id": str(user.id),
-            "email": user.email,
-            "full_name": user.full_name,
-            "registration_date": user.registration_date,
-            "last_login": user.last_login,
-            "role": user.role,
-            "tests_taken": tests_taken,
-            "courses_enrolled": courses_enrolled
-        })
+    rows = user_reports_crud.get_user_report_page(db, after=after, skip=skip, limit=limit)
+    for row in rows:
+        row["cursor"] = encode_cursor(row["registration_date"], row["id"])
     
-    return result
+    return rows
+
+@router.get("/exports/users")
+def export_users_report(
+    format: str = "csv",
+    cursor: Optional[str] = None,
+    chunk_size: int = data_export.DEFAULT_CHUNK_SIZE,
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Stream the full users report as CSV or NDJSON. Pass the `cursor` of the
+    last received row to resume an export.
+    """
+    if chunk_size < 1 or chunk_size > 50000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="chunk_size must be between 1 and 50000"
+        )
+    
+    try:
+        stream = data_export.stream_user_report(format, cursor=cursor, chunk_size=chunk_size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filename = f"users_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream,
+        media_type=data_export.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/reports/tests", response_model=List[Dict])
 def get_tests_report(
@@ -95,27 +111,241 @@ def get_tests_report(
     """
     Get statistics for all tests
     """
-    tests = db.query(Test).all()
+    return test_stats_crud.get_tests_report(db)
+
+@router.post("/reports/tests/rebuild", response_model=Dict)
+def rebuild_tests_report(
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Rebuild the per-test statistics rollup from all stored results
+    """
+    tests = test_stats_crud.rebuild_test_stats(db)
     
-    result = []
-    for test in tests:
-        # Count how many times this test was taken
-        times_taken = db.query(func.count(UserTestResult.id)).filter(
-            UserTestResult.test_id == test.id
-        ).scalar() or 0
-        
-        # Calculate average score for this test
-        avg_score = db.query(func.avg(UserTestResult.score)).filter(
-            UserTestResult.test_id == test.id
-        ).scalar() or 0.0
-        
-        result.append({
-            "id": str(test.id),
-            "title": test.title,
-            "test_type": test.test_type,
-            "times_taken": times_taken,
-            "avg_score": float(avg_score),
-            "question_count": len(test.questions)
-        })
+    return {
+        "status": "success",
+        "tests_rebuilt": tests
+    }
+
+@router.get("/reports/mood/daily", response_model=Dict)
+def get_mood_daily_report(
+    days: int = 30,
+    use_rollups: bool = False,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Platform-wide daily mood distribution, grouped in the database
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    if use_rollups:
+        rows = analytics_crud.get_rolled_up_mood_distribution(db, since)
+    else:
+        rows = analytics_crud.get_daily_mood_distribution(db, since)
+    
+    return {
+        "days": days,
+        "source": "rollup" if use_rollups else "live",
+        "distribution": [
+            {
+                "day": row["day"],
+                "sentiment_label": row["sentiment_label"],
+                "message_count": row["message_count"],
+                "avg_sentiment": round(row["score_sum"] / row["message_count"], 3) if row["message_count"] else 0.0
+            }
+            for row in rows
+        ],
+        "report_generated_at": datetime.utcnow()
+    }
+
+@router.post("/reports/mood/rollups/refresh", response_model=Dict)
+def refresh_mood_rollups(
+    days: int = 30,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Rebuild the materialized daily mood rollups for the last `days` days
+    """
+    rows_written = analytics_crud.refresh_mood_rollups(
+        db, datetime.utcnow() - timedelta(days=days)
+    )
     
-    return result
+    return {
+        "days": days,
+        "rows_written": rows_written,
+        "refreshed_at": datetime.utcnow()
+    }
+
+@router.get("/reports/mood/activity", response_model=Dict)
+def get_mood_activity_report(
+    days: int = 30,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Platform-wide message activity by weekday and hour
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    return {
+        "days": days,
+        "weekdays": ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar'],
+        "hours": list(range(24)),
+        "activity": analytics_crud.get_activity_matrix(db, since),
+        "report_generated_at": datetime.utcnow()
+    }
+
+@router.get("/reports/mood/at-risk", response_model=Dict)
+def get_at_risk_report(
+    days: int = 14,
+    threshold: float = analytics_crud.AT_RISK_SCORE_THRESHOLD,
+    min_messages: int = 3,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Count users whose average sentiment over the window is at or below the threshold
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    summary = analytics_crud.get_at_risk_summary(db, since, threshold, min_messages)
+    
+    return {
+        "days": days,
+        "threshold": threshold,
+        "min_messages": min_messages,
+        **summary,
+        "report_generated_at": datetime.utcnow()
+    }
+
+@router.get("/exports/chat-messages")
+def export_chat_messages(
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sentiment_analyzed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    chunk_size: int = data_export.DEFAULT_CHUNK_SIZE,
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Stream chat messages with session and user metadata as NDJSON, Parquet or
+    Arrow IPC. Pass the `cursor` of the last received row to resume an export.
+    """
+    if chunk_size < 1 or chunk_size > 50000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="chunk_size must be between 1 and 50000"
+        )
+    
+    try:
+        stream = data_export.stream_chat_messages(
+            format,
+            start=start,
+            end=end,
+            sentiment_analyzed=sentiment_analyzed,
+            cursor=cursor,
+            chunk_size=chunk_size
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filename = f"chat_messages_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream,
+        media_type=data_export.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/reports/tests/{test_id}/questions", response_model=List[Dict])
+def get_test_question_report(
+    test_id: str,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Per-question accuracy for a test, hardest questions first
+    """
+    return test_results_crud.get_question_statistics(db, test_id, limit)
+
+@router.get("/reports/difficulty", response_model=List[Dict])
+def get_difficulty_report(
+    test_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Answer accuracy per question difficulty, across all tests or for one test
+    """
+    return test_results_crud.get_difficulty_statistics(db, test_id)
+
+@router.get("/reports/tests/{test_id}/item-statistics", response_model=List[Dict])
+def get_item_statistics_report(
+    test_id: str,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Stored item statistics (p-value, discrimination, distractor rates) of a test
+    """
+    rows = db.query(QuestionStatistic, Question.question_text, Question.difficulty).join(
+        Question, Question.id == QuestionStatistic.question_id
+    ).filter(
+        QuestionStatistic.test_id == test_id
+    ).order_by(Question.order).all()
+    
+    return [
+        {
+            "question_id": stat.question_id,
+            "question_text": question_text,
+            "difficulty": difficulty,
+            "empirical_difficulty": stat.empirical_difficulty,
+            "sample_size": stat.sample_size,
+            "p_value": stat.p_value,
+            "discrimination": stat.discrimination,
+            "distractor_rates": stat.distractor_rates_json,
+            "computed_at": stat.computed_at
+        }
+        for stat, question_text, difficulty in rows
+    ]
+
+def _recompute_item_statistics(test_id: Optional[str]):
+    db = SessionLocal()
+    try:
+        if test_id:
+            item_statistics.compute_test_statistics(db, test_id)
+        else:
+            item_statistics.compute_all_statistics(db)
+    finally:
+        db.close()
+
+@router.post("/reports/item-statistics/recompute", response_model=Dict)
+def recompute_item_statistics(
+    background_tasks: BackgroundTasks,
+    test_id: Optional[str] = None,
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Recompute item statistics in the background (all knowledge tests by default)
+    """
+    background_tasks.add_task(_recompute_item_statistics, test_id)
+    
+    return {
+        "status": "scheduled",
+        "test_id": test_id
+    }
+
+@router.post("/personality-tests/rescore", response_model=Dict)
+def rescore_personality_tests(
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Rescore every stored personality test with the current question to career mapping
+    """
+    return personality_scorer.rescore_all(db)
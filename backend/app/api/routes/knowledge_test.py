@@ -1,75 +1,169 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
 
 from app.core.database import get_db
-from app.models.test import Test, Question, Answer, UserTestResult, TestType
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.test import Test, Question, Answer, UserTestResult, TestType, TestAttempt, AttemptStatus
 from app.models.user import User
 from app.middleware.auth import get_current_user
-from pydantic import BaseModel
+from app.services.knowledge_test_catalog import knowledge_test_catalog
+from app.services.question_bank import question_bank
+from app.services.grading import knowledge_test_grader, GradingError, GradedSubmission, skill_level_for_score
+from app.crud import test_results as test_results_crud
+from app.crud import test_attempts as test_attempts_crud
+from app.schemas.knowledge_test import (
+    KnowledgeTestResponse,
+    QuestionResponse,
+    TestStartResponse,
+    TestSubmission,
+    AttemptAnswersUpdate,
+    AttemptResponse,
+    TestResultResponse,
+    AttemptHistoryResponse,
+    ScoreTrendResponse
+)
 
 router = APIRouter()
 
-# Pydantic models for request/response
-class KnowledgeTestResponse(BaseModel):
-    id: str
-    title: str
-    description: str
-    duration_minutes: int
-    question_count: int
 
-class QuestionResponse(BaseModel):
-    id: str
-    question_text: str
-    order: int
-    difficulty: str
-    answers: List[Dict[str, Any]]
+def _store_graded_result(
+    db: Session,
+    user_id: str,
+    test_id: str,
+    graded: GradedSubmission,
+    completion_date: datetime,
+    commit: bool = True
+) -> UserTestResult:
+    """Persist a graded submission as a test result with per-answer rows"""
+    result_data = {
+        "score": graded.score,
+        "correct_answers": graded.correct_answers,
+        "total_questions": graded.total_questions,
+        "skill_level": graded.skill_level,
+        "detailed_results": graded.detailed_results
+    }
+    
+    return test_results_crud.create_test_result(
+        db,
+        user_id=user_id,
+        test_id=test_id,
+        score=graded.score,
+        completion_date=completion_date,
+        result_data=result_data,
+        answers=[
+            {
+                "question_id": detail["question_id"],
+                "answer_id": detail["answer_id"],
+                "is_correct": detail["is_correct"],
+                "score": 1.0 if detail["is_correct"] else 0.0
+            }
+            for detail in graded.detailed_results
+        ],
+        question_count=graded.question_count,
+        commit=commit
+    )
 
-class TestStartResponse(BaseModel):
-    test_id: str
-    title: str
-    duration_minutes: int
-    total_questions: int
 
-class AnswerSubmission(BaseModel):
-    question_id: str
-    answer_id: str
+def _result_response(db: Session, result: UserTestResult, test_title: str) -> TestResultResponse:
+    """Build the result response of a stored test result"""
+    # Count answers from user_test_answers; results stored before that table
+    # existed still fall back to the JSON blob
+    counts = test_results_crud.get_result_answer_counts(db, result.id)
+    if counts:
+        total_questions, correct_answers = counts
+        skill_level = skill_level_for_score(result.score or 0)
+    else:
+        result_data = json.loads(result.result_data) if result.result_data else {}
+        total_questions = result_data.get("total_questions", 0)
+        correct_answers = result_data.get("correct_answers", 0)
+        skill_level = result_data.get("skill_level", "Başlangıç")
+    
+    return TestResultResponse(
+        test_id=result.test_id,
+        test_title=test_title,
+        score=result.score or 0,
+        total_questions=total_questions,
+        correct_answers=correct_answers,
+        skill_level=skill_level,
+        completion_date=result.completion_date
+    )
 
-class TestSubmission(BaseModel):
-    test_id: str
-    answers: List[AnswerSubmission]
 
-class TestResultResponse(BaseModel):
-    test_id: str
-    test_title: str
-    score: float
-    total_questions: int
-    correct_answers: int
-    skill_level: str
-    completion_date: datetime
+def _attempt_response(attempt: TestAttempt, total_questions: int, now: datetime) -> AttemptResponse:
+    """Build the state of an attempt as seen by the client"""
+    answers = attempt.answers_json
+    remaining_seconds = None
+    if attempt.expires_at is not None and attempt.status == AttemptStatus.IN_PROGRESS:
+        remaining_seconds = max(0, int((attempt.expires_at - now).total_seconds()))
+    
+    return AttemptResponse(
+        attempt_id=attempt.id,
+        test_id=attempt.test_id,
+        status=attempt.status.value,
+        started_at=attempt.started_at,
+        expires_at=attempt.expires_at,
+        remaining_seconds=remaining_seconds,
+        total_questions=total_questions,
+        answered_questions=len(answers),
+        answers=answers
+    )
 
 @router.get("/", response_model=List[KnowledgeTestResponse])
 async def get_knowledge_tests(db: Session = Depends(get_db)):
     """Get all available knowledge tests"""
     
-    tests = db.query(Test).filter(
-        Test.test_type == TestType.SKILL_ASSESSMENT
-    ).all()
-    
-    result = []
-    for test in tests:
-        question_count = db.query(Question).filter(Question.test_id == test.id).count()
-        result.append(KnowledgeTestResponse(
+    return [
+        KnowledgeTestResponse(
             id=test.id,
             title=test.title,
             description=test.description,
             duration_minutes=test.duration_minutes,
-            question_count=question_count
-        ))
+            question_count=test.question_count
+        )
+        for test in knowledge_test_catalog.list_tests(db)
+    ]
+
+@router.get("/history", response_model=AttemptHistoryResponse)
+async def get_attempt_history(
+    test_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the user's knowledge test attempts, newest first, one page at a time"""
     
-    return result
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    items = test_results_crud.get_attempt_history(
+        db, current_user.id, test_id=test_id, after=after, limit=limit
+    )
+    next_cursor = None
+    if len(items) == limit:
+        next_cursor = encode_cursor(items[-1]["completion_date"], items[-1]["result_id"])
+    
+    return AttemptHistoryResponse(items=items, next_cursor=next_cursor)
+
+@router.get("/history/summary", response_model=ScoreTrendResponse)
+async def get_score_trend(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get best, latest and average score per test and the skill level trend per month"""
+    
+    return ScoreTrendResponse(
+        tests=test_results_crud.get_test_score_summaries(db, current_user.id),
+        skill_levels=test_results_crud.get_skill_level_trend(db, current_user.id)
+    )
 
 @router.post("/{test_id}/start", response_model=TestStartResponse)
 async def start_knowledge_test(
@@ -77,13 +171,10 @@ async def start_knowledge_test(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Start a knowledge test"""
+    """Start a knowledge test, resuming the user's open attempt if it is still running"""
     
-    # Check if test exists
-    test = db.query(Test).filter(
-        Test.id == test_id,
-        Test.test_type == TestType.SKILL_ASSESSMENT
-    ).first()
+    # Check if test exists (served from the cached catalog)
+    test = knowledge_test_catalog.get_test(db, test_id)
     
     if not test:
         raise HTTPException(
@@ -91,14 +182,20 @@ async def start_knowledge_test(
             detail="Knowledge test not found"
         )
     
-    # Get question count
-    question_count = db.query(Question).filter(Question.test_id == test_id).count()
+    now = datetime.utcnow()
+    attempt = test_attempts_crud.get_open_attempt(db, current_user.id, test_id)
+    if attempt is None or not test_attempts_crud.is_accepting_answers(attempt, now):
+        attempt = test_attempts_crud.create_attempt(
+            db, current_user.id, test_id, test.duration_minutes, now
+        )
     
     return TestStartResponse(
         test_id=test.id,
         title=test.title,
         duration_minutes=test.duration_minutes,
-        total_questions=question_count
+        total_questions=test.question_count,
+        attempt_id=attempt.id,
+        expires_at=attempt.expires_at
     )
 
 @router.get("/{test_id}/questions", response_model=List[QuestionResponse])
@@ -110,42 +207,15 @@ async def get_test_questions(
     """Get all questions for a knowledge test"""
     
     # Check if test exists
-    test = db.query(Test).filter(
-        Test.id == test_id,
-        Test.test_type == TestType.SKILL_ASSESSMENT
-    ).first()
-    
-    if not test:
+    if not knowledge_test_catalog.get_test(db, test_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Knowledge test not found"
         )
     
-    # Get questions with answers
-    questions = db.query(Question).filter(
-        Question.test_id == test_id
-    ).order_by(Question.order).all()
-    
-    result = []
-    for question in questions:
-        answers = db.query(Answer).filter(Answer.question_id == question.id).all()
-        
-        question_data = QuestionResponse(
-            id=question.id,
-            question_text=question.question_text,
-            order=question.order,
-            difficulty=question.difficulty or "orta",
-            answers=[
-                {
-                    "id": answer.id,
-                    "text": answer.answer_text
-                }
-                for answer in answers
-            ]
-        )
-        result.append(question_data)
-    
-    return result
+    # Serve the pre-serialized question bank straight from memory
+    entry = question_bank.get(db, test_id)
+    return Response(content=entry.payload, media_type="application/json")
 
 @router.post("/{test_id}/submit", response_model=TestResultResponse)
 async def submit_knowledge_test(
@@ -157,10 +227,7 @@ async def submit_knowledge_test(
     """Submit knowledge test answers and calculate results"""
     
     # Check if test exists
-    test = db.query(Test).filter(
-        Test.id == test_id,
-        Test.test_type == TestType.SKILL_ASSESSMENT
-    ).first()
+    test = knowledge_test_catalog.get_test(db, test_id)
     
     if not test:
         raise HTTPException(
@@ -168,67 +235,31 @@ async def submit_knowledge_test(
             detail="Knowledge test not found"
         )
     
-    # Calculate score
-    total_questions = len(submission.answers)
-    correct_answers = 0
-    detailed_results = []
-    
-    for answer_submission in submission.answers:
-        # Get the submitted answer
-        answer = db.query(Answer).filter(Answer.id == answer_submission.answer_id).first()
-        if answer and answer.is_correct:
-            correct_answers += 1
-        
-        # Store detailed result
-        question = db.query(Question).filter(Question.id == answer_submission.question_id).first()
-        detailed_results.append({
-            "question_id": answer_submission.question_id,
-            "question_text": question.question_text if question else "",
-            "answer_id": answer_submission.answer_id,
-            "answer_text": answer.answer_text if answer else "",
-            "is_correct": answer.is_correct if answer else False,
-            "difficulty": question.difficulty if question else "orta"
-        })
-    
-    # Calculate final score (0-100)
-    score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-    
-    # Determine skill level
-    if score >= 71:
-        skill_level = "İleri"
-    elif score >= 41:
-        skill_level = "Orta"
-    else:
-        skill_level = "Başlangıç"
+    # Grade the whole submission in memory against the cached answer key
+    try:
+        graded = knowledge_test_grader.grade(
+            db,
+            test_id,
+            [(answer.question_id, answer.answer_id) for answer in submission.answers]
+        )
+    except GradingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     # Save result to database
-    result_data = {
-        "score": score,
-        "correct_answers": correct_answers,
-        "total_questions": total_questions,
-        "skill_level": skill_level,
-        "detailed_results": detailed_results
-    }
-    
-    user_result = UserTestResult(
-        user_id=current_user.id,
-        test_id=test_id,
-        completion_date=datetime.now(),
-        score=score,
-        result_data=json.dumps(result_data)
-    )
-    
-    db.add(user_result)
-    db.commit()
+    completion_date = datetime.now()
+    _store_graded_result(db, current_user.id, test_id, graded, completion_date)
     
     return TestResultResponse(
         test_id=test_id,
         test_title=test.title,
-        score=score,
-        total_questions=total_questions,
-        correct_answers=correct_answers,
-        skill_level=skill_level,
-        completion_date=user_result.completion_date
+        score=graded.score,
+        total_questions=graded.total_questions,
+        correct_answers=graded.correct_answers,
+        skill_level=graded.skill_level,
+        completion_date=completion_date
     )
 
 @router.get("/{test_id}/result", response_model=TestResultResponse)
@@ -252,17 +283,123 @@ async def get_test_result(
         )
     
     # Get test info
-    test = db.query(Test).filter(Test.id == test_id).first()
+    test = knowledge_test_catalog.get_test(db, test_id)
+    
+    return _result_response(db, result, test.title if test else "Unknown Test")
+
+@router.get("/attempts/{attempt_id}", response_model=AttemptResponse)
+async def get_attempt(
+    attempt_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the saved state of a test attempt (e.g. to resume after a reconnect)"""
+    
+    attempt = test_attempts_crud.get_user_attempt(db, attempt_id, current_user.id)
+    
+    if not attempt:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test attempt not found"
+        )
+    
+    test = knowledge_test_catalog.get_test(db, attempt.test_id)
+    return _attempt_response(attempt, test.question_count if test else 0, datetime.utcnow())
+
+@router.patch("/attempts/{attempt_id}/answers", response_model=AttemptResponse)
+async def save_attempt_answers(
+    attempt_id: str,
+    update: AttemptAnswersUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Autosave some answers of a running attempt"""
+    
+    attempt = test_attempts_crud.get_user_attempt(db, attempt_id, current_user.id, for_update=True)
     
-    # Parse result data
-    result_data = json.loads(result.result_data) if result.result_data else {}
+    if not attempt:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test attempt not found"
+        )
+    
+    now = datetime.utcnow()
+    if not test_attempts_crud.is_accepting_answers(attempt, now):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Test attempt is no longer accepting answers"
+        )
+    
+    # Validate against the cached answer key so finalizing cannot fail later
+    answer_key = knowledge_test_grader.get_answer_key(db, attempt.test_id)
+    for answer in update.answers:
+        key_question = answer_key.questions.get(answer.question_id)
+        if key_question is None or answer.answer_id not in key_question.answers:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Answer {answer.answer_id} does not belong to question {answer.question_id} of this test"
+            )
+    
+    attempt = test_attempts_crud.save_answers(
+        db, attempt, {answer.question_id: answer.answer_id for answer in update.answers}
+    )
+    
+    return _attempt_response(attempt, answer_key.question_count, now)
+
+@router.post("/attempts/{attempt_id}/submit", response_model=TestResultResponse)
+async def submit_attempt(
+    attempt_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Finalize an attempt by grading its saved answers over every question of the test. Retrying returns the same result."""
+    
+    attempt = test_attempts_crud.get_user_attempt(db, attempt_id, current_user.id, for_update=True)
+    
+    if not attempt:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test attempt not found"
+        )
+    
+    test = knowledge_test_catalog.get_test(db, attempt.test_id)
+    test_title = test.title if test else "Unknown Test"
+    
+    if attempt.status == AttemptStatus.SUBMITTED:
+        result = db.query(UserTestResult).filter(UserTestResult.id == attempt.result_id).first()
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Test attempt was submitted but its result no longer exists"
+            )
+        return _result_response(db, result, test_title)
+    
+    # Answers saved before the deadline are graded even if finalizing comes late;
+    # questions left unanswered count as incorrect
+    try:
+        graded = knowledge_test_grader.grade(
+            db, attempt.test_id, list(attempt.answers_json.items()), count_unanswered=True
+        )
+    except GradingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    completion_date = datetime.now()
+    result = _store_graded_result(
+        db, current_user.id, attempt.test_id, graded, completion_date, commit=False
+    )
+    attempt.status = AttemptStatus.SUBMITTED
+    attempt.result_id = result.id
+    db.commit()
     
     return TestResultResponse(
-        test_id=test_id,
-        test_title=test.title if test else "Unknown Test",
-        score=result.score or 0,
-        total_questions=result_data.get("total_questions", 0),
-        correct_answers=result_data.get("correct_answers", 0),
-        skill_level=result_data.get("skill_level", "Başlangıç"),
-        completion_date=result.completion_date
+        test_id=attempt.test_id,
+        test_title=test_title,
+        score=graded.score,
+        total_questions=graded.total_questions,
+        correct_answers=graded.correct_answers,
+        skill_level=graded.skill_level,
+        completion_date=completion_date
     )
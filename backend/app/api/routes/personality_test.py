@@ -1,15 +1,17 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Dict
 from datetime import datetime
 import json
 import uuid
-import math
 from app.core.database import get_db
 from app.middleware.auth import get_current_active_user
 from app.models.user import User
-from app.models.personality_test import PersonalityTest, PersonalityQuestion
+from app.models.personality_test import PersonalityTest
+from app.crud import personality_tests as personality_tests_crud
+from app.services.personality_questions import personality_question_bank
+from app.services.personality_scoring import personality_scorer
 from app.schemas.personality_test import (
     PersonalityTestStart, PersonalityAnswer,
     PersonalityQuestionsPage, PersonalityTestCreate,
@@ -30,8 +32,8 @@ def start_personality_test(
         PersonalityTest.user_id == current_user.id
     ).first()
     
-    # Get total questions from database
-    total_questions = db.query(PersonalityQuestion).count()
+    # Get total questions from the cached question bank
+    total_questions = personality_question_bank.total_questions(db)
     
     if existing_test:
         # If test exists but no personality_result, user can continue/retake
@@ -47,7 +49,7 @@ def start_personality_test(
         else:
             # User wants to retake the test
             existing_test.retest_date = datetime.utcnow()
-            existing_test.answers = None  # Clear previous answers
+            personality_tests_crud.clear_answers(db, existing_test)  # Clear previous answers
             existing_test.personality_result = None  # Clear previous result
             db.commit()
             
@@ -80,42 +82,28 @@ def start_personality_test(
     )
 
 @router.get("/questions/{page}", response_model=PersonalityQuestionsPage)
-def get_personality_questions(page: int, db: Session = Depends(get_db)):
+def get_personality_questions(
+    page: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get personality test questions for a specific page"""
     
-    # Get questions from database
-    questions_query = db.query(PersonalityQuestion).order_by(PersonalityQuestion.order)
-    all_questions = questions_query.all()
-    
-    if not all_questions:
+    # Pages are pre-serialized in the question bank; clients revalidate with If-None-Match
+    if personality_question_bank.total_questions(db) == 0:
         raise HTTPException(status_code=404, detail="Sorular bulunamadı")
     
-    questions_per_page = 5
-    total_pages = math.ceil(len(all_questions) / questions_per_page)
-    
-    if page < 1 or page > total_pages:
+    entry = personality_question_bank.page(db, page)
+    if entry is None:
         raise HTTPException(status_code=404, detail="Sayfa bulunamadı")
     
-    start_idx = (page - 1) * questions_per_page
-    end_idx = min(start_idx + questions_per_page, len(all_questions))
-    page_questions = all_questions[start_idx:end_idx]
-    
-    questions = []
-    for q in page_questions:
-        questions.append({
-            "id": q.question_id,
-            "text": q.text,
-            "category": q.category,
-            "trait": q.trait,
-            "subcategory": None
-        })
+    headers = {"ETag": entry.etag}
+    if if_none_match and (if_none_match.strip() == "*" or entry.etag in [
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return PersonalityQuestionsPage(
-        questions=questions,
-        current_page=page,
-        total_pages=total_pages,
-        page_title="Kariyer Kişilik Değerlendirmesi"
-    )
+    return Response(content=entry.payload, media_type="application/json", headers=headers)
 
 @router.post("/answers/{test_id}", response_model=PersonalityTestResponseOld)
 def submit_personality_answers(
@@ -134,25 +122,28 @@ def submit_personality_answers(
     if not test:
         raise HTTPException(status_code=404, detail="Test bulunamadı")
     
-    # Get existing answers and add new ones
-    existing_answers = test.answers_json
-    for answer in answers:
-        existing_answers.append({
-            "question_id": answer.question_id,
-            "answer_value": answer.answer_value
-        })
+    # Without stored questions there is nothing to check against; clients still
+    # send the ids of the built-in question set
+    question_ids = personality_question_bank.question_ids(db)
+    unknown = [answer.question_id for answer in answers if answer.question_id not in question_ids]
+    if question_ids and unknown:
+        raise HTTPException(status_code=400, detail=f"Geçersiz soru: {unknown[0]}")
     
-    test.answers_json = existing_answers
+    # One upsert per page; a resubmitted page replaces its earlier answers
+    personality_tests_crud.upsert_answers(db, test, {
+        answer.question_id: answer.answer_value for answer in answers
+    })
     
-    # Get total questions from database
-    total_questions = db.query(PersonalityQuestion).count()
+    # Get total questions from the cached question bank
+    total_questions = personality_question_bank.total_questions(db)
     
-    # If we have all answers, determine career area
-    if len(existing_answers) >= total_questions:
-        career_result = determine_career_area_from_answers(existing_answers)
+    # If every question is answered, determine career area
+    if personality_tests_crud.count_answered(db, test) >= total_questions:
+        career_result = personality_scorer.score(db, personality_tests_crud.get_answers(db, test))
         
         # Store personality result in the simplified field
-        test.personality_result = career_result["career_area"]
+        if career_result:
+            test.personality_result = career_result["career_area"]
     
     db.commit()
     
@@ -189,12 +180,12 @@ async def get_test_results(
             "match_reason": "Kişilik analizi sonucu",
             "skills_needed": ["İlgili alanda deneyim"]
         }]
-    elif test.answers:
+    else:
         # If no stored result but we have answers, calculate it
-        answers = test.answers_json
-        total_questions = db.query(PersonalityQuestion).count()
-        if len(answers) >= total_questions:
-            career_result = determine_career_area_from_answers(answers)
+        answers = personality_tests_crud.get_answers(db, test)
+        total_questions = personality_question_bank.total_questions(db)
+        career_result = personality_scorer.score(db, answers) if answers and len(answers) >= total_questions else None
+        if career_result:
             test.personality_result = career_result["career_area"]
             db.commit()
             
@@ -203,7 +194,7 @@ async def get_test_results(
                 "description": career_result["message"],
                 "match_percentage": career_result["percentage"],
                 "score": career_result["score"],
-                "all_scores": career_scores,
+                "all_scores": career_result["all_scores"],
                 "match_reason": "Kişilik analizi sonucu",
                 "skills_needed": ["İlgili alanda deneyim"],
                 "compatibility_level": career_result["compatibility_level"],
@@ -234,6 +225,8 @@ def get_user_personality_tests(
         PersonalityTest.user_id == current_user.id
     ).all()
     
+    answered = personality_tests_crud.count_answered_by_test(db, [test.id for test in tests])
+    
     test_summaries = []
     for test in tests:
         test_summaries.append({
@@ -242,7 +235,7 @@ def get_user_personality_tests(
             "personality_result": test.personality_result,
             "first_test_date": test.first_test_date,
             "retest_date": test.retest_date,
-            "has_answers": bool(test.answers),
+            "has_answers": bool(test.answers) or answered.get(test.id, 0) > 0,
             "created_at": test.created_at,
             "updated_at": test.updated_at
         })
@@ -281,103 +274,3 @@ def get_current_user_personality_result(
         "test_id": user_test.id,
         "test_date": user_test.retest_date or user_test.first_test_date
     }
-def determine_career_area_from_answers(answers: List[Dict]) -> Dict[str, Any]:
-    """
-    Determine career area based on specific question-career mapping
-    
-    Career areas and their corresponding questions:
-    - UI/UX Designer: Q3, Q6, Q7, Q11, Q15
-    - Backend Developer: Q5, Q10, Q13, Q14  
-    - Data Science: Q1, Q6, Q8, Q14
-    - Project Management: Q2, Q4, Q9, Q12
-    """
-    
-    # Question to career area mapping
-    question_mapping = {
-        "Q1": ["Data Science"],
-        "Q2": ["Project Management"], 
-        "Q3": ["UI/UX Designer"],
-        "Q4": ["Project Management"],
-        "Q5": ["Backend Developer"],
-        "Q6": ["UI/UX Designer", "Data Science"],  # Shared question
-        "Q7": ["UI/UX Designer"],
-        "Q8": ["Data Science"],
-        "Q9": ["Project Management"],
-        "Q10": ["Backend Developer"],
-        "Q11": ["UI/UX Designer"],
-        "Q12": ["Project Management"],
-        "Q13": ["Backend Developer"],
-        "Q14": ["Backend Developer", "Data Science"],  # Shared question
-        "Q15": ["UI/UX Designer"]
-    }
-    
-    # Initialize career scores
-    career_scores = {
-        "UI/UX Designer": 0,
-        "Backend Developer": 0,
-        "Data Science": 0,
-        "Project Management": 0
-    }
-    
-    # Calculate scores based on answers
-    for answer in answers:
-        question_id = answer.get("question_id")
-        answer_value = answer.get("answer_value", 3)  # Default to neutral
-        
-        if question_id in question_mapping:
-            # Add score to each career area this question belongs to
-            for career_area in question_mapping[question_id]:
-                career_scores[career_area] += answer_value
-    
-    # Find the career area with highest score
-    top_career = max(career_scores.items(), key=lambda x: x[1])
-    career_area = top_career[0]
-    total_score = top_career[1]
-    
-    # Calculate normalized score (average per question for this career area)
-    question_count_per_area = {
-        "UI/UX Designer": 5,  # Q3, Q6, Q7, Q11, Q15
-        "Backend Developer": 4,  # Q5, Q10, Q13, Q14
-        "Data Science": 4,  # Q1, Q6, Q8, Q14  
-        "Project Management": 4  # Q2, Q4, Q9, Q12
-    }
-    
-    normalized_score = total_score / question_count_per_area[career_area]
-    
-    # Determine compatibility level based on normalized score
-    if normalized_score >= 4.5:
-        compatibility_level = "Çok Yüksek Uygunluk"
-        compatibility_percentage = 95
-    elif normalized_score >= 4.0:
-        compatibility_level = "Yüksek Uygunluk"
-        compatibility_percentage = 85
-    elif normalized_score >= 3.5:
-        compatibility_level = "Orta-Yüksek Uygunluk"
-        compatibility_percentage = 75
-    elif normalized_score >= 3.0:
-        compatibility_level = "Orta Uygunluk"
-        compatibility_percentage = 60
-    elif normalized_score >= 2.5:
-        compatibility_level = "Orta-Düşük Uygunluk"
-        compatibility_percentage = 45
-    else:
-        compatibility_level = "Düşük Uygunluk"
-        compatibility_percentage = 30
-    
-    # Career-specific personality explanations
-    personality_explanations = {
-        "UI/UX Designer": "Tasarım sevginiz, kullanıcı deneyimine odaklanmanız ve yaratıcı çözümler üretme beceriniz bu alanla uyumunuzu gösteriyor.",
-        "Backend Developer": "Sistemlerin arkasındaki detaylarla çalışma beceriniz, mantıksal düşünce yapınız ve teknik bağlantıları kurma yeteneğiniz bu alanla uyumunuzu gösteriyor.",
-        "Data Science": "Analitik düşünce yapınız, verileri anlama ve yorumlama beceriniz ile karmaşık problemleri çözme yaklaşımınız bu alanla uyumunuzu gösteriyor.",
-        "Project Management": "Yönetim beceriniz, ekip koordinasyonu yapabilmeniz ve planlama yaklaşımınız bu alanla uyumunuzu gösteriyor."
-    }
-    
-    return {
-        "career_area": career_area,
-        "score": total_score,
-        "normalized_score": round(normalized_score, 2),
-        "compatibility_level": compatibility_level,
-        "percentage": compatibility_percentage,
-        "all_scores": career_scores,
-        "message": f"Kişiliğiniz {career_area} alanına uygun. {personality_explanations[career_area]} Uygunluk seviyeniz: {compatibility_level}. Bilgi testi aşamasına geçmek için becerilerim sayfasından {career_area} testlerini çözün."
-    }
@@ -1,13 +1,15 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime
-import json
 
 from app.core.database import get_db
 from app.middleware.auth import get_current_active_user
 from app.models.user import User
-from app.models.test import Test, Question, Answer, UserTestResult
+from app.models.test import Test, UserTestResult
+from app.crud import test_results as test_results_crud
+from app.services.grading import test_scorer, GradingError
+from app.services.test_details import test_detail_cache
 from app.schemas.test import (
     TestResponse, 
     TestDetailResponse, 
@@ -32,19 +34,27 @@ def get_tests(
 @router.get("/{test_id}", response_model=TestDetailResponse)
 def get_test_details(
     test_id: str, 
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Get detailed information about a specific test
     """
-    test = db.query(Test).filter(Test.id == test_id).first()
-    if not test:
+    # Served from the pre-serialized cache; clients revalidate with If-None-Match
+    entry = test_detail_cache.get(db, test_id)
+    if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Test not found"
         )
     
-    return test
+    headers = {"ETag": entry.etag}
+    if if_none_match and (if_none_match.strip() == "*" or entry.etag in [
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=entry.payload, media_type="application/json", headers=headers)
 
 @router.post("/{test_id}/submit", response_model=TestResultResponse)
 def submit_test_answers(
@@ -64,66 +74,47 @@ def submit_test_answers(
             detail="Test not found"
         )
     
-    # Calculate test results
-    total_score = 0
-    result_data = []
-    
-    for answer in submission.user_answers:
-        question = db.query(Question).filter(Question.id == answer.question_id).first()
-        if not question:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Question {answer.question_id} not found"
-            )
-            
-        if question.question_type == "multiple_choice":
-            selected_answer = db.query(Answer).filter(Answer.id == answer.selected_answer_id).first()
-            if not selected_answer:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Answer {answer.selected_answer_id} not found"
+    # Score the whole submission in memory against the cached scoring key
+    try:
+        scored = test_scorer.score(
+            db,
+            test_id,
+            [
+                (
+                    str(answer.question_id),
+                    str(answer.selected_answer_id) if answer.selected_answer_id else None,
+                    answer.text_answer
                 )
-                
-            total_score += selected_answer.score_value
-            result_data.append({
-                "question_id": str(question.id),
-                "selected_answer_id": str(selected_answer.id),
-                "score": selected_answer.score_value
-            })
-        elif question.question_type == "free_text":
-            # For free-text questions, you might implement a simple scoring mechanism
-            # or mark for manual review. Here, we'll just store the answer.
-            result_data.append({
-                "question_id": str(question.id),
-                "text_answer": answer.text_answer,
-                "score": 0  # No automatic scoring for text answers
-            })
-    
-    # Normalize score if needed (e.g., convert to percentage)
-    # This depends on how you want to score tests
-    max_possible_score = db.query(Answer).filter(
-        Answer.question_id.in_([q.id for q in test.questions])
-    ).count()
-    
-    if max_possible_score > 0:
-        normalized_score = (total_score / max_possible_score) * 100
-    else:
-        normalized_score = 0
+                for answer in submission.user_answers
+            ]
+        )
+    except GradingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    # Save test result
-    test_result = UserTestResult(
+    # Save test result together with its per-answer rows
+    completion_date = datetime.utcnow()
+    stored_result = {"answers": scored.result_data}
+    test_result = test_results_crud.create_test_result(
+        db,
         user_id=current_user.id,
         test_id=test_id,
-        completion_date=datetime.utcnow(),
-        score=normalized_score,
-        result_data=result_data
+        score=scored.score,
+        completion_date=completion_date,
+        result_data=stored_result,
+        answers=scored.answer_rows,
+        question_count=scored.question_count
     )
     
-    db.add(test_result)
-    db.commit()
-    db.refresh(test_result)
-    
-    return test_result
+    return TestResultResponse(
+        id=test_result.id,
+        test_id=test_id,
+        completion_date=completion_date,
+        score=scored.score,
+        result_data=stored_result
+    )
 
 @router.get("/{test_id}/result", response_model=TestResultResponse)
 def get_test_result(
@@ -132,17 +123,28 @@ def get_test_result(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
-    Retrieve a user's specific test result
+    Retrieve a user's latest result for a test
     """
     test_result = db.query(UserTestResult).filter(
         UserTestResult.test_id == test_id,
         UserTestResult.user_id == current_user.id
-    ).first()
+    ).order_by(UserTestResult.completion_date.desc()).first()
     
     if not test_result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Test result not found"
         )
+    
+    # result_data is stored as JSON text; older rows may hold a bare list
+    result_data = test_result.result_json
+    if result_data is not None and not isinstance(result_data, dict):
+        result_data = {"answers": result_data}
         
-    return test_result
+    return TestResultResponse(
+        id=test_result.id,
+        test_id=test_result.test_id,
+        completion_date=test_result.completion_date,
+        score=test_result.score or 0,
+        result_data=result_data
+    )
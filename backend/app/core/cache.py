@@ -0,0 +1,126 @@
+"""
+In-process caching helpers.
+
+`InProcessCache` is a small thread-safe key/value cache with an optional TTL
+and a version counter: every full invalidation bumps the version, and values
+loaded under an older version are never stored. `invalidate_on_commit` ties a
+cache to ORM models so it is cleared (or just the affected keys are dropped)
+whenever a committed transaction wrote any instance of them.
+
+Note that these caches live in a single worker process. Writes made through
+ORM sessions in another process (or through bulk `UPDATE`/`DELETE`
+statements, which bypass the unit of work) must call `invalidate()`
+explicitly or rely on the TTL.
+"""
+
+import threading
+import time
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+_PENDING_INVALIDATIONS_KEY = "pending_cache_invalidations"
+
+
+class InProcessCache:
+    """Thread-safe in-process cache with optional TTL and size bound"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """Store `value`; skipped if `version` is given and is no longer current"""
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            if self.max_entries is not None and key not in self._entries:
+                while len(self._entries) >= self.max_entries:
+                    # Dicts keep insertion order, so this drops the oldest entry
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic(), value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, calling `loader` on a miss. Concurrent
+        misses on the same key wait for a single load instead of stampeding.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            version = self.version
+            value = loader()
+            self.set(key, value, version=version)
+        with self._lock:
+            self._load_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or every entry (and bump the version) when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.version += 1
+            else:
+                self._entries.pop(key, None)
+
+
+def invalidate_on_commit(
+    cache: InProcessCache,
+    *models: type,
+    key: Optional[Callable[[Any], Optional[Hashable]]] = None
+) -> None:
+    """
+    Invalidate `cache` after any committed flush that touched an instance of
+    `models`. With `key`, only the entry `key(instance)` is dropped; a key of
+    None falls back to invalidating the whole cache.
+    """
+
+    @event.listens_for(Session, "after_flush")
+    def _track_changes(session, flush_context):
+        pending = session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set())
+        for instance in chain(session.new, session.dirty, session.deleted):
+            if isinstance(instance, models):
+                entry_key = key(instance) if key is not None else None
+                pending.add((cache, entry_key))
+                if entry_key is None:
+                    return
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session):
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, ())
+    fully_invalidated = {cache for cache, key in pending if key is None}
+    for cache, key in pending:
+        if key is None or cache not in fully_invalidated:
+            cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_invalidations(session, previous_transaction):
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
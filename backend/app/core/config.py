@@ -27,7 +27,10 @@ class Settings(BaseSettings):
             self.SQLALCHEMY_DATABASE_URI = self.DATABASE_URL
         else:
             self.SQLALCHEMY_DATABASE_URI = f"sqlite:///{self.SQLITE_DB}"
-    
+
+    # Personality test pagination
+    PERSONALITY_QUESTIONS_PER_PAGE: int = 5
+
     # Google API Configuration (optional for local dev)
     GOOGLE_API_KEY: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
@@ -0,0 +1,22 @@
+"""
+Keyset pagination cursors.
+
+A cursor encodes the (timestamp, id) sort key of the last row a client has
+seen, so the next page is a range scan on an index instead of an OFFSET.
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(timestamp: Optional[datetime], row_id: str) -> str:
+    """Build the resume cursor for the row after (timestamp, id); a NULL timestamp is left empty"""
+    return f"{timestamp.isoformat() if timestamp else ''}|{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """Parse a cursor produced by encode_cursor; raises ValueError if malformed"""
+    timestamp, _, row_id = cursor.partition("|")
+    if not row_id:
+        raise ValueError("Cursor must have the form '<iso timestamp>|<id>'")
+    return (datetime.fromisoformat(timestamp) if timestamp else None), row_id
@@ -0,0 +1,177 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, cast, case, and_, extract, Integer, delete, insert
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+from app.models.chat import ChatSession, ChatMessage, MoodDailyRollup
+
+
+# Scores at or below this average mark a user as at-risk in the cohort report
+AT_RISK_SCORE_THRESHOLD = -0.3
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def day_bucket(db: Session, column):
+    """SQL expression truncating a timestamp to a 'YYYY-MM-DD' string"""
+    if _is_postgres(db):
+        return func.to_char(func.date_trunc("day", column), "YYYY-MM-DD")
+    return func.strftime("%Y-%m-%d", column)
+
+
+def month_bucket(db: Session, column):
+    """SQL expression truncating a timestamp to a 'YYYY-MM' string"""
+    if _is_postgres(db):
+        return func.to_char(func.date_trunc("month", column), "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def hour_bucket(db: Session, column):
+    """SQL expression extracting the hour (0-23) of a timestamp"""
+    if _is_postgres(db):
+        return cast(extract("hour", column), Integer)
+    return cast(func.strftime("%H", column), Integer)
+
+
+def weekday_bucket(db: Session, column):
+    """SQL expression extracting the weekday of a timestamp (0 = Sunday)"""
+    if _is_postgres(db):
+        return cast(extract("dow", column), Integer)
+    return cast(func.strftime("%w", column), Integer)
+
+
+def _analyzed_user_messages(query, since: datetime, until: Optional[datetime] = None):
+    """Restrict a query to sentiment-analyzed user messages in a time window"""
+    query = query.filter(
+        ChatMessage.is_from_user == "true",
+        ChatMessage.sentiment_analyzed == "true",
+        ChatMessage.timestamp >= since
+    )
+    if until is not None:
+        query = query.filter(ChatMessage.timestamp < until)
+    return query
+
+
+def get_daily_mood_distribution(
+    db: Session, since: datetime, until: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Count analyzed messages per day and sentiment label with a single GROUP BY"""
+    day = day_bucket(db, ChatMessage.timestamp).label("day")
+    query = db.query(
+        day,
+        ChatMessage.sentiment_label,
+        func.count(ChatMessage.id).label("message_count"),
+        func.coalesce(func.sum(ChatMessage.sentiment_score), 0.0).label("score_sum")
+    )
+    rows = _analyzed_user_messages(query, since, until).group_by(
+        day, ChatMessage.sentiment_label
+    ).order_by(day).all()
+
+    return [
+        {
+            "day": row.day,
+            "sentiment_label": row.sentiment_label,
+            "message_count": int(row.message_count),
+            "score_sum": float(row.score_sum)
+        }
+        for row in rows
+    ]
+
+
+def get_rolled_up_mood_distribution(db: Session, since: datetime) -> List[Dict[str, Any]]:
+    """
+    Read closed days from the materialized rollup table and aggregate only
+    the current day live
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    rollups = db.query(MoodDailyRollup).filter(
+        MoodDailyRollup.day >= since.strftime("%Y-%m-%d"),
+        MoodDailyRollup.day < today.strftime("%Y-%m-%d")
+    ).order_by(MoodDailyRollup.day).all()
+
+    result = [
+        {
+            "day": rollup.day,
+            "sentiment_label": rollup.sentiment_label,
+            "message_count": rollup.message_count,
+            "score_sum": rollup.score_sum
+        }
+        for rollup in rollups
+    ]
+    result.extend(get_daily_mood_distribution(db, max(since, today)))
+    return result
+
+
+def refresh_mood_rollups(db: Session, since: datetime) -> int:
+    """
+    Recompute the materialized daily rollups from `since` (truncated to the day)
+    up to the start of the current day. Returns the number of rollup rows written.
+    """
+    start = since.replace(hour=0, minute=0, second=0, microsecond=0)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = get_daily_mood_distribution(db, start, today)
+
+    db.execute(delete(MoodDailyRollup).where(
+        MoodDailyRollup.day >= start.strftime("%Y-%m-%d"),
+        MoodDailyRollup.day < today.strftime("%Y-%m-%d")
+    ))
+    if rows:
+        now = datetime.utcnow()
+        db.execute(insert(MoodDailyRollup), [
+            {**row, "sentiment_label": row["sentiment_label"] or "Bilinmiyor", "refreshed_at": now}
+            for row in rows
+        ])
+    db.commit()
+    return len(rows)
+
+
+def get_activity_matrix(db: Session, since: datetime) -> List[List[int]]:
+    """
+    Message counts as a 7x24 matrix (Monday first) built from one
+    weekday/hour GROUP BY
+    """
+    weekday = weekday_bucket(db, ChatMessage.timestamp).label("weekday")
+    hour = hour_bucket(db, ChatMessage.timestamp).label("hour")
+    query = db.query(weekday, hour, func.count(ChatMessage.id).label("message_count"))
+    rows = _analyzed_user_messages(query, since).group_by(weekday, hour).all()
+
+    matrix = [[0 for _ in range(24)] for _ in range(7)]
+    for row in rows:
+        # SQL weekdays start on Sunday (0); the dashboard starts on Monday
+        matrix[(int(row.weekday) - 1) % 7][int(row.hour)] = int(row.message_count)
+    return matrix
+
+
+def get_at_risk_summary(
+    db: Session,
+    since: datetime,
+    threshold: float = AT_RISK_SCORE_THRESHOLD,
+    min_messages: int = 3
+) -> Dict[str, int]:
+    """Count users whose average sentiment in the window is at or below `threshold`"""
+    per_user = _analyzed_user_messages(
+        db.query(
+            ChatSession.user_id.label("user_id"),
+            func.avg(ChatMessage.sentiment_score).label("avg_score"),
+            func.count(ChatMessage.id).label("message_count")
+        ).join(ChatSession, ChatMessage.session_id == ChatSession.id),
+        since
+    ).group_by(ChatSession.user_id).subquery()
+
+    row = db.query(
+        func.count(per_user.c.user_id).label("analyzed_users"),
+        func.coalesce(func.sum(case(
+            (and_(
+                per_user.c.avg_score <= threshold,
+                per_user.c.message_count >= min_messages
+            ), 1),
+            else_=0
+        )), 0).label("at_risk_users")
+    ).one()
+
+    return {
+        "analyzed_users": int(row.analyzed_users or 0),
+        "at_risk_users": int(row.at_risk_users or 0)
+    }
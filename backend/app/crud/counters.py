@@ -0,0 +1,117 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Dict, Any, Tuple, Iterable, List, Optional
+from datetime import datetime
+
+from app.models.counter import PlatformCounter
+from app.models.user import User
+from app.models.test import UserTestResult
+from app.models.course import UserCourse
+from app.crud.analytics import day_bucket
+
+TOTAL_BUCKET = "total"
+
+# Counter names
+REGISTRATIONS = "registrations"
+LOGINS = "logins"
+TEST_COMPLETIONS = "test_completions"
+COURSE_ENROLLMENTS = "course_enrollments"
+
+# Counters that can be recomputed from the rows they count. Logins only leave
+# the last login of each user behind, so their history cannot be rebuilt.
+_REBUILDABLE = {
+    REGISTRATIONS: (User.id, User.registration_date),
+    TEST_COMPLETIONS: (UserTestResult.id, UserTestResult.completion_date),
+    COURSE_ENROLLMENTS: (UserCourse.id, UserCourse.enrollment_date),
+}
+
+
+def day_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d")
+
+
+def increment_counters(connection, increments: Dict[Tuple[str, str], int]) -> None:
+    """
+    Add `increments` ((name, bucket) -> amount) to the counters with one
+    upsert each, on the caller's connection and transaction.
+    """
+    now = datetime.utcnow()
+    dialect = connection.dialect.name
+    for (name, bucket), amount in increments.items():
+        values = {"name": name, "bucket": bucket, "value": amount, "updated_at": now}
+        if dialect in ("postgresql", "sqlite"):
+            upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(PlatformCounter)
+            connection.execute(upsert.values(**values).on_conflict_do_update(
+                index_elements=["name", "bucket"],
+                set_={"value": PlatformCounter.value + amount, "updated_at": now}
+            ))
+            continue
+
+        updated = connection.execute(update(PlatformCounter).where(
+            PlatformCounter.name == name,
+            PlatformCounter.bucket == bucket
+        ).values(value=PlatformCounter.value + amount, updated_at=now))
+        if not updated.rowcount:
+            connection.execute(insert(PlatformCounter).values(**values))
+
+
+def missing_counters(db: Session) -> List[str]:
+    """Rebuildable counters that have no running total yet"""
+    existing = {
+        row.name
+        for row in db.query(PlatformCounter.name).filter(
+            PlatformCounter.bucket == TOTAL_BUCKET,
+            PlatformCounter.name.in_(list(_REBUILDABLE))
+        )
+    }
+    return [name for name in _REBUILDABLE if name not in existing]
+
+
+def get_totals(db: Session) -> Dict[str, int]:
+    """Running total of every counter"""
+    return {
+        row.name: row.value
+        for row in db.query(PlatformCounter.name, PlatformCounter.value).filter(
+            PlatformCounter.bucket == TOTAL_BUCKET
+        )
+    }
+
+
+def get_daily_counts(db: Session, since: datetime) -> Dict[str, Dict[str, int]]:
+    """Daily counts per counter from the day of `since` on"""
+    counts: Dict[str, Dict[str, int]] = {}
+    rows = db.query(PlatformCounter).filter(
+        PlatformCounter.bucket != TOTAL_BUCKET,
+        PlatformCounter.bucket >= day_key(since)
+    ).order_by(PlatformCounter.bucket)
+    for row in rows:
+        counts.setdefault(row.name, {})[row.bucket] = row.value
+    return counts
+
+
+def rebuild_counters(db: Session, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Recompute the rebuildable counters (all of them, or `names`) from their
+    source tables: the periodic aggregator and the initial backfill. Returns
+    the new totals.
+    """
+    totals = {}
+    now = datetime.utcnow()
+    names = list(_REBUILDABLE) if names is None else [name for name in names if name in _REBUILDABLE]
+    for name in names:
+        id_column, date_column = _REBUILDABLE[name]
+        day = day_bucket(db, date_column)
+        rows = db.query(day.label("bucket"), func.count(id_column).label("value")).filter(
+            date_column.isnot(None)
+        ).group_by(day).all()
+        total = db.query(func.count(id_column)).scalar() or 0
+
+        db.execute(delete(PlatformCounter).where(PlatformCounter.name == name))
+        db.execute(insert(PlatformCounter), [
+            {"name": name, "bucket": row.bucket, "value": row.value, "updated_at": now}
+            for row in rows
+        ] + [{"name": name, "bucket": TOTAL_BUCKET, "value": total, "updated_at": now}])
+        totals[name] = total
+    db.commit()
+    return totals
@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import func, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.base import generate_uuid
+from app.models.personality_test import PersonalityTest, PersonalityTestAnswer
+
+
+def upsert_answers(db: Session, test: PersonalityTest, answers: Dict[str, int]) -> None:
+    """
+    Store `answers` (question_id -> answer_value) of a test, replacing earlier
+    answers to the same questions, so resubmitting a page is idempotent. The
+    cost only depends on the size of the page. Answers still kept in the
+    legacy JSON column are moved to rows first. Not committed.
+    """
+    if test.answers:
+        legacy = {answer["question_id"]: answer["answer_value"] for answer in test.answers_json}
+        test.answers = None
+        answers = {**legacy, **answers}
+    if not answers:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": generate_uuid(),
+            "test_id": test.id,
+            "question_id": question_id,
+            "answer_value": value,
+            "created_at": now,
+            "updated_at": now
+        }
+        for question_id, value in answers.items()
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(PersonalityTestAnswer)
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=["test_id", "question_id"],
+            set_={"answer_value": upsert.excluded.answer_value, "updated_at": now}
+        ), rows)
+        return
+
+    for row in rows:
+        updated = db.execute(update(PersonalityTestAnswer).where(
+            PersonalityTestAnswer.test_id == test.id,
+            PersonalityTestAnswer.question_id == row["question_id"]
+        ).values(answer_value=row["answer_value"], updated_at=now))
+        if not updated.rowcount:
+            db.add(PersonalityTestAnswer(**row))
+    db.flush()
+
+
+def count_answered(db: Session, test: PersonalityTest) -> int:
+    """Number of distinct questions answered in a test"""
+    if test.answers:
+        return len({answer["question_id"] for answer in test.answers_json})
+    return db.query(func.count(PersonalityTestAnswer.id)).filter(
+        PersonalityTestAnswer.test_id == test.id
+    ).scalar() or 0
+
+
+def count_answered_by_test(db: Session, test_ids: Iterable[str]) -> Dict[str, int]:
+    """Answered question counts of several tests with one grouped query"""
+    test_ids = list(test_ids)
+    if not test_ids:
+        return {}
+    return dict(db.query(
+        PersonalityTestAnswer.test_id,
+        func.count(PersonalityTestAnswer.id)
+    ).filter(
+        PersonalityTestAnswer.test_id.in_(test_ids)
+    ).group_by(PersonalityTestAnswer.test_id).all())
+
+
+def get_answers(db: Session, test: PersonalityTest) -> List[Dict]:
+    """The answers of a test as question_id / answer_value dicts, one per question"""
+    if test.answers:
+        latest = {answer["question_id"]: answer["answer_value"] for answer in test.answers_json}
+        return [{"question_id": question_id, "answer_value": value} for question_id, value in latest.items()]
+    return [
+        {"question_id": row.question_id, "answer_value": row.answer_value}
+        for row in db.query(PersonalityTestAnswer.question_id, PersonalityTestAnswer.answer_value).filter(
+            PersonalityTestAnswer.test_id == test.id
+        )
+    ]
+
+
+def clear_answers(db: Session, test: PersonalityTest) -> None:
+    """Remove every answer of a test (retake). Not committed."""
+    test.answers = None
+    db.execute(delete(PersonalityTestAnswer).where(PersonalityTestAnswer.test_id == test.id))
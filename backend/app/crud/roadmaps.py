@@ -0,0 +1,298 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, delete, update, select, func, case, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.base import generate_uuid
+from app.models.roadmap import CareerPath, CareerPathStep, UserRoadmap, UserRoadmapStep, RoadmapStep, StepStatus
+from app.services.roadmap_templates import RoadmapTemplate, roadmap_template_registry, roadmap_template_resolver
+
+
+class StepNotFoundError(LookupError):
+    """Raised when a status change references a step outside the roadmap"""
+
+
+@dataclass
+class RoadmapProgress:
+    roadmap_id: str
+    completed_steps: int
+    total_steps: int
+    progress_percentage: float
+    last_updated: datetime
+    # step_id -> (status, completion_date) of the changed steps
+    steps: Dict[str, tuple]
+
+
+def _progress_percentage(completed, total):
+    return case((total > 0, completed * 100.0 / total), else_=0.0)
+
+
+def get_or_create_default_career_path(db: Session) -> CareerPath:
+    """
+    The first career path, or the registry's default path if there is none yet.
+    A new path is only flushed; it commits with the roadmap created for it.
+    """
+    career_path = db.query(CareerPath).first()
+    if career_path:
+        return career_path
+
+    template = roadmap_template_registry.default_template
+    career_path = CareerPath(
+        title=template.career_path_title,
+        description=template.description,
+        avg_salary=90000.0
+    )
+    career_path.skills = list(template.skills)
+    db.add(career_path)
+    db.flush()
+    return career_path
+
+
+def create_user_roadmap(db: Session, user_id: str, career_path: CareerPath) -> UserRoadmap:
+    """
+    Create a roadmap for the career path's template in one transaction: one
+    insert for the roadmap, one bulk insert of its step status rows and one
+    commit, whatever the number of steps. The step text itself is shared
+    through career_path_steps and not copied.
+    """
+    template = roadmap_template_resolver.resolve(db, career_path)
+    now = datetime.utcnow()
+
+    roadmap = UserRoadmap(
+        id=generate_uuid(),
+        user_id=user_id,
+        career_path_id=career_path.id,
+        progress_percentage=0.0,
+        created_date=now,
+        last_updated=now,
+        completed_steps=0,
+        total_steps=len(template.steps)
+    )
+    db.add(roadmap)
+    db.flush()
+    insert_step_statuses(db, roadmap.id, template, now)
+    db.commit()
+    return roadmap
+
+
+def insert_step_statuses(db: Session, roadmap_id: str, template: RoadmapTemplate, now: Optional[datetime] = None) -> int:
+    """Add a not-started status row per template step with a single bulk insert (not committed)"""
+    if not template.steps:
+        return 0
+    now = now or datetime.utcnow()
+    db.execute(insert(UserRoadmapStep), [
+        {
+            "id": generate_uuid(),
+            "roadmap_id": roadmap_id,
+            "step_id": step.id,
+            "status": StepStatus.NOT_STARTED,
+            "created_at": now,
+            "updated_at": now
+        }
+        for step in template.steps
+    ])
+    return len(template.steps)
+
+
+def sync_career_path_steps(db: Session, career_path: CareerPath, template: RoadmapTemplate) -> Dict[str, int]:
+    """
+    Make the stored template steps of a career path match `template`, step by
+    step in order. Changed text is updated in place, so it applies to every
+    roadmap of the path; steps beyond the new template are removed together
+    with their status rows. Not committed.
+    """
+    stored = {
+        step.order: step for step in db.query(CareerPathStep).filter(
+            CareerPathStep.career_path_id == career_path.id
+        )
+    }
+    counts = {"updated": 0, "inserted": 0, "deleted": 0}
+
+    for step in template.steps:
+        existing = stored.pop(step.order, None)
+        values = {
+            "title": step.title,
+            "description": step.description,
+            "tasks_count": step.tasks_count,
+            "duration": step.duration,
+            "template_version": roadmap_template_registry.version
+        }
+        if existing is None:
+            db.add(CareerPathStep(career_path_id=career_path.id, order=step.order, **values))
+            counts["inserted"] += 1
+        elif any(getattr(existing, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(existing, name, value)
+            counts["updated"] += 1
+
+    if stored:
+        removed_ids = [step.id for step in stored.values()]
+        db.execute(delete(UserRoadmapStep).where(UserRoadmapStep.step_id.in_(removed_ids)))
+        for step in stored.values():
+            db.delete(step)
+        counts["deleted"] = len(removed_ids)
+
+    db.flush()
+    if counts["inserted"] or counts["deleted"]:
+        recompute_progress(db, UserRoadmap.career_path_id == career_path.id)
+    return counts
+
+
+def update_step_statuses(db: Session, roadmap: UserRoadmap, changes: Dict[str, StepStatus]) -> RoadmapProgress:
+    """
+    Apply step status changes to a roadmap as part of the caller's
+    transaction. Step completion dates are set or cleared with the status,
+    and the roadmap's counters and progress percentage are moved by the net
+    change in a single UPDATE, so the cost does not depend on the number of
+    steps in the roadmap. Raises StepNotFoundError for unknown steps.
+    """
+    now = datetime.utcnow()
+    rows = _lock_step_rows(db, roadmap, list(changes))
+
+    completed_delta = 0
+    changed_steps = {}
+    for step_id, new_status in changes.items():
+        row = rows[step_id]
+        was_completed = row.status == StepStatus.COMPLETED
+        is_completed = new_status == StepStatus.COMPLETED
+        if row.status != new_status:
+            row.status = new_status
+            row.updated_at = now
+            if is_completed and not was_completed:
+                row.completion_date = now
+            elif was_completed and not is_completed:
+                row.completion_date = None
+        completed_delta += int(is_completed) - int(was_completed)
+        changed_steps[step_id] = (row.status, row.completion_date)
+    db.flush()
+
+    completed = func.coalesce(UserRoadmap.completed_steps, 0) + completed_delta
+    total = func.coalesce(UserRoadmap.total_steps, 0)
+    progress = db.execute(
+        update(UserRoadmap).where(UserRoadmap.id == roadmap.id).values(
+            completed_steps=completed,
+            progress_percentage=_progress_percentage(completed, total),
+            last_updated=now
+        ).returning(
+            UserRoadmap.completed_steps, UserRoadmap.total_steps,
+            UserRoadmap.progress_percentage, UserRoadmap.last_updated
+        ).execution_options(synchronize_session=False)
+    ).one()
+
+    return RoadmapProgress(
+        roadmap_id=roadmap.id,
+        completed_steps=int(progress.completed_steps),
+        total_steps=int(progress.total_steps or 0),
+        progress_percentage=float(progress.progress_percentage or 0.0),
+        last_updated=progress.last_updated,
+        steps=changed_steps
+    )
+
+
+def _lock_step_rows(db: Session, roadmap: UserRoadmap, step_ids: List[str]) -> Dict:
+    """
+    The status rows of the given steps keyed by step id, locked for update.
+    Template steps without a status row yet get a not-started row; roadmaps
+    created before template steps were shared use their own step rows.
+    """
+    if db.query(UserRoadmapStep.id).filter(UserRoadmapStep.roadmap_id == roadmap.id).first() is None \
+            and db.query(RoadmapStep.id).filter(RoadmapStep.roadmap_id == roadmap.id).first() is not None:
+        rows = {
+            row.id: row for row in db.query(RoadmapStep).filter(
+                RoadmapStep.roadmap_id == roadmap.id,
+                RoadmapStep.id.in_(step_ids)
+            ).with_for_update()
+        }
+    else:
+        rows = {
+            row.step_id: row for row in db.query(UserRoadmapStep).filter(
+                UserRoadmapStep.roadmap_id == roadmap.id,
+                UserRoadmapStep.step_id.in_(step_ids)
+            ).with_for_update()
+        }
+        template_step_ids = {step.id for step in roadmap_template_resolver.resolve(db, roadmap.career_path).steps}
+        for step_id in step_ids:
+            if step_id not in rows and step_id in template_step_ids:
+                rows[step_id] = UserRoadmapStep(roadmap_id=roadmap.id, step_id=step_id, status=StepStatus.NOT_STARTED)
+                db.add(rows[step_id])
+
+    missing = [step_id for step_id in step_ids if step_id not in rows]
+    if missing:
+        raise StepNotFoundError(f"Step {missing[0]} is not part of this roadmap")
+
+    for row in rows.values():
+        # Lets cache listeners see the owner without loading the roadmap again
+        set_committed_value(row, "roadmap", roadmap)
+    return rows
+
+
+def merge_duplicate_career_path_steps(db: Session) -> int:
+    """
+    Merge template steps stored twice at the same position of a career path
+    (left by concurrent seeding before positions were unique) into the oldest
+    one, moving the status rows that point at the duplicates. Returns the
+    number of steps removed; not committed.
+    """
+    keepers = db.query(
+        CareerPathStep.career_path_id,
+        CareerPathStep.order,
+        func.min(CareerPathStep.id).label("keep_id")
+    ).group_by(CareerPathStep.career_path_id, CareerPathStep.order).having(func.count(CareerPathStep.id) > 1).all()
+
+    removed = 0
+    for keeper in keepers:
+        duplicate_ids = [
+            row.id for row in db.query(CareerPathStep.id).filter(
+                CareerPathStep.career_path_id == keeper.career_path_id,
+                CareerPathStep.order == keeper.order,
+                CareerPathStep.id != keeper.keep_id
+            )
+        ]
+        # A roadmap with a status on both steps keeps the one on the kept step
+        kept = select(UserRoadmapStep.roadmap_id).where(UserRoadmapStep.step_id == keeper.keep_id)
+        db.execute(delete(UserRoadmapStep).where(
+            UserRoadmapStep.step_id.in_(duplicate_ids),
+            UserRoadmapStep.roadmap_id.in_(kept)
+        ).execution_options(synchronize_session=False))
+        db.execute(update(UserRoadmapStep).where(
+            UserRoadmapStep.step_id.in_(duplicate_ids)
+        ).values(step_id=keeper.keep_id).execution_options(synchronize_session=False))
+        db.execute(delete(CareerPathStep).where(
+            CareerPathStep.id.in_(duplicate_ids)
+        ).execution_options(synchronize_session=False))
+        recompute_progress(db, UserRoadmap.career_path_id == keeper.career_path_id)
+        removed += len(duplicate_ids)
+    return removed
+
+
+def recompute_progress(db: Session, *conditions) -> int:
+    """
+    Recount the step counters and progress of roadmaps matching `conditions`
+    (every roadmap when none) with one set-based UPDATE. Roadmaps with status
+    rows count the template steps of their path; legacy roadmaps count their
+    own step rows. Returns the number of roadmaps updated; not committed.
+    """
+    def count(column, *where):
+        return select(func.count(column)).where(*where).scalar_subquery()
+
+    has_statuses = select(UserRoadmapStep.id).where(UserRoadmapStep.roadmap_id == UserRoadmap.id).exists()
+    total = case(
+        (has_statuses, count(CareerPathStep.id, CareerPathStep.career_path_id == UserRoadmap.career_path_id)),
+        else_=count(RoadmapStep.id, RoadmapStep.roadmap_id == UserRoadmap.id)
+    )
+    completed = (
+        count(UserRoadmapStep.id, UserRoadmapStep.roadmap_id == UserRoadmap.id, UserRoadmapStep.status == StepStatus.COMPLETED)
+        + count(RoadmapStep.id, RoadmapStep.roadmap_id == UserRoadmap.id, RoadmapStep.status == StepStatus.COMPLETED)
+    )
+
+    statement = update(UserRoadmap).values(
+        total_steps=total,
+        completed_steps=completed,
+        progress_percentage=_progress_percentage(completed, total)
+    ).execution_options(synchronize_session=False)
+    if conditions:
+        statement = statement.where(and_(*conditions))
+    return db.execute(statement).rowcount
@@ -0,0 +1,66 @@
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+
+from app.models.test import TestAttempt, AttemptStatus
+
+# Allowance for network latency on the last autosave before the deadline
+ATTEMPT_GRACE_PERIOD = timedelta(seconds=30)
+
+
+def get_open_attempt(db: Session, user_id: str, test_id: str) -> Optional[TestAttempt]:
+    """Get the latest in-progress attempt of a user for a test"""
+    return db.query(TestAttempt).filter(
+        TestAttempt.user_id == user_id,
+        TestAttempt.test_id == test_id,
+        TestAttempt.status == AttemptStatus.IN_PROGRESS
+    ).order_by(TestAttempt.started_at.desc()).first()
+
+
+def get_user_attempt(db: Session, attempt_id: str, user_id: str, for_update: bool = False) -> Optional[TestAttempt]:
+    """Get an attempt owned by the user, optionally locking the row for a read-modify-write"""
+    query = db.query(TestAttempt).filter(
+        TestAttempt.id == attempt_id,
+        TestAttempt.user_id == user_id
+    )
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
+
+
+def create_attempt(
+    db: Session,
+    user_id: str,
+    test_id: str,
+    duration_minutes: Optional[int],
+    now: datetime
+) -> TestAttempt:
+    """Start a new attempt; the deadline is fixed on the server from the test duration"""
+    attempt = TestAttempt(
+        user_id=user_id,
+        test_id=test_id,
+        status=AttemptStatus.IN_PROGRESS,
+        started_at=now,
+        expires_at=now + timedelta(minutes=duration_minutes) if duration_minutes else None
+    )
+    db.add(attempt)
+    db.commit()
+    db.refresh(attempt)
+    return attempt
+
+
+def is_accepting_answers(attempt: TestAttempt, now: datetime) -> bool:
+    """Whether answers may still be saved to the attempt"""
+    if attempt.status != AttemptStatus.IN_PROGRESS:
+        return False
+    return attempt.expires_at is None or now <= attempt.expires_at + ATTEMPT_GRACE_PERIOD
+
+
+def save_answers(db: Session, attempt: TestAttempt, answers: Dict[str, str]) -> TestAttempt:
+    """Merge answers (question_id -> answer_id) into the attempt; later answers replace earlier ones"""
+    stored = attempt.answers_json
+    stored.update(answers)
+    attempt.answers_json = stored
+    db.commit()
+    db.refresh(attempt)
+    return attempt
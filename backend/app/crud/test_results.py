@@ -0,0 +1,254 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, and_, or_
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import json
+
+from app.models.base import generate_uuid
+from app.models.test import Test, Question, UserTestResult, UserTestAnswer, TestType
+from app.crud.analytics import month_bucket
+from app.crud import test_stats as test_stats_crud
+from app.services.grading import skill_level_case, skill_level_for_score
+
+
+def _correct_count():
+    return func.coalesce(func.sum(case((UserTestAnswer.is_correct.is_(True), 1), else_=0)), 0)
+
+
+def create_test_result(
+    db: Session,
+    user_id: str,
+    test_id: str,
+    score: float,
+    completion_date: datetime,
+    result_data: Dict[str, Any],
+    answers: List[Dict[str, Any]],
+    question_count: int,
+    commit: bool = True
+) -> UserTestResult:
+    """
+    Store a test result and its per-answer rows in one transaction, and add
+    it to the test's statistics rollup. The JSON blob in result_data is still
+    written while readers migrate to user_test_answers. With commit=False the
+    caller owns the transaction.
+    """
+    result = UserTestResult(
+        id=generate_uuid(),
+        user_id=user_id,
+        test_id=test_id,
+        completion_date=completion_date,
+        score=score,
+        result_data=json.dumps(result_data)
+    )
+    db.add(result)
+    db.add_all([
+        UserTestAnswer(
+            result_id=result.id,
+            user_id=user_id,
+            test_id=test_id,
+            question_id=answer["question_id"],
+            answer_id=answer.get("answer_id"),
+            text_answer=answer.get("text_answer"),
+            is_correct=answer.get("is_correct"),
+            score=answer.get("score", 0.0)
+        )
+        for answer in answers
+    ])
+    test_stats_crud.record_submission(db, test_id, score, question_count)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return result
+
+
+def get_result_answer_counts(db: Session, result_id: str) -> Optional[Tuple[int, int]]:
+    """(total, correct) answer counts of a result, or None for results without answer rows"""
+    total, correct = db.query(
+        func.count(UserTestAnswer.id),
+        _correct_count()
+    ).filter(UserTestAnswer.result_id == result_id).one()
+
+    if not total:
+        return None
+    return int(total), int(correct)
+
+
+def get_question_statistics(db: Session, test_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Per-question attempt counts and accuracy of a test, hardest questions first"""
+    answered = func.count(UserTestAnswer.id)
+    accuracy = _correct_count() * 1.0 / answered
+
+    query = db.query(
+        UserTestAnswer.question_id,
+        Question.question_text,
+        Question.difficulty,
+        answered.label("times_answered"),
+        _correct_count().label("times_correct"),
+        accuracy.label("accuracy")
+    ).join(
+        Question, Question.id == UserTestAnswer.question_id
+    ).filter(
+        UserTestAnswer.test_id == test_id
+    ).group_by(
+        UserTestAnswer.question_id, Question.question_text, Question.difficulty
+    ).order_by(accuracy, UserTestAnswer.question_id)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [
+        {
+            "question_id": row.question_id,
+            "question_text": row.question_text,
+            "difficulty": row.difficulty.value if row.difficulty else None,
+            "times_answered": int(row.times_answered),
+            "times_correct": int(row.times_correct),
+            "accuracy": round(float(row.accuracy), 4)
+        }
+        for row in query.all()
+    ]
+
+
+def get_difficulty_statistics(db: Session, test_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Answer accuracy grouped by question difficulty, optionally for a single test"""
+    query = db.query(
+        Question.difficulty,
+        func.count(UserTestAnswer.id).label("times_answered"),
+        _correct_count().label("times_correct")
+    ).join(
+        Question, Question.id == UserTestAnswer.question_id
+    )
+    if test_id is not None:
+        query = query.filter(UserTestAnswer.test_id == test_id)
+
+    rows = query.group_by(Question.difficulty).all()
+    return [
+        {
+            "difficulty": row.difficulty.value if row.difficulty else None,
+            "times_answered": int(row.times_answered),
+            "times_correct": int(row.times_correct),
+            "accuracy": round(row.times_correct / row.times_answered, 4) if row.times_answered else 0.0
+        }
+        for row in rows
+    ]
+
+
+def get_attempt_history(
+    db: Session,
+    user_id: str,
+    test_id: Optional[str] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Knowledge test attempts of a user, newest first. `after` is the
+    (completion_date, id) of the last attempt already returned.
+    """
+    query = db.query(
+        UserTestResult.id,
+        UserTestResult.test_id,
+        Test.title,
+        UserTestResult.score,
+        UserTestResult.completion_date
+    ).join(
+        Test, Test.id == UserTestResult.test_id
+    ).filter(
+        UserTestResult.user_id == user_id,
+        Test.test_type == TestType.SKILL_ASSESSMENT
+    )
+    if test_id is not None:
+        query = query.filter(UserTestResult.test_id == test_id)
+    if after is not None:
+        completion_date, result_id = after
+        query = query.filter(or_(
+            UserTestResult.completion_date < completion_date,
+            and_(UserTestResult.completion_date == completion_date, UserTestResult.id < result_id)
+        ))
+
+    rows = query.order_by(
+        UserTestResult.completion_date.desc(), UserTestResult.id.desc()
+    ).limit(limit).all()
+
+    return [
+        {
+            "result_id": row.id,
+            "test_id": row.test_id,
+            "test_title": row.title,
+            "score": row.score or 0.0,
+            "skill_level": skill_level_for_score(row.score or 0.0),
+            "completion_date": row.completion_date
+        }
+        for row in rows
+    ]
+
+
+def get_test_score_summaries(db: Session, user_id: str) -> List[Dict[str, Any]]:
+    """Attempt count and best, latest and average score of a user per knowledge test"""
+    ranked = db.query(
+        UserTestResult.test_id,
+        UserTestResult.score,
+        UserTestResult.completion_date,
+        func.row_number().over(
+            partition_by=UserTestResult.test_id,
+            order_by=(UserTestResult.completion_date.desc(), UserTestResult.id.desc())
+        ).label("recency")
+    ).filter(UserTestResult.user_id == user_id).subquery()
+
+    rows = db.query(
+        ranked.c.test_id,
+        Test.title,
+        func.count().label("attempts"),
+        func.max(ranked.c.score).label("best_score"),
+        func.avg(ranked.c.score).label("average_score"),
+        func.max(case((ranked.c.recency == 1, ranked.c.score))).label("latest_score"),
+        func.max(ranked.c.completion_date).label("last_attempt_date")
+    ).join(
+        Test, Test.id == ranked.c.test_id
+    ).filter(
+        Test.test_type == TestType.SKILL_ASSESSMENT
+    ).group_by(
+        ranked.c.test_id, Test.title
+    ).order_by(func.max(ranked.c.completion_date).desc()).all()
+
+    return [
+        {
+            "test_id": row.test_id,
+            "test_title": row.title,
+            "attempts": int(row.attempts),
+            "best_score": float(row.best_score or 0.0),
+            "latest_score": float(row.latest_score or 0.0),
+            "average_score": round(float(row.average_score or 0.0), 2),
+            "skill_level": skill_level_for_score(row.latest_score or 0.0),
+            "last_attempt_date": row.last_attempt_date
+        }
+        for row in rows
+    ]
+
+
+def get_skill_level_trend(db: Session, user_id: str) -> List[Dict[str, Any]]:
+    """Knowledge test attempts of a user per month and reached skill level"""
+    period = month_bucket(db, UserTestResult.completion_date)
+    skill_level = skill_level_case(UserTestResult.score)
+
+    rows = db.query(
+        period.label("period"),
+        skill_level.label("skill_level"),
+        func.count(UserTestResult.id).label("attempts"),
+        func.avg(UserTestResult.score).label("average_score")
+    ).join(
+        Test, Test.id == UserTestResult.test_id
+    ).filter(
+        UserTestResult.user_id == user_id,
+        Test.test_type == TestType.SKILL_ASSESSMENT
+    ).group_by(period, skill_level).order_by(period, skill_level).all()
+
+    return [
+        {
+            "period": row.period,
+            "skill_level": row.skill_level,
+            "attempts": int(row.attempts),
+            "average_score": round(float(row.average_score or 0.0), 2)
+        }
+        for row in rows
+    ]
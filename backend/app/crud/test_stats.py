@@ -0,0 +1,139 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update, delete, insert, literal, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import math
+
+from app.models.test import Test, Question, UserTestResult, TestStat
+
+
+def _question_count(test_id_column):
+    return select(func.count(Question.id)).where(
+        Question.test_id == test_id_column
+    ).scalar_subquery()
+
+
+def record_submission(db: Session, test_id: str, score: float, question_count: int) -> None:
+    """
+    Add one submission to the test's rollup row as part of the caller's
+    transaction. The increment is a single UPDATE so concurrent submissions
+    do not overwrite each other. A test without a rollup row yet is seeded
+    from all of its stored results, including this one.
+    """
+    score = score or 0.0
+    now = datetime.utcnow()
+    increment = update(TestStat).where(TestStat.test_id == test_id).values(
+        times_taken=TestStat.times_taken + 1,
+        score_sum=TestStat.score_sum + score,
+        score_sq_sum=TestStat.score_sq_sum + score * score,
+        question_count=question_count,
+        updated_at=now
+    ).execution_options(synchronize_session=False)
+    if db.execute(increment).rowcount:
+        return
+
+    db.flush()
+    if not seed_missing_test_stats(db, [test_id]):
+        # A concurrent submission seeded the row first, without this result
+        db.execute(increment)
+
+
+def seed_missing_test_stats(db: Session, test_ids: Optional[List[str]] = None) -> int:
+    """
+    Create the rollup rows missing for `test_ids` (every test when None) from
+    their stored results with one INSERT ... SELECT. Existing rows are left
+    alone. Returns the number of rows created; not committed.
+    """
+    results = select(
+        UserTestResult.test_id,
+        func.count(UserTestResult.id).label("times_taken"),
+        func.coalesce(func.sum(UserTestResult.score), 0.0).label("score_sum"),
+        func.coalesce(func.sum(UserTestResult.score * UserTestResult.score), 0.0).label("score_sq_sum")
+    ).group_by(UserTestResult.test_id)
+    if test_ids is not None:
+        results = results.where(UserTestResult.test_id.in_(test_ids))
+    results = results.subquery()
+
+    missing = select(
+        Test.id,
+        func.coalesce(results.c.times_taken, 0),
+        func.coalesce(results.c.score_sum, 0.0),
+        func.coalesce(results.c.score_sq_sum, 0.0),
+        _question_count(Test.id),
+        literal(datetime.utcnow(), DateTime)
+    ).outerjoin(
+        results, results.c.test_id == Test.id
+    ).where(
+        ~select(TestStat.test_id).where(TestStat.test_id == Test.id).exists()
+    )
+    if test_ids is not None:
+        missing = missing.where(Test.id.in_(test_ids))
+
+    columns = ["test_id", "times_taken", "score_sum", "score_sq_sum", "question_count", "updated_at"]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(TestStat).from_select(
+            columns, missing
+        ).on_conflict_do_nothing(index_elements=["test_id"])
+    else:
+        statement = insert(TestStat).from_select(columns, missing)
+    return db.execute(statement).rowcount
+
+
+def rebuild_test_stats(db: Session) -> int:
+    """Recompute every rollup row from user_test_results. Returns the number of tests."""
+    results = db.query(
+        UserTestResult.test_id,
+        func.count(UserTestResult.id).label("times_taken"),
+        func.coalesce(func.sum(UserTestResult.score), 0.0).label("score_sum"),
+        func.coalesce(func.sum(UserTestResult.score * UserTestResult.score), 0.0).label("score_sq_sum")
+    ).group_by(UserTestResult.test_id).subquery()
+
+    rows = db.query(
+        Test.id.label("test_id"),
+        func.coalesce(results.c.times_taken, 0).label("times_taken"),
+        func.coalesce(results.c.score_sum, 0.0).label("score_sum"),
+        func.coalesce(results.c.score_sq_sum, 0.0).label("score_sq_sum"),
+        _question_count(Test.id).label("question_count")
+    ).outerjoin(results, results.c.test_id == Test.id).all()
+
+    db.execute(delete(TestStat))
+    if rows:
+        now = datetime.utcnow()
+        db.execute(insert(TestStat), [{**row._asdict(), "updated_at": now} for row in rows])
+    db.commit()
+    return len(rows)
+
+
+def get_tests_report(db: Session) -> List[Dict[str, Any]]:
+    """Per-test usage statistics read from the rollup table"""
+    # Rollup rows are seeded at startup and on a test's first submission;
+    # tests created since then fall back to counting their questions
+    rows = db.query(
+        Test.id,
+        Test.title,
+        Test.test_type,
+        func.coalesce(TestStat.times_taken, 0).label("times_taken"),
+        func.coalesce(TestStat.score_sum, 0.0).label("score_sum"),
+        func.coalesce(TestStat.score_sq_sum, 0.0).label("score_sq_sum"),
+        func.coalesce(TestStat.question_count, _question_count(Test.id)).label("question_count")
+    ).outerjoin(TestStat, TestStat.test_id == Test.id).all()
+
+    report = []
+    for row in rows:
+        times_taken = int(row.times_taken)
+        avg_score = row.score_sum / times_taken if times_taken else 0.0
+        # Population variance from the running sums; clamp float rounding noise
+        variance = max(row.score_sq_sum / times_taken - avg_score ** 2, 0.0) if times_taken else 0.0
+        report.append({
+            "id": str(row.id),
+            "title": row.title,
+            "test_type": row.test_type,
+            "times_taken": times_taken,
+            "avg_score": float(avg_score),
+            "score_variance": round(variance, 4),
+            "score_stddev": round(math.sqrt(variance), 4),
+            "question_count": int(row.question_count)
+        })
+    return report
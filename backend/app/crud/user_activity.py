@@ -0,0 +1,56 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from typing import Dict, Any, Optional
+
+from app.models.test import UserTestResult
+from app.models.course import UserCourse
+from app.models.roadmap import CareerPath, UserRoadmap
+
+
+def get_activity_counts(db: Session, user_id: str) -> Dict[str, Any]:
+    """Test and course aggregates of a user, computed in a single query"""
+    def scalar(column, model_user_id):
+        return select(column).where(model_user_id == user_id).scalar_subquery()
+
+    row = db.query(
+        scalar(func.count(UserTestResult.id), UserTestResult.user_id).label("tests_completed"),
+        scalar(func.avg(UserTestResult.score), UserTestResult.user_id).label("avg_test_score"),
+        scalar(func.count(UserCourse.id), UserCourse.user_id).label("courses_enrolled"),
+        scalar(func.count(UserCourse.completion_date), UserCourse.user_id).label("courses_completed")
+    ).one()
+
+    return {
+        "tests_completed": int(row.tests_completed or 0),
+        "avg_test_score": float(row.avg_test_score or 0.0),
+        "courses_enrolled": int(row.courses_enrolled or 0),
+        "courses_completed": int(row.courses_completed or 0)
+    }
+
+
+def get_roadmap_summary(db: Session, user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's roadmap with its career path title and step counters, or None"""
+    row = db.query(
+        UserRoadmap.id,
+        UserRoadmap.career_path_id,
+        CareerPath.title.label("career_path_title"),
+        UserRoadmap.progress_percentage,
+        UserRoadmap.last_updated,
+        UserRoadmap.total_steps,
+        UserRoadmap.completed_steps
+    ).join(
+        CareerPath, CareerPath.id == UserRoadmap.career_path_id
+    ).filter(
+        UserRoadmap.user_id == user_id
+    ).first()
+
+    if row is None:
+        return None
+    return {
+        "id": row.id,
+        "career_path_id": row.career_path_id,
+        "career_path_title": row.career_path_title,
+        "progress_percentage": row.progress_percentage or 0.0,
+        "completed_steps": int(row.completed_steps or 0),
+        "total_steps": int(row.total_steps or 0),
+        "last_updated": row.last_updated
+    }
@@ -0,0 +1,76 @@
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func, select, and_, or_
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+
+from app.models.user import User
+from app.models.test import UserTestResult
+from app.models.course import UserCourse
+
+
+def user_report_query(db: Session, after: Optional[Tuple[Optional[datetime], str]] = None) -> Query:
+    """
+    Every user with their test and course counts, ordered by (registration_date,
+    id) with users without a registration date first. The counts are correlated
+    subqueries, so only the users of the requested page are counted.
+    """
+    tests_taken = select(func.count(UserTestResult.id)).where(
+        UserTestResult.user_id == User.id
+    ).correlate(User).scalar_subquery()
+
+    courses_enrolled = select(func.count(UserCourse.id)).where(
+        UserCourse.user_id == User.id
+    ).correlate(User).scalar_subquery()
+
+    query = db.query(
+        User.id,
+        User.email,
+        User.full_name,
+        User.registration_date,
+        User.last_login,
+        User.role,
+        tests_taken.label("tests_taken"),
+        courses_enrolled.label("courses_enrolled")
+    )
+
+    if after is not None:
+        after_date, after_id = after
+        if after_date is None:
+            query = query.filter(or_(
+                User.registration_date.isnot(None),
+                User.id > after_id
+            ))
+        else:
+            query = query.filter(or_(
+                User.registration_date > after_date,
+                and_(User.registration_date == after_date, User.id > after_id)
+            ))
+
+    return query.order_by(User.registration_date.nulls_first(), User.id)
+
+
+def user_report_row(row) -> Dict[str, Any]:
+    """Plain dict of a user_report_query row"""
+    return {
+        "id": row.id,
+        "email": row.email,
+        "full_name": row.full_name,
+        "registration_date": row.registration_date,
+        "last_login": row.last_login,
+        "role": row.role.value if row.role else None,
+        "tests_taken": int(row.tests_taken),
+        "courses_enrolled": int(row.courses_enrolled)
+    }
+
+
+def get_user_report_page(
+    db: Session,
+    after: Optional[Tuple[Optional[datetime], str]] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """One page of the users report, continuing after the (registration_date, id) key"""
+    query = user_report_query(db, after)
+    if skip:
+        query = query.offset(skip)
+    return [user_report_row(row) for row in query.limit(limit).all()]
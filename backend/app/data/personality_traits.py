@@ -0,0 +1,42 @@
+# Built-in personality questions. The frontend shows these texts and answers
+# them as Q1-Q15; the old scorer used this question_id -> career area mapping
+# (Q6 and Q14 count for two areas). Missing rows are created at startup.
+PERSONALITY_QUESTIONS = [
+    {"question_id": "Q1", "careers": ["Data Science"],
+     "text": "Karmaşık bir durumu anlamak için önce verileri toplar ve analiz ederim."},
+    {"question_id": "Q2", "careers": ["Project Management"],
+     "text": "Bir projenin başarılı olması için ekip içi iletişimin her şeyden önemli olduğuna inanırım."},
+    {"question_id": "Q3", "careers": ["UI/UX Designer"],
+     "text": "Bir şey tasarlarken insanların ne hissedeceğini sık sık düşünürüm."},
+    {"question_id": "Q4", "careers": ["Project Management"],
+     "text": "Detaylı planlar yapmayı ve her adımı kontrol etmeyi severim."},
+    {"question_id": "Q5", "careers": ["Backend Developer"],
+     "text": "Görünmeyen ama sistemin sorunsuz işlemesini sağlayan şeyleri inşa etmek beni tatmin eder."},
+    {"question_id": "Q6", "careers": ["UI/UX Designer", "Data Science"],
+     "text": "Bir sorunu çözmeden önce onu tüm yönleriyle anlamaya çalışırım."},
+    {"question_id": "Q7", "careers": ["UI/UX Designer"],
+     "text": "Yaratıcılığımı kullanabileceğim işler beni daha çok motive eder."},
+    {"question_id": "Q8", "careers": ["Data Science"],
+     "text": "Verilere bakmadan karar vermek bana güvensiz gelir."},
+    {"question_id": "Q9", "careers": ["Project Management"],
+     "text": "İnsanlar arasında denge kurmak ve herkesi aynı hedefe yönlendirmek bana doğal gelir."},
+    {"question_id": "Q10", "careers": ["Backend Developer"],
+     "text": "Bir sistemin arkasındaki yapıyı anlamak beni heyecanlandırır."},
+    {"question_id": "Q11", "careers": ["UI/UX Designer"],
+     "text": "Bir ürün ya da fikir başkalarının hayatını kolaylaştıyorsa daha anlamlı hale gelir."},
+    {"question_id": "Q12", "careers": ["Project Management"],
+     "text": "İyi bir ekip çalışmasının temelinde planlama ve zamanlama vardır."},
+    {"question_id": "Q13", "careers": ["Backend Developer"],
+     "text": "Kendi başıma uzun süre odaklanarak bir şey geliştirmek beni yormaz, aksine enerjimi artırır."},
+    {"question_id": "Q14", "careers": ["Backend Developer", "Data Science"],
+     "text": "Duygular değil; veriler, mantık ve sistemler bana daha anlamlı gelir."},
+    {"question_id": "Q15", "careers": ["UI/UX Designer"],
+     "text": "İnsanların bir şeyi kullanırken ne deneyimlediğini gözlemlemekten keyif alırım."},
+]
+
+# Short trait labels of the old question rows that are not career area names
+# (the old "Data Science" and "Project Management" labels already are)
+LEGACY_TRAIT_LABELS = {
+    "UI/UX": "UI/UX Designer",
+    "Backend": "Backend Developer",
+}
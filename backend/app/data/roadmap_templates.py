@@ -0,0 +1,211 @@
+# Roadmap templates per career path, keyed by career path title.
+# Bump ROADMAP_TEMPLATES_VERSION whenever a template changes.
+ROADMAP_TEMPLATES_VERSION = 1
+
+# Career path created for users who get a roadmap before any path exists
+DEFAULT_CAREER_PATH = "Backend Geliştirme"
+
+roadmap_templates = {
+    "Backend Geliştirme": {
+        "description": "Backend geliştirme kariyeri için yol haritası",
+        "skills": ["Python", "API Geliştirme", "Veritabanı", "Güvenlik"],
+        "steps": [
+            {
+                "title": "Aşama 1 – Backend Geliştirmenin Temelleri",
+                "description": "Öğrenilecekler: Programlama temelleri, veri yapıları, algoritmalar, HTTP protokolü",
+                "tasks_count": 25,
+                "duration": "3 hafta (18-20 saat)"
+            },
+            {
+                "title": "Aşama 2 – Veritabanı Yönetimi",
+                "description": "Öğrenilecekler: SQL, NoSQL, veritabanı tasarımı, ORM kullanımı",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 3 – API Geliştirme",
+                "description": "Öğrenilecekler: RESTful API tasarımı, FastAPI/Django/Flask, endpoint yapılandırması",
+                "tasks_count": 25,
+                "duration": "4 hafta (20-25 saat)"
+            },
+            {
+                "title": "Aşama 4 – Güvenlik ve Performans",
+                "description": "Öğrenilecekler: Kimlik doğrulama, yetkilendirme, güvenlik açıkları, performans optimizasyonu",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 5 – Deployment ve DevOps",
+                "description": "Öğrenilecekler: Docker, CI/CD, bulut hizmetleri, ölçeklendirme",
+                "tasks_count": 25,
+                "duration": "4 hafta (20-25 saat)"
+            },
+            {
+                "title": "Aşama 6 – Mikroservisler ve İleri Konular",
+                "description": "Öğrenilecekler: Mikroservis mimarisi, mesaj kuyrukları, GraphQL, WebSockets",
+                "tasks_count": 20,
+                "duration": "3 hafta (18-20 saat)"
+            },
+            {
+                "title": "Aşama 7 – Gerçek Dünya Projeleri",
+                "description": "Öğrenilecekler: Büyük ölçekli projeler, takım çalışması, kod kalitesi, test yazımı",
+                "tasks_count": 15,
+                "duration": "2 hafta (10-12 saat)"
+            }
+        ]
+    },
+    "Proje Yönetimi": {
+        "description": "Proje Yönetimi kariyeri için yol haritası",
+        "skills": ["Agile", "Scrum", "Takım Yönetimi", "Risk Yönetimi"],
+        "steps": [
+            {
+                "title": "Aşama 1 – Proje Yönetiminin Temelleri",
+                "description": "Öğrenilecekler: Proje nedir, proje yöneticisinin rolü, proje yaşam döngüsü, paydaşlarla iletişim",
+                "tasks_count": 25,
+                "duration": "3 hafta (yaklaşık 18 saat)"
+            },
+            {
+                "title": "Aşama 2 – Proje Başlatma",
+                "description": "Öğrenilecekler: Proje hedefi yazma, kapsam belgesi, proje belgeleri oluşturma",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 3 – Proje Planlama",
+                "description": "Öğrenilecekler: Zaman çizelgesi hazırlama, bütçe planı, risk yönetimi, iletişim planı",
+                "tasks_count": 25,
+                "duration": "4 hafta (20-25 saat)"
+            },
+            {
+                "title": "Aşama 4 – Projeyi Yürütme",
+                "description": "Öğrenilecekler: Takip etme, ilerleme raporları, kalite yönetimi",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 5 – Çevik (Agile) Proje Yönetimi",
+                "description": "Öğrenilecekler: Agile yaklaşımı, Scrum, sprint planlama",
+                "tasks_count": 25,
+                "duration": "4 hafta (20 saat)"
+            },
+            {
+                "title": "Aşama 6 – Bitirme Projesi (Capstone)",
+                "description": "Öğrenilecekler: Gerçek senaryoya dayalı proje planı hazırlama",
+                "tasks_count": 15,
+                "duration": "2 hafta (10-12 saat)"
+            }
+        ]
+    },
+    "Veri Analizi": {
+        "description": "Veri Analizi kariyeri için yol haritası",
+        "skills": ["Python", "İstatistik", "Veri Görselleştirme", "Makine Öğrenmesi"],
+        "steps": [
+            {
+                "title": "Aşama 1 – Veri Bilimine Giriş",
+                "description": "Öğrenilecekler: Veri toplama, temizleme, temel analiz süreci",
+                "tasks_count": 25,
+                "duration": "3 hafta (18-20 saat)"
+            },
+            {
+                "title": "Aşama 2 – Python'a Başlangıç",
+                "description": "Öğrenilecekler: Python temelleri, veri yapıları, fonksiyonlar, pandas",
+                "tasks_count": 30,
+                "duration": "4 hafta (25 saat)"
+            },
+            {
+                "title": "Aşama 3 – Sayıların Ötesine Geçmek",
+                "description": "Öğrenilecekler: Veriyi hikâyeye dönüştürme, iş kararları için yorumlama",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 4 – İstatistiğin Gücü",
+                "description": "Öğrenilecekler: Temel istatistik, olasılık, hipotez testleri",
+                "tasks_count": 25,
+                "duration": "4 hafta (20-25 saat)"
+            },
+            {
+                "title": "Aşama 5 – Regresyon Analizi",
+                "description": "Öğrenilecekler: Doğrusal regresyon, çoklu regresyon, modellerin yorumlanması",
+                "tasks_count": 20,
+                "duration": "3 hafta (18-20 saat)"
+            },
+            {
+                "title": "Aşama 6 – Makine Öğrenmesine Giriş",
+                "description": "Öğrenilecekler: Temel algoritmalar, model kurma ve doğrulama",
+                "tasks_count": 25,
+                "duration": "4 hafta (22-25 saat)"
+            },
+            {
+                "title": "Aşama 7 – Bitirme Projesi",
+                "description": "Öğrenilecekler: Gerçek veri ile sıfırdan analiz projesi",
+                "tasks_count": 15,
+                "duration": "2 hafta (10-12 saat)"
+            }
+        ]
+    },
+    "UX Tasarımı": {
+        "description": "UX Tasarımı kariyeri için yol haritası",
+        "skills": ["UI/UX", "Figma", "Kullanıcı Araştırması", "Prototipleme"],
+        "steps": [
+            {
+                "title": "Aşama 1 – UX Tasarımına Giriş",
+                "description": "Öğrenilecekler: UX nedir, kullanıcı odaklı tasarım",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 2 – UX Tasarım Sürecine Başlamak",
+                "description": "Öğrenilecekler: Empati haritaları, kullanıcı hikâyeleri, problem tanımı",
+                "tasks_count": 25,
+                "duration": "3 hafta (18-20 saat)"
+            },
+            {
+                "title": "Aşama 3 – Wireframe ve Düşük Detaylı Prototip",
+                "description": "Öğrenilecekler: Basit çizimler, temel prototipler",
+                "tasks_count": 20,
+                "duration": "3 hafta (15-18 saat)"
+            },
+            {
+                "title": "Aşama 4 – Araştırma ve Test",
+                "description": "Öğrenilecekler: Kullanıcı araştırması, test yapmak, geri bildirim",
+                "tasks_count": 25,
+                "duration": "4 hafta (20-22 saat)"
+            },
+            {
+                "title": "Aşama 5 – Figma ile Yüksek Detaylı Tasarım",
+                "description": "Öğrenilecekler: Renk, tipografi, responsive tasarım",
+                "tasks_count": 25,
+                "duration": "4 hafta (20-25 saat)"
+            },
+            {
+                "title": "Aşama 6 – Dinamik Arayüz Oluşturma",
+                "description": "Öğrenilecekler: Basit HTML/CSS/JS, etkileşimli prototipler",
+                "tasks_count": 20,
+                "duration": "3 hafta (18-20 saat)"
+            },
+            {
+                "title": "Aşama 7 – Bitirme Projesi",
+                "description": "Öğrenilecekler: Sosyal fayda odaklı bir ürün tasarlama",
+                "tasks_count": 15,
+                "duration": "2 hafta (10-12 saat)"
+            }
+        ]
+    }
+}
+
+# Steps of career paths without a template of their own
+default_roadmap_steps = [
+    {
+        "title": "Aşama 1 – Temel Bilgiler",
+        "description": "Bu alandaki temel kavramları öğrenin"
+    },
+    {
+        "title": "Aşama 2 – Orta Seviye",
+        "description": "Becerilerinizi geliştirin"
+    },
+    {
+        "title": "Aşama 3 – İleri Seviye",
+        "description": "Uzmanlaşın"
+    }
+]
@@ -2,27 +2,42 @@
 from .base import BaseModel
 from .user import User
 from .weekly_plan import WeeklyTask
+from .study_plan import UserTask
 from .course import Course, UserCourse
-from .roadmap import CareerPath, UserRoadmap, RoadmapStep
-from .test import Test, Question, Answer, UserTestResult
-from .personality_test import PersonalityTest, PersonalityQuestion
-from .chat import ChatSession, ChatMessage
+from .roadmap import CareerPath, UserRoadmap, RoadmapStep, CareerPathStep, UserRoadmapStep
+from .test import Test, Question, Answer, UserTestResult, UserTestAnswer, QuestionStatistic, TestAttempt, TestStat
+from .personality_test import PersonalityTest, PersonalityQuestion, PersonalityTestAnswer
+from .chat import ChatSession, ChatMessage, MoodDailyRollup
+from .counter import PlatformCounter
+from .achievement import UserAchievement
 
 
 __all__ = [
     "BaseModel",
     "User", 
+    "WeeklyTask",
+    "UserTask",
     "Course", 
     "UserCourse",
     "CareerPath", 
     "UserRoadmap", 
     "RoadmapStep",
+    "CareerPathStep",
+    "UserRoadmapStep",
     "Test", 
     "Question", 
     "Answer", 
     "UserTestResult",
+    "UserTestAnswer",
+    "QuestionStatistic",
+    "TestAttempt",
+    "TestStat",
     "PersonalityTest",
     "PersonalityQuestion",
+    "PersonalityTestAnswer",
     "ChatSession",
-    "ChatMessage"
+    "ChatMessage",
+    "MoodDailyRollup",
+    "PlatformCounter",
+    "UserAchievement"
 ]
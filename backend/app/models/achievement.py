@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+from app.models.base import BaseModel
+
+
+class UserAchievement(Base, BaseModel):
+    """An achievement a user has earned; the rule itself lives in the achievements registry"""
+    __tablename__ = "user_achievements"
+    __table_args__ = (
+        # Also serves the per-user lookup
+        UniqueConstraint("user_id", "achievement_key", name="uq_user_achievements_user_key"),
+    )
+
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    achievement_key = Column(String(50), nullable=False)
+    date_earned = Column(DateTime, nullable=False)
+
+    # Relationships
+    user = relationship("User")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Float
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Float, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -10,7 +10,7 @@ class ChatSession(Base, BaseModel):
     """Chat session model for NeetUp Spark conversations"""
     __tablename__ = "chat_sessions"
 
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
     title = Column(String(255), default="NeetUp Spark Conversation")
     is_active = Column(String(10), default="true")  # Using string for consistency
     
@@ -22,6 +22,11 @@ class ChatSession(Base, BaseModel):
 class ChatMessage(Base, BaseModel):
     """Chat message model for storing conversation history with sentiment analysis"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Platform-wide mood reports filter analyzed user messages by time range
+        Index("ix_chat_messages_analyzed_timestamp", "is_from_user", "sentiment_analyzed", "timestamp"),
+        Index("ix_chat_messages_session_timestamp", "session_id", "timestamp"),
+    )
 
     session_id = Column(String(36), ForeignKey("chat_sessions.id"), nullable=False)
     content = Column(Text, nullable=False)
@@ -35,3 +40,14 @@ class ChatMessage(Base, BaseModel):
     
     # Relationships
     session = relationship("ChatSession", back_populates="messages")
+
+
+class MoodDailyRollup(Base):
+    """Materialized per-day sentiment counts used by the admin mood reports"""
+    __tablename__ = "mood_daily_rollups"
+
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD
+    sentiment_label = Column(String(50), primary_key=True)
+    message_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class PlatformCounter(Base):
+    """Running total (bucket 'total') or daily count (bucket 'YYYY-MM-DD') of a platform event"""
+    __tablename__ = "platform_counters"
+
+    name = Column(String(50), primary_key=True)
+    bucket = Column(String(10), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Enum, DateTime, Float
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Enum, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 import enum, json
 from datetime import datetime
@@ -47,6 +47,10 @@ class Course(Base, BaseModel):
 class UserCourse(Base, BaseModel):
     """Junction table for users and courses they're enrolled in"""
     __tablename__ = "user_courses"
+    __table_args__ = (
+        # Per-user enrollment counts of the users report
+        Index("ix_user_courses_user_id", "user_id"),
+    )
 
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     course_id = Column(String(36), ForeignKey("courses.id"), nullable=False)
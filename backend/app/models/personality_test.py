@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -16,7 +16,7 @@ class PersonalityTest(Base, BaseModel):
     full_name = Column(String, nullable=False)  # Store user's full name directly
     
     # Test data
-    answers = Column(Text, nullable=True)  # JSON array of personality question answers
+    answers = Column(Text, nullable=True)  # Legacy JSON array of answers; new answers are PersonalityTestAnswer rows
     personality_result = Column(String, nullable=True)  # Career area result (UI/UX, Backend, Data Science, Project Management)
     
     # Timing fields
@@ -25,6 +25,7 @@ class PersonalityTest(Base, BaseModel):
     
     # Relationships
     user = relationship("User", back_populates="personality_tests")
+    question_answers = relationship("PersonalityTestAnswer", back_populates="test", cascade="all, delete-orphan")
     
     # JSON property helpers for answers
     @property
@@ -48,6 +49,23 @@ class PersonalityQuestion(Base, BaseModel):
     question_id = Column(String, unique=True, nullable=False)  # Q1, Q2, etc.
     text = Column(Text, nullable=False)
     category = Column(String, default="personality", nullable=False)
-    trait = Column(String, nullable=False)  # UI/UX, Backend, Data Science, Project Management
+    trait = Column(String, nullable=False)  # Career area(s) scored, comma separated: UI/UX Designer, Backend Developer, Data Science, Project Management
     order = Column(Integer, nullable=False)
     is_reverse_scored = Column(Boolean, default=False)
+
+
+class PersonalityTestAnswer(Base, BaseModel):
+    """A user's answer to one personality question, at most one per question and test"""
+    __tablename__ = "personality_answers"
+
+    test_id = Column(String(36), ForeignKey("personality_tests.id"), nullable=False)
+    question_id = Column(String, nullable=False)  # PersonalityQuestion.question_id (Q1, Q2, etc.)
+    answer_value = Column(Integer, nullable=False)
+
+    # Relationships
+    test = relationship("PersonalityTest", back_populates="question_answers")
+
+    __table_args__ = (
+        # Answer upserts target this key; completion counts the answers of a test
+        UniqueConstraint("test_id", "question_id", name="uq_personality_answers_test_question"),
+    )
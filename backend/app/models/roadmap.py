@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Enum, DateTime, Float
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Enum, DateTime, Float, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum, json
 from datetime import datetime
@@ -39,6 +39,7 @@ class CareerPath(Base, BaseModel):
 
     # Relationships
     user_roadmaps = relationship("UserRoadmap", back_populates="career_path")
+    template_steps = relationship("CareerPathStep", back_populates="career_path", cascade="all, delete-orphan")
 
 
 class UserRoadmap(Base, BaseModel):
@@ -50,15 +51,27 @@ class UserRoadmap(Base, BaseModel):
     created_date = Column(DateTime, default=datetime.utcnow)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     progress_percentage = Column(Float, default=0.0)
+    # Step counters kept up to date with every status change, so progress reads are O(1)
+    completed_steps = Column(Integer, default=0)
+    total_steps = Column(Integer, default=0)
 
     # Relationships
     user = relationship("User", back_populates="roadmap")
     career_path = relationship("CareerPath", back_populates="user_roadmaps")
-    steps = relationship("RoadmapStep", back_populates="roadmap", cascade="all, delete-orphan")
+    steps = relationship("RoadmapStep", back_populates="roadmap", cascade="all, delete-orphan", order_by="RoadmapStep.order")
+    step_statuses = relationship("UserRoadmapStep", back_populates="roadmap", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Example (template) roadmap lookup per career path
+        Index("ix_user_roadmaps_career_path_user", "career_path_id", "user_id"),
+    )
 
 
 class RoadmapStep(Base, BaseModel):
-    """Individual steps in a user's roadmap"""
+    """
+    Individual steps in a user's roadmap (legacy layout with a copy of the
+    step text per roadmap; new roadmaps use UserRoadmapStep)
+    """
     __tablename__ = "roadmap_steps"
 
     roadmap_id = Column(String(36), ForeignKey("user_roadmaps.id"), nullable=False)
@@ -70,3 +83,43 @@ class RoadmapStep(Base, BaseModel):
 
     # Relationships
     roadmap = relationship("UserRoadmap", back_populates="steps")
+
+
+class CareerPathStep(Base, BaseModel):
+    """Template step of a career path, shared by every roadmap of that path"""
+    __tablename__ = "career_path_steps"
+
+    career_path_id = Column(String(36), ForeignKey("career_paths.id"), nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(Text)
+    order = Column(Integer, nullable=False)
+    tasks_count = Column(Integer)
+    duration = Column(String)
+    template_version = Column(Integer, nullable=False, default=1)  # Registry version the step was written from
+
+    # Relationships
+    career_path = relationship("CareerPath", back_populates="template_steps")
+
+    __table_args__ = (
+        # One step per position, so concurrent seeding cannot duplicate steps;
+        # also serves the ordered per-path lookup
+        UniqueConstraint("career_path_id", "order", name="uq_career_path_steps_path_order"),
+    )
+
+
+class UserRoadmapStep(Base, BaseModel):
+    """A user's status on one template step of their roadmap"""
+    __tablename__ = "user_roadmap_steps"
+
+    roadmap_id = Column(String(36), ForeignKey("user_roadmaps.id"), nullable=False)
+    step_id = Column(String(36), ForeignKey("career_path_steps.id"), nullable=False)
+    status = Column(Enum(StepStatus), default=StepStatus.NOT_STARTED, nullable=False)
+    completion_date = Column(DateTime)
+
+    # Relationships
+    roadmap = relationship("UserRoadmap", back_populates="step_statuses")
+    step = relationship("CareerPathStep")
+
+    __table_args__ = (
+        UniqueConstraint("roadmap_id", "step_id", name="uq_user_roadmap_steps_roadmap_step"),
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Enum, DateTime, Float, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Enum, DateTime, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 import enum, json
+from datetime import datetime
 
 from app.core.database import Base
 from app.models.base import BaseModel
@@ -24,6 +25,11 @@ class DifficultyLevel(str, enum.Enum):
     ZOR = "zor"
 
 
+class AttemptStatus(str, enum.Enum):
+    IN_PROGRESS = "in_progress"
+    SUBMITTED = "submitted"
+
+
 class Test(Base, BaseModel):
     """Test model for various assessments"""
     __tablename__ = "tests"
@@ -69,6 +75,10 @@ class Answer(Base, BaseModel):
 class UserTestResult(Base, BaseModel):
     """Results of user-taken tests"""
     __tablename__ = "user_test_results"
+    __table_args__ = (
+        # Attempt history and per-test score summaries of a user
+        Index("ix_user_test_results_user_test_date", "user_id", "test_id", "completion_date"),
+    )
 
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     test_id = Column(String(36), ForeignKey("tests.id"), nullable=False)
@@ -94,3 +104,87 @@ class UserTestResult(Base, BaseModel):
     # Relationships
     user = relationship("User", back_populates="test_results")
     test = relationship("Test", back_populates="user_results")
+    answers = relationship("UserTestAnswer", back_populates="result", cascade="all, delete-orphan")
+
+
+class UserTestAnswer(Base, BaseModel):
+    """One row per answered question of a user test result"""
+    __tablename__ = "user_test_answers"
+    __table_args__ = (
+        # Item statistics group answers of a test by question
+        Index("ix_user_test_answers_test_question", "test_id", "question_id", "is_correct"),
+    )
+
+    result_id = Column(String(36), ForeignKey("user_test_results.id"), nullable=False, index=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    test_id = Column(String(36), ForeignKey("tests.id"), nullable=False)
+    question_id = Column(String(36), ForeignKey("questions.id"), nullable=False)
+    answer_id = Column(String(36), ForeignKey("answers.id"), nullable=True)
+    text_answer = Column(Text, nullable=True)  # Free-text questions
+    is_correct = Column(Boolean, nullable=True)  # None when the question has no correct answer
+    score = Column(Float, default=0.0)
+
+    # Relationships
+    result = relationship("UserTestResult", back_populates="answers")
+
+
+class QuestionStatistic(Base, BaseModel):
+    """Item statistics of a knowledge test question, computed by the batch job"""
+    __tablename__ = "question_statistics"
+
+    question_id = Column(String(36), ForeignKey("questions.id"), nullable=False, unique=True)
+    test_id = Column(String(36), ForeignKey("tests.id"), nullable=False, index=True)
+    sample_size = Column(Integer, nullable=False, default=0)  # Attempts that answered the question
+    p_value = Column(Float)  # Share of correct answers
+    discrimination = Column(Float)  # Corrected point-biserial correlation
+    empirical_difficulty = Column(Enum(DifficultyLevel))  # Difficulty implied by p_value
+    distractor_rates = Column(Text)  # JSON object answer_id -> selection rate
+    computed_at = Column(DateTime, nullable=False)
+
+    @property
+    def distractor_rates_json(self):
+        """Convert stored JSON string to dictionary"""
+        if self.distractor_rates:
+            return json.loads(self.distractor_rates)
+        return {}
+
+
+class TestAttempt(Base, BaseModel):
+    """A user's in-progress (or finalized) attempt at a test"""
+    __tablename__ = "test_attempts"
+    __table_args__ = (
+        # Resuming looks up the open attempt of a user for a test
+        Index("ix_test_attempts_user_test_status", "user_id", "test_id", "status"),
+    )
+
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    test_id = Column(String(36), ForeignKey("tests.id"), nullable=False)
+    status = Column(Enum(AttemptStatus), nullable=False, default=AttemptStatus.IN_PROGRESS)
+    started_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=True)  # None when the test has no time limit
+    answers = Column(Text)  # JSON object question_id -> answer_id
+    result_id = Column(String(36), ForeignKey("user_test_results.id"), nullable=True)
+
+    @property
+    def answers_json(self):
+        """Convert stored JSON string to dictionary"""
+        if self.answers:
+            return json.loads(self.answers)
+        return {}
+
+    @answers_json.setter
+    def answers_json(self, value):
+        """Convert dictionary to JSON string for storage"""
+        self.answers = json.dumps(value, separators=(",", ":")) if value else None
+
+
+class TestStat(Base):
+    """Materialized per-test submission statistics used by the admin tests report"""
+    __tablename__ = "test_stats"
+
+    test_id = Column(String(36), ForeignKey("tests.id"), primary_key=True)
+    times_taken = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)  # Sum of squared scores, for the variance
+    question_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
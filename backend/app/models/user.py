@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, DateTime, Enum, Text
+from sqlalchemy import Boolean, Column, String, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum, json
@@ -15,12 +15,16 @@ class UserRole(str, enum.Enum):
 class User(Base, BaseModel):
     """User model for authentication and user information"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of the admin users report
+        Index("ix_users_registration_date_id", "registration_date", "id"),
+    )
 
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     full_name = Column(String)
     registration_date = Column(DateTime, default=datetime.utcnow)
-    last_login = Column(DateTime)
+    last_login = Column(DateTime, index=True)  # Active user counts filter on it
     role = Column(Enum(UserRole), default=UserRole.USER)
 
     # Relationships
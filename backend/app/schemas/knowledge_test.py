@@ -0,0 +1,101 @@
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+
+class KnowledgeTestResponse(BaseModel):
+    id: str
+    title: str
+    description: str
+    duration_minutes: int
+    question_count: int
+
+
+class QuestionResponse(BaseModel):
+    id: str
+    question_text: str
+    order: int
+    difficulty: str
+    answers: List[Dict[str, Any]]
+
+
+class TestStartResponse(BaseModel):
+    test_id: str
+    title: str
+    duration_minutes: int
+    total_questions: int
+    attempt_id: Optional[str] = None
+    expires_at: Optional[datetime] = None
+
+
+class AnswerSubmission(BaseModel):
+    question_id: str
+    answer_id: str
+
+
+class TestSubmission(BaseModel):
+    test_id: str
+    answers: List[AnswerSubmission]
+
+
+class AttemptAnswersUpdate(BaseModel):
+    answers: List[AnswerSubmission]
+
+
+class AttemptResponse(BaseModel):
+    attempt_id: str
+    test_id: str
+    status: str
+    started_at: datetime
+    expires_at: Optional[datetime] = None
+    remaining_seconds: Optional[int] = None
+    total_questions: int
+    answered_questions: int
+    answers: Dict[str, str]
+
+
+class TestResultResponse(BaseModel):
+    test_id: str
+    test_title: str
+    score: float
+    total_questions: int
+    correct_answers: int
+    skill_level: str
+    completion_date: datetime
+
+
+class AttemptHistoryItem(BaseModel):
+    result_id: str
+    test_id: str
+    test_title: str
+    score: float
+    skill_level: str
+    completion_date: datetime
+
+
+class AttemptHistoryResponse(BaseModel):
+    items: List[AttemptHistoryItem]
+    next_cursor: Optional[str] = None
+
+
+class TestScoreSummary(BaseModel):
+    test_id: str
+    test_title: str
+    attempts: int
+    best_score: float
+    latest_score: float
+    average_score: float
+    skill_level: str
+    last_attempt_date: datetime
+
+
+class SkillLevelTrendPoint(BaseModel):
+    period: str
+    skill_level: str
+    attempts: int
+    average_score: float
+
+
+class ScoreTrendResponse(BaseModel):
+    tests: List[TestScoreSummary]
+    skill_levels: List[SkillLevelTrendPoint]
@@ -79,3 +79,30 @@ class UserRoadmapResponse(UserRoadmapBase):
 
     class Config:
         from_attributes = True
+
+
+class RoadmapStepStatusUpdate(BaseModel):
+    status: StepStatus
+
+
+class RoadmapStepStatusChange(RoadmapStepStatusUpdate):
+    step_id: UUID
+
+
+class RoadmapStepStatusBulkUpdate(BaseModel):
+    steps: List[RoadmapStepStatusChange] = Field(..., min_length=1)
+
+
+class RoadmapStepStatusResponse(BaseModel):
+    step_id: UUID
+    status: StepStatus
+    completion_date: Optional[datetime] = None
+
+
+class RoadmapProgressResponse(BaseModel):
+    roadmap_id: UUID
+    completed_steps: int
+    total_steps: int
+    progress_percentage: float
+    last_updated: datetime
+    steps: List[RoadmapStepStatusResponse]
@@ -41,3 +41,20 @@ class UserDetailsResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RoadmapSummary(BaseModel):
+    id: UUID
+    career_path_id: UUID
+    career_path_title: str
+    progress_percentage: float
+    completed_steps: int
+    total_steps: int
+    last_updated: Optional[datetime] = None
+
+
+class UserHomeSummaryResponse(BaseModel):
+    progress: UserProgressResponse
+    stats: UserStatistics
+    achievements: List[AchievementResponse]
+    roadmap: Optional[RoadmapSummary] = None
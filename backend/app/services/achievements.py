@@ -0,0 +1,263 @@
+"""
+Persistent achievements.
+
+Achievements are defined once in a rule registry. Each rule names the domain
+events that can unlock it and a function returning when the user earned it
+(or None), given the events that just happened. Rules are evaluated only when
+one of their events happens, and an earned achievement is stored as a
+`user_achievements` row, so reading a user's achievements is a single
+indexed lookup.
+
+Domain events are derived from ORM writes: an `after_flush` listener records
+new test results and course enrollments, roadmap steps switched to completed
+and study tasks reaching 100% progress (or deleted once finished). A
+`before_commit` listener evaluates the matching rules and inserts the new
+achievement rows in the same transaction. The insert skips rows that already
+exist, so a concurrent commit earning the same achievement cannot make the
+domain write fail on `uq_user_achievements_user_key`.
+
+Achievements earned before this table existed are written by
+`scripts/backfill_achievements.py`.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.achievement import UserAchievement
+from app.models.test import UserTestResult
+from app.models.course import UserCourse
+from app.models.roadmap import UserRoadmap, RoadmapStep, UserRoadmapStep, StepStatus
+from app.models.study_plan import UserTask
+
+# Domain events
+TEST_SUBMITTED = "test_submitted"
+COURSE_ENROLLED = "course_enrolled"
+ROADMAP_STEP_COMPLETED = "roadmap_step_completed"
+STUDY_TASK_COMPLETED = "study_task_completed"
+
+_PENDING_EVENTS_KEY = "pending_achievement_events"
+
+
+@dataclass(frozen=True)
+class AchievementRule:
+    key: str
+    id: UUID
+    title: str
+    description: str
+    type: str
+    events: FrozenSet[str]
+    earned_at: Callable[[Session, str, FrozenSet[str]], Optional[datetime]]
+
+
+ACHIEVEMENT_RULES: Dict[str, AchievementRule] = {}
+
+
+def achievement_rule(key: str, id: str, title: str, description: str, type: str, events: Iterable[str]):
+    """Register the decorated `earned_at(db, user_id, events)` function as an achievement rule"""
+    def register(earned_at: Callable[[Session, str, FrozenSet[str]], Optional[datetime]]):
+        ACHIEVEMENT_RULES[key] = AchievementRule(
+            key=key,
+            id=UUID(id),
+            title=title,
+            description=description,
+            type=type,
+            events=frozenset(events),
+            earned_at=earned_at
+        )
+        return earned_at
+    return register
+
+
+def _nth_timestamp(db: Session, column, user_column, user_id: str, n: int, *criteria) -> Optional[datetime]:
+    """Timestamp of the user's n-th row (oldest first), i.e. when a count of n was reached"""
+    return db.query(column).filter(
+        user_column == user_id, column.isnot(None), *criteria
+    ).order_by(column).offset(n - 1).limit(1).scalar()
+
+
+@achievement_rule(
+    "first_steps", "11111111-1111-1111-1111-111111111111",
+    "First Steps", "Completed your first skill assessment test", "test", [TEST_SUBMITTED]
+)
+def _first_steps(db: Session, user_id: str, events: FrozenSet[str]) -> Optional[datetime]:
+    return _nth_timestamp(db, UserTestResult.completion_date, UserTestResult.user_id, user_id, 1)
+
+
+@achievement_rule(
+    "test_master", "22222222-2222-2222-2222-222222222222",
+    "Test Master", "Completed at least 3 skill assessment tests", "test", [TEST_SUBMITTED]
+)
+def _test_master(db: Session, user_id: str, events: FrozenSet[str]) -> Optional[datetime]:
+    return _nth_timestamp(db, UserTestResult.completion_date, UserTestResult.user_id, user_id, 3)
+
+
+@achievement_rule(
+    "learning_journey", "33333333-3333-3333-3333-333333333333",
+    "Learning Journey", "Enrolled in your first course", "course", [COURSE_ENROLLED]
+)
+def _learning_journey(db: Session, user_id: str, events: FrozenSet[str]) -> Optional[datetime]:
+    return _nth_timestamp(db, UserCourse.enrollment_date, UserCourse.user_id, user_id, 1)
+
+
+@achievement_rule(
+    "roadmap_pioneer", "44444444-4444-4444-4444-444444444444",
+    "Roadmap Pioneer", "Completed your first roadmap step", "roadmap", [ROADMAP_STEP_COMPLETED]
+)
+def _roadmap_pioneer(db: Session, user_id: str, events: FrozenSet[str]) -> Optional[datetime]:
+    # Roadmaps keep their step status either in status rows or in legacy step rows
+    for step_model in (UserRoadmapStep, RoadmapStep):
+        completed = db.query(step_model.completion_date, step_model.updated_at).join(
+            UserRoadmap, UserRoadmap.id == step_model.roadmap_id
+        ).filter(
+            UserRoadmap.user_id == user_id,
+            step_model.status == StepStatus.COMPLETED
+        ).order_by(step_model.completion_date).first()
+        if completed is not None:
+            return completed.completion_date or completed.updated_at or datetime.utcnow()
+    return None
+
+
+@achievement_rule(
+    "task_finisher", "55555555-5555-5555-5555-555555555555",
+    "Task Finisher", "Finished your first study task", "study", [STUDY_TASK_COMPLETED]
+)
+def _task_finisher(db: Session, user_id: str, events: FrozenSet[str]) -> Optional[datetime]:
+    # Finished tasks are deleted, so only the event itself proves it
+    return datetime.utcnow() if STUDY_TASK_COMPLETED in events else None
+
+
+def evaluate_achievements(
+    db: Session,
+    user_id: str,
+    events: Iterable[str],
+    all_rules: bool = False
+) -> List[str]:
+    """
+    Evaluate the rules triggered by `events` (every rule with `all_rules`, as
+    the backfill does) for a user and store the newly earned achievements
+    (the caller commits). Returns the keys of the achievements stored.
+    """
+    events = frozenset(events)
+    rules = [rule for rule in ACHIEVEMENT_RULES.values() if all_rules or rule.events & events]
+    if not rules:
+        return []
+
+    earned = {
+        row.achievement_key for row in db.query(UserAchievement.achievement_key).filter(
+            UserAchievement.user_id == user_id
+        )
+    }
+    stored = []
+    for rule in rules:
+        if rule.key in earned:
+            continue
+        earned_at = rule.earned_at(db, user_id, events)
+        if earned_at is not None and _insert_achievement(db, user_id, rule.key, earned_at):
+            stored.append(rule.key)
+    return stored
+
+
+def _insert_achievement(db: Session, user_id: str, key: str, earned_at: datetime) -> bool:
+    """Insert an achievement unless the user already has it; True if it was inserted"""
+    values = {"user_id": user_id, "achievement_key": key, "date_earned": earned_at}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(UserAchievement)
+        return bool(db.execute(statement.values(**values).on_conflict_do_nothing(
+            index_elements=["user_id", "achievement_key"]
+        )).rowcount)
+
+    try:
+        with db.begin_nested():
+            db.execute(insert(UserAchievement).values(**values))
+    except IntegrityError:
+        return False
+    return True
+
+
+def get_user_achievements(db: Session, user_id: str) -> List[Dict[str, Any]]:
+    """Earned achievements of a user, oldest first"""
+    rows = db.query(UserAchievement.achievement_key, UserAchievement.date_earned).filter(
+        UserAchievement.user_id == user_id
+    ).order_by(UserAchievement.date_earned)
+
+    achievements = []
+    for row in rows:
+        rule = ACHIEVEMENT_RULES.get(row.achievement_key)
+        if rule is None:
+            # Rule was retired; keep the row but stop showing it
+            continue
+        achievements.append({
+            "id": rule.id,
+            "title": rule.title,
+            "description": rule.description,
+            "date_earned": row.date_earned,
+            "type": rule.type
+        })
+    return achievements
+
+
+def _changed(instance, attribute: str) -> bool:
+    return inspect(instance).attrs[attribute].history.has_changes()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_domain_events(session, flush_context):
+    pending = set()
+    for instance in session.new:
+        if isinstance(instance, UserTestResult):
+            pending.add((TEST_SUBMITTED, instance.user_id, None))
+        elif isinstance(instance, UserCourse):
+            pending.add((COURSE_ENROLLED, instance.user_id, None))
+
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, (RoadmapStep, UserRoadmapStep)):
+            if instance.status == StepStatus.COMPLETED and _changed(instance, "status"):
+                # The owner is looked up from the roadmap before commit
+                pending.add((ROADMAP_STEP_COMPLETED, None, instance.roadmap_id))
+        elif isinstance(instance, UserTask):
+            if (instance.progress or 0) >= 100 and _changed(instance, "progress"):
+                pending.add((STUDY_TASK_COMPLETED, str(instance.user_id), None))
+
+    for instance in session.deleted:
+        # Study tasks are deleted once they reach 100%
+        if isinstance(instance, UserTask) and (instance.progress or 0) >= 100:
+            pending.add((STUDY_TASK_COMPLETED, str(instance.user_id), None))
+
+    if pending:
+        session.info.setdefault(_PENDING_EVENTS_KEY, set()).update(pending)
+
+
+@event.listens_for(Session, "before_commit")
+def _evaluate_pending_events(session):
+    # Flush first so writes added right before commit() produce their events
+    session.flush()
+    pending = session.info.pop(_PENDING_EVENTS_KEY, None)
+    if not pending:
+        return
+
+    roadmap_ids = {roadmap_id for _, _, roadmap_id in pending if roadmap_id}
+    roadmap_owners = dict(
+        session.query(UserRoadmap.id, UserRoadmap.user_id).filter(UserRoadmap.id.in_(roadmap_ids)).all()
+    ) if roadmap_ids else {}
+
+    events_by_user: Dict[str, set] = {}
+    for event_name, user_id, roadmap_id in pending:
+        user_id = user_id or roadmap_owners.get(roadmap_id)
+        if user_id:
+            events_by_user.setdefault(user_id, set()).add(event_name)
+
+    for user_id, events in events_by_user.items():
+        evaluate_achievements(session, user_id, events)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session, previous_transaction):
+    session.info.pop(_PENDING_EVENTS_KEY, None)
@@ -0,0 +1,282 @@
+"""
+Streaming exports of chat and sentiment data and of the users report for
+offline analysis.
+
+Rows are read with keyset pagination over (timestamp, id) in fixed-size chunks
+on a dedicated session, and each chunk is serialized and yielded immediately,
+so memory stays constant regardless of the export size.
+"""
+
+import csv
+import io
+import json
+import importlib.util
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.chat import ChatSession, ChatMessage
+from app.models.user import User
+from app.crud.user_reports import user_report_query, user_report_row
+
+# pyarrow is only needed for the columnar formats; NDJSON always works
+pyarrow_installed = importlib.util.find_spec("pyarrow") is not None
+if pyarrow_installed:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+else:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "csv": "text/csv",
+}
+
+CHAT_EXPORT_FORMATS = ("ndjson", "parquet", "arrow")
+USER_REPORT_FORMATS = ("ndjson", "csv")
+USER_REPORT_COLUMNS = [
+    "id", "email", "full_name", "registration_date", "last_login",
+    "role", "tests_taken", "courses_enrolled", "cursor"
+]
+
+
+def iter_chat_message_chunks(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sentiment_analyzed: Optional[bool] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield chat messages joined with session and user metadata, ordered by
+    (timestamp, id), as lists of at most `chunk_size` dicts. Rows at or
+    before `after` are skipped.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            query = db.query(
+                ChatMessage.id,
+                ChatMessage.timestamp,
+                ChatMessage.session_id,
+                ChatSession.title.label("session_title"),
+                ChatSession.user_id,
+                User.registration_date.label("user_registration_date"),
+                ChatMessage.is_from_user,
+                ChatMessage.content,
+                ChatMessage.sentiment_label,
+                ChatMessage.sentiment_score,
+                ChatMessage.sentiment_analyzed,
+            ).join(
+                ChatSession, ChatMessage.session_id == ChatSession.id
+            ).join(
+                User, ChatSession.user_id == User.id
+            ).filter(ChatMessage.timestamp.isnot(None))
+
+            if start is not None:
+                query = query.filter(ChatMessage.timestamp >= start)
+            if end is not None:
+                query = query.filter(ChatMessage.timestamp < end)
+            if sentiment_analyzed is not None:
+                query = query.filter(
+                    ChatMessage.sentiment_analyzed == ("true" if sentiment_analyzed else "false")
+                )
+            if after is not None:
+                after_timestamp, after_id = after
+                query = query.filter(or_(
+                    ChatMessage.timestamp > after_timestamp,
+                    and_(ChatMessage.timestamp == after_timestamp, ChatMessage.id > after_id)
+                ))
+
+            rows = query.order_by(ChatMessage.timestamp, ChatMessage.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            yield [row._asdict() for row in rows]
+
+            if len(rows) < chunk_size:
+                break
+            after = (rows[-1].timestamp, rows[-1].id)
+    finally:
+        db.close()
+
+
+def iter_user_report_chunks(
+    after: Optional[Tuple[datetime, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield users report rows ordered by (registration_date, id) as lists of at
+    most `chunk_size` dicts. Rows at or before `after` are skipped.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            rows = user_report_query(db, after).limit(chunk_size).all()
+            if not rows:
+                break
+
+            yield [user_report_row(row) for row in rows]
+
+            if len(rows) < chunk_size:
+                break
+            after = (rows[-1].registration_date, rows[-1].id)
+    finally:
+        db.close()
+
+
+def _ndjson_stream(chunks: Iterator[List[Dict[str, Any]]], timestamp_field: str = "timestamp") -> Iterator[bytes]:
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            row["cursor"] = encode_cursor(row[timestamp_field], row["id"])
+            lines.append(json.dumps(row, default=_json_default, ensure_ascii=False))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_stream(chunks: Iterator[List[Dict[str, Any]]], columns: List[str], timestamp_field: str) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for chunk in chunks:
+        for row in chunk:
+            row["cursor"] = encode_cursor(row[timestamp_field], row["id"])
+            writer.writerow({
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in row.items()
+            })
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    data = buffer.getvalue()
+    if data:
+        yield data.encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class _ChunkSink:
+    """
+    Write-only file object handed to pyarrow writers. Bytes are drained after
+    every record batch while tell() keeps reporting the absolute position, which
+    the Parquet footer needs for its row-group offsets.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_schema():
+    return pa.schema([
+        ("id", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("session_id", pa.string()),
+        ("session_title", pa.string()),
+        ("user_id", pa.string()),
+        ("user_registration_date", pa.timestamp("us")),
+        ("is_from_user", pa.string()),
+        ("content", pa.string()),
+        ("sentiment_label", pa.string()),
+        ("sentiment_score", pa.float64()),
+        ("sentiment_analyzed", pa.string()),
+    ])
+
+
+def _columnar_stream(chunks: Iterator[List[Dict[str, Any]]], export_format: str) -> Iterator[bytes]:
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_chat_messages(
+    export_format: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sentiment_analyzed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Serialize the chat message export in `export_format` as a byte stream"""
+    if export_format not in CHAT_EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format != "ndjson" and not pyarrow_installed:
+        raise ValueError(f"pyarrow is required for the {export_format} export format")
+
+    after = decode_cursor(cursor) if cursor else None
+    chunks = iter_chat_message_chunks(start, end, sentiment_analyzed, after, chunk_size)
+    if export_format == "ndjson":
+        return _ndjson_stream(chunks)
+    return _columnar_stream(chunks, export_format)
+
+
+def stream_user_report(
+    export_format: str,
+    cursor: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Serialize the full users report as NDJSON or CSV as a byte stream"""
+    if export_format not in USER_REPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    after = decode_cursor(cursor) if cursor else None
+    chunks = iter_user_report_chunks(after, chunk_size)
+    if export_format == "ndjson":
+        return _ndjson_stream(chunks, timestamp_field="registration_date")
+    return _csv_stream(chunks, USER_REPORT_COLUMNS, timestamp_field="registration_date")
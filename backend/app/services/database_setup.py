@@ -0,0 +1,171 @@
+"""
+Startup preparation of the database.
+
+`Base.metadata.create_all` only creates missing tables: it never adds columns,
+indexes or constraints to a table that already exists. `prepare_database`
+runs it and then brings an older database up to the current models, so a
+deployment does not depend on someone running one-off scripts. Every step
+inspects the live schema or data first and is a no-op once applied.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect, literal, text, UniqueConstraint
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, engine as default_engine
+from app.crud import counters as counters_crud
+from app.crud import roadmaps as roadmap_crud
+from app.crud import test_stats as test_stats_crud
+from app.services.personality_scoring import seed_personality_questions, migrate_legacy_traits
+
+logger = logging.getLogger(__name__)
+
+# Recomputes the rows of a table written before some of its columns existed;
+# run once when a missing column is added
+COLUMN_BACKFILLS = {
+    "user_roadmaps": roadmap_crud.recompute_progress,
+}
+
+# Indexes replaced by a unique constraint on the same columns
+RETIRED_INDEXES = {
+    "career_path_steps": ["ix_career_path_steps_path_order"],
+}
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """
+    Add the model columns missing from existing tables, with their scalar
+    default. Returns the columns added as "table.column".
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning(f"Cannot add the required column {table.name}.{column.name}; migrate it by hand")
+                    continue
+                definition = f"{quote(column.name)} {column.type.compile(dialect=engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                    )
+                    definition += f" DEFAULT {default}"
+                connection.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {definition}"))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def backfill_added_columns(engine: Engine, added: List[str]) -> None:
+    """Run the backfill of every table that just got new columns"""
+    tables = {name.split(".", 1)[0] for name in added}
+    with Session(bind=engine) as db:
+        for table, backfill in COLUMN_BACKFILLS.items():
+            if table in tables:
+                backfill(db)
+        db.commit()
+
+
+def create_missing_indexes(engine: Engine) -> List[str]:
+    """Create the model indexes missing from existing tables"""
+    inspector = inspect(engine)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+def create_missing_unique_constraints(engine: Engine) -> List[str]:
+    """
+    Add the model unique constraints missing from existing tables as unique
+    indexes of the same name (SQLite cannot add constraints to a table), and
+    drop the indexes they replace.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    created = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for constraint in table.constraints:
+                if not isinstance(constraint, UniqueConstraint) or constraint.name in existing | indexes:
+                    continue
+                columns = ", ".join(quote(column.name) for column in constraint.columns)
+                connection.execute(text(
+                    f"CREATE UNIQUE INDEX {quote(constraint.name)} ON {quote(table.name)} ({columns})"
+                ))
+                created.append(constraint.name)
+
+            for name in RETIRED_INDEXES.get(table.name, []):
+                if name in indexes:
+                    connection.execute(text(f"DROP INDEX {quote(name)}"))
+    return created
+
+
+def merge_duplicate_rows(engine: Engine) -> None:
+    """Merge rows that would violate a unique constraint added since they were written"""
+    with Session(bind=engine) as db:
+        merged = roadmap_crud.merge_duplicate_career_path_steps(db)
+        db.commit()
+    if merged:
+        logger.info(f"Merged {merged} duplicate career path steps")
+
+
+def migrate_legacy_data(engine: Engine) -> None:
+    """Create the built-in rows and rewrite rows still stored in an old format"""
+    with Session(bind=engine) as db:
+        seeded = seed_personality_questions(db)
+        migrated = migrate_legacy_traits(db)
+        db.commit()
+    if seeded:
+        logger.info(f"Created {seeded} built-in personality questions")
+    if migrated:
+        logger.info(f"Migrated the traits of {migrated} personality questions")
+
+
+def seed_missing_rollups(engine: Engine) -> None:
+    """Seed the rollup rows missing for existing data from a real aggregate"""
+    with Session(bind=engine) as db:
+        seeded = test_stats_crud.seed_missing_test_stats(db)
+        db.commit()
+        if seeded:
+            logger.info(f"Seeded test statistics for {seeded} tests")
+
+        missing = counters_crud.missing_counters(db)
+        if missing:
+            counters_crud.rebuild_counters(db, missing)
+            logger.info(f"Seeded platform counters: {', '.join(missing)}")
+
+
+def prepare_database(engine: Engine = default_engine) -> None:
+    """Create missing tables and apply the idempotent upgrades below"""
+    Base.metadata.create_all(bind=engine)
+
+    added = add_missing_columns(engine)
+    if added:
+        logger.info(f"Added missing columns: {', '.join(added)}")
+        backfill_added_columns(engine, added)
+
+    created = create_missing_indexes(engine)
+    if created:
+        logger.info(f"Created missing indexes: {', '.join(created)}")
+
+    merge_duplicate_rows(engine)
+    created = create_missing_unique_constraints(engine)
+    if created:
+        logger.info(f"Created missing unique constraints: {', '.join(created)}")
+
+    migrate_legacy_data(engine)
+    seed_missing_rollups(engine)
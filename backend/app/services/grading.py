@@ -0,0 +1,342 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.models.test import Test, Question, Answer, QuestionType
+
+
+class GradingError(ValueError):
+    """Raised when a submission references questions or answers outside the test"""
+
+
+@dataclass(frozen=True)
+class AnswerKeyQuestion:
+    question_id: str
+    question_text: str
+    difficulty: str
+    correct_answer_ids: frozenset
+    # answer_id -> (answer_text, is_correct)
+    answers: Dict[str, Tuple[str, bool]]
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Compact grading key of a knowledge test, keyed by question id"""
+    test_id: str
+    questions: Dict[str, AnswerKeyQuestion]
+
+    @property
+    def question_count(self) -> int:
+        return len(self.questions)
+
+
+@dataclass
+class GradedSubmission:
+    score: float
+    correct_answers: int
+    total_questions: int
+    skill_level: str
+    detailed_results: List[Dict[str, Any]]
+    question_count: int  # Questions in the test, answered or not
+
+
+# Minimum 0-100 score for each skill level, highest first
+SKILL_LEVEL_THRESHOLDS = ((71, "İleri"), (41, "Orta"))
+BASE_SKILL_LEVEL = "Başlangıç"
+
+
+def skill_level_for_score(score: float) -> str:
+    """Map a 0-100 knowledge test score to a skill level"""
+    for threshold, level in SKILL_LEVEL_THRESHOLDS:
+        if score >= threshold:
+            return level
+    return BASE_SKILL_LEVEL
+
+
+def skill_level_case(score_column):
+    """SQL expression mapping a score column to a skill level, like skill_level_for_score"""
+    return case(
+        *[(score_column >= threshold, level) for threshold, level in SKILL_LEVEL_THRESHOLDS],
+        else_=BASE_SKILL_LEVEL
+    )
+
+
+class KnowledgeTestGrader:
+    """
+    Grades knowledge test submissions in memory against a cached answer key.
+    The key is loaded with one query per test and dropped whenever a test,
+    question or answer is committed, so grading cost does not depend on the
+    number of submitted answers.
+    """
+
+    def __init__(self):
+        self._cache = InProcessCache()
+        invalidate_on_commit(self._cache, Test, Question, Answer)
+
+    def get_answer_key(self, db: Session, test_id: str) -> AnswerKey:
+        return self._cache.get_or_load(test_id, lambda: self._load_answer_key(db, test_id))
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def grade(
+        self,
+        db: Session,
+        test_id: str,
+        answers: List[Tuple[str, Optional[str]]],
+        count_unanswered: bool = False
+    ) -> GradedSubmission:
+        """
+        Grade (question_id, answer_id) pairs. Each question counts once (the
+        last submitted answer wins); a question or answer that does not belong
+        to this test raises GradingError. With `count_unanswered` the score is
+        taken over every question of the test, unanswered ones being incorrect.
+        """
+        answer_key = self.get_answer_key(db, test_id)
+
+        selected: Dict[str, Optional[str]] = {}
+        for question_id, answer_id in answers:
+            key_question = answer_key.questions.get(question_id)
+            if key_question is None:
+                raise GradingError(f"Question {question_id} does not belong to this test")
+            if answer_id is not None and answer_id not in key_question.answers:
+                raise GradingError(f"Answer {answer_id} does not belong to question {question_id}")
+            selected[question_id] = answer_id
+        if count_unanswered:
+            selected = {question_id: selected.get(question_id) for question_id in answer_key.questions}
+
+        correct_answers = 0
+        detailed_results = []
+        for question_id, answer_id in selected.items():
+            key_question = answer_key.questions[question_id]
+            answer_text, is_correct = key_question.answers.get(answer_id, ("", False))
+            if is_correct:
+                correct_answers += 1
+            detailed_results.append({
+                "question_id": question_id,
+                "question_text": key_question.question_text,
+                "answer_id": answer_id,
+                "answer_text": answer_text,
+                "is_correct": is_correct,
+                "difficulty": key_question.difficulty
+            })
+
+        total_questions = len(selected)
+        score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+
+        return GradedSubmission(
+            score=score,
+            correct_answers=correct_answers,
+            total_questions=total_questions,
+            skill_level=skill_level_for_score(score),
+            detailed_results=detailed_results,
+            question_count=answer_key.question_count
+        )
+
+    @staticmethod
+    def _load_answer_key(db: Session, test_id: str) -> AnswerKey:
+        rows = db.query(
+            Question.id.label("question_id"),
+            Question.question_text,
+            Question.difficulty,
+            Answer.id.label("answer_id"),
+            Answer.answer_text,
+            Answer.is_correct
+        ).outerjoin(
+            Answer, Answer.question_id == Question.id
+        ).filter(
+            Question.test_id == test_id
+        ).order_by(Question.order).all()
+
+        questions: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            question = questions.setdefault(row.question_id, {
+                "question_text": row.question_text,
+                "difficulty": row.difficulty.value if row.difficulty else "orta",
+                "answers": {}
+            })
+            if row.answer_id is not None:
+                question["answers"][row.answer_id] = (row.answer_text, bool(row.is_correct))
+
+        return AnswerKey(
+            test_id=test_id,
+            questions={
+                question_id: AnswerKeyQuestion(
+                    question_id=question_id,
+                    question_text=question["question_text"],
+                    difficulty=question["difficulty"],
+                    correct_answer_ids=frozenset(
+                        answer_id for answer_id, (_, is_correct) in question["answers"].items() if is_correct
+                    ),
+                    answers=question["answers"]
+                )
+                for question_id, question in questions.items()
+            }
+        )
+
+
+knowledge_test_grader = KnowledgeTestGrader()
+
+
+@dataclass(frozen=True)
+class ScoringKeyQuestion:
+    question_id: str
+    question_type: QuestionType
+    # answer_id -> (score_value, is_correct)
+    answers: Dict[str, Tuple[float, bool]]
+
+    @property
+    def max_score(self) -> float:
+        return max((score for score, _ in self.answers.values()), default=0.0)
+
+
+@dataclass(frozen=True)
+class ScoringKey:
+    """Scoring key of a generic test (multiple choice, Likert and free text questions)"""
+    test_id: str
+    questions: Dict[str, ScoringKeyQuestion]
+    max_possible_score: float
+
+
+@dataclass
+class ScoredSubmission:
+    score: float
+    total_score: float
+    max_possible_score: float
+    result_data: List[Dict[str, Any]]
+    answer_rows: List[Dict[str, Any]]
+    question_count: int  # Questions in the test, answered or not
+
+
+class TestScorer:
+    """
+    Scores generic test submissions in memory. Like the knowledge test grader,
+    the scoring key is loaded with one query per test and cached until a test,
+    question or answer is committed.
+    """
+
+    def __init__(self):
+        self._cache = InProcessCache()
+        invalidate_on_commit(self._cache, Test, Question, Answer)
+
+    def get_scoring_key(self, db: Session, test_id: str) -> ScoringKey:
+        return self._cache.get_or_load(test_id, lambda: self._load_scoring_key(db, test_id))
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def score(
+        self,
+        db: Session,
+        test_id: str,
+        answers: List[Tuple[str, Optional[str], Optional[str]]]
+    ) -> ScoredSubmission:
+        """
+        Score (question_id, selected_answer_id, text_answer) triples. Choice
+        questions earn the score_value of the selected answer, free-text answers
+        are stored unscored. The score is normalized against the best possible
+        total of the test; each question counts once (the last answer wins).
+        """
+        scoring_key = self.get_scoring_key(db, test_id)
+
+        selected: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for question_id, answer_id, text_answer in answers:
+            key_question = scoring_key.questions.get(question_id)
+            if key_question is None:
+                raise GradingError(f"Question {question_id} not found")
+            if key_question.question_type != QuestionType.FREE_TEXT and answer_id not in key_question.answers:
+                raise GradingError(f"Answer {answer_id} not found")
+            selected[question_id] = (answer_id, text_answer)
+
+        total_score = 0.0
+        result_data = []
+        answer_rows = []
+        for question_id, (answer_id, text_answer) in selected.items():
+            key_question = scoring_key.questions[question_id]
+            if key_question.question_type == QuestionType.FREE_TEXT:
+                # No automatic scoring for text answers
+                result_data.append({
+                    "question_id": question_id,
+                    "text_answer": text_answer,
+                    "score": 0
+                })
+                answer_rows.append({
+                    "question_id": question_id,
+                    "text_answer": text_answer,
+                    "score": 0.0
+                })
+                continue
+
+            score_value, is_correct = key_question.answers[answer_id]
+            total_score += score_value
+            result_data.append({
+                "question_id": question_id,
+                "selected_answer_id": answer_id,
+                "score": score_value
+            })
+            answer_rows.append({
+                "question_id": question_id,
+                "answer_id": answer_id,
+                # Likert answers have no right or wrong option
+                "is_correct": is_correct if key_question.question_type == QuestionType.MULTIPLE_CHOICE else None,
+                "score": score_value
+            })
+
+        max_possible_score = scoring_key.max_possible_score
+        score = (total_score / max_possible_score) * 100 if max_possible_score > 0 else 0
+
+        return ScoredSubmission(
+            score=score,
+            total_score=total_score,
+            max_possible_score=max_possible_score,
+            result_data=result_data,
+            answer_rows=answer_rows,
+            question_count=len(scoring_key.questions)
+        )
+
+    @staticmethod
+    def _load_scoring_key(db: Session, test_id: str) -> ScoringKey:
+        rows = db.query(
+            Question.id.label("question_id"),
+            Question.question_type,
+            Answer.id.label("answer_id"),
+            Answer.score_value,
+            Answer.is_correct
+        ).outerjoin(
+            Answer, Answer.question_id == Question.id
+        ).filter(
+            Question.test_id == test_id
+        ).order_by(Question.order).all()
+
+        questions: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            question = questions.setdefault(row.question_id, {
+                "question_type": row.question_type,
+                "answers": {}
+            })
+            if row.answer_id is not None:
+                question["answers"][row.answer_id] = (row.score_value or 0.0, bool(row.is_correct))
+
+        key_questions = {
+            question_id: ScoringKeyQuestion(
+                question_id=question_id,
+                question_type=question["question_type"],
+                answers=question["answers"]
+            )
+            for question_id, question in questions.items()
+        }
+
+        return ScoringKey(
+            test_id=test_id,
+            questions=key_questions,
+            max_possible_score=sum(
+                question.max_score for question in key_questions.values()
+                if question.question_type != QuestionType.FREE_TEXT
+            )
+        )
+
+
+test_scorer = TestScorer()
@@ -0,0 +1,196 @@
+"""
+Batch item statistics for knowledge test questions.
+
+Attempts are streamed from user_test_answers in fixed-size chunks of results.
+Each chunk becomes a dense attempts x questions response matrix, and only
+per-question running sums are kept between chunks. Memory is therefore bounded
+by the chunk size, not by the number of attempts.
+
+Per question the job stores:
+- p_value: share of attempts that answered it correctly
+- discrimination: corrected point-biserial correlation between the item and
+  the rest score (total correct minus the item itself)
+- distractor_rates: selection rate of every answer option
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models.test import (
+    Test, Question, Answer, UserTestResult, UserTestAnswer,
+    QuestionStatistic, TestType, DifficultyLevel
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def empirical_difficulty(p_value: Optional[float]) -> Optional[DifficultyLevel]:
+    """Difficulty level implied by the share of correct answers"""
+    if p_value is None:
+        return None
+    if p_value >= 0.7:
+        return DifficultyLevel.KOLAY
+    if p_value >= 0.4:
+        return DifficultyLevel.ORTA
+    return DifficultyLevel.ZOR
+
+
+class _ItemAccumulator:
+    """Running per-question sums over all processed chunks"""
+
+    def __init__(self, question_count: int, max_answers: int):
+        self.answered = np.zeros(question_count)
+        self.correct = np.zeros(question_count)
+        self.rest_sum = np.zeros(question_count)
+        self.rest_sq_sum = np.zeros(question_count)
+        self.rest_correct_sum = np.zeros(question_count)
+        self.option_counts = np.zeros((question_count, max(max_answers, 1)))
+
+    def add_chunk(self, correct: np.ndarray, answered: np.ndarray, question_idx: np.ndarray, option_idx: np.ndarray):
+        totals = correct.sum(axis=1, keepdims=True)
+        rest = (totals - correct) * answered
+
+        self.answered += answered.sum(axis=0)
+        self.correct += correct.sum(axis=0)
+        self.rest_sum += rest.sum(axis=0)
+        self.rest_sq_sum += (rest ** 2).sum(axis=0)
+        self.rest_correct_sum += (rest * correct).sum(axis=0)
+
+        valid = option_idx >= 0
+        np.add.at(self.option_counts, (question_idx[valid], option_idx[valid]), 1)
+
+    def p_values(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.answered > 0, self.correct / self.answered, np.nan)
+
+    def discrimination(self) -> np.ndarray:
+        n = self.answered
+        n1 = self.correct
+        n0 = n - n1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_all = self.rest_sum / n
+            std_all = np.sqrt(self.rest_sq_sum / n - mean_all ** 2)
+            mean_correct = self.rest_correct_sum / n1
+            mean_wrong = (self.rest_sum - self.rest_correct_sum) / n0
+            p = n1 / n
+            r = (mean_correct - mean_wrong) / std_all * np.sqrt(p * (1 - p))
+        # Undefined when everyone (or no one) got the item right or scores do not vary
+        return np.where((n1 > 0) & (n0 > 0) & (std_all > 0), r, np.nan)
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def compute_test_statistics(db: Session, test_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Recompute and store the item statistics of one test. Returns the number
+    of attempts processed.
+    """
+    question_ids: List[str] = [
+        row.id for row in db.query(Question.id).filter(Question.test_id == test_id).order_by(Question.order)
+    ]
+    if not question_ids:
+        return 0
+    question_index = {question_id: i for i, question_id in enumerate(question_ids)}
+
+    # answer_id -> (question position, option position)
+    option_index: Dict[str, tuple] = {}
+    options_per_question: List[List[str]] = [[] for _ in question_ids]
+    for row in db.query(Answer.id, Answer.question_id).filter(
+        Answer.question_id.in_(question_ids)
+    ).order_by(Answer.question_id, Answer.id):
+        q = question_index[row.question_id]
+        option_index[row.id] = (q, len(options_per_question[q]))
+        options_per_question[q].append(row.id)
+
+    accumulator = _ItemAccumulator(len(question_ids), max(len(o) for o in options_per_question))
+    attempts = 0
+    last_result_id = ""
+
+    while True:
+        result_ids = [
+            row.id for row in db.query(UserTestResult.id).filter(
+                UserTestResult.test_id == test_id,
+                UserTestResult.id > last_result_id
+            ).order_by(UserTestResult.id).limit(chunk_size)
+        ]
+        if not result_ids:
+            break
+        last_result_id = result_ids[-1]
+        result_index = {result_id: i for i, result_id in enumerate(result_ids)}
+
+        rows = db.query(
+            UserTestAnswer.result_id,
+            UserTestAnswer.question_id,
+            UserTestAnswer.answer_id,
+            UserTestAnswer.is_correct
+        ).filter(UserTestAnswer.result_id.in_(result_ids)).all()
+
+        correct = np.zeros((len(result_ids), len(question_ids)))
+        answered = np.zeros((len(result_ids), len(question_ids)))
+        question_idx = np.full(len(rows), -1, dtype=np.int64)
+        option_idx = np.full(len(rows), -1, dtype=np.int64)
+
+        for i, row in enumerate(rows):
+            q = question_index.get(row.question_id)
+            if q is None:
+                continue
+            r = result_index[row.result_id]
+            answered[r, q] = 1
+            correct[r, q] = 1 if row.is_correct else 0
+            question_idx[i] = q
+            option = option_index.get(row.answer_id)
+            if option is not None and option[0] == q:
+                option_idx[i] = option[1]
+
+        # Attempts without any stored answers (e.g. legacy rows) carry no signal
+        has_answers = answered.any(axis=1)
+        accumulator.add_chunk(correct[has_answers], answered[has_answers], question_idx, option_idx)
+        attempts += int(has_answers.sum())
+
+        if len(result_ids) < chunk_size:
+            break
+
+    p_values = accumulator.p_values()
+    discrimination = accumulator.discrimination()
+    computed_at = datetime.utcnow()
+
+    db.execute(delete(QuestionStatistic).where(QuestionStatistic.test_id == test_id))
+    db.add_all([
+        QuestionStatistic(
+            question_id=question_id,
+            test_id=test_id,
+            sample_size=int(accumulator.answered[q]),
+            p_value=_nullable(p_values[q]),
+            discrimination=_nullable(discrimination[q]),
+            empirical_difficulty=empirical_difficulty(_nullable(p_values[q])),
+            distractor_rates=json.dumps({
+                answer_id: round(float(accumulator.option_counts[q, o] / accumulator.answered[q]), 4)
+                if accumulator.answered[q] else 0.0
+                for o, answer_id in enumerate(options_per_question[q])
+            }),
+            computed_at=computed_at
+        )
+        for question_id, q in question_index.items()
+    ])
+    db.commit()
+
+    logger.info(f"Item statistics computed for test {test_id} from {attempts} attempts")
+    return attempts
+
+
+def compute_all_statistics(db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """Recompute item statistics for every knowledge test"""
+    test_ids = [
+        row.id for row in db.query(Test.id).filter(Test.test_type == TestType.SKILL_ASSESSMENT)
+    ]
+    return {test_id: compute_test_statistics(db, test_id, chunk_size) for test_id in test_ids}
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.models.test import Test, Question, TestType
+
+
+@dataclass(frozen=True)
+class KnowledgeTestSummary:
+    """Catalog entry for a knowledge test"""
+    id: str
+    title: str
+    description: Optional[str]
+    duration_minutes: Optional[int]
+    question_count: int
+
+
+class KnowledgeTestCatalog:
+    """
+    Cached catalog of knowledge (skill assessment) tests with their question
+    counts. The catalog is loaded with a single grouped query and kept in
+    memory until a test or question is committed.
+    """
+
+    def __init__(self):
+        self._cache = InProcessCache()
+        invalidate_on_commit(self._cache, Test, Question)
+
+    def list_tests(self, db: Session) -> List[KnowledgeTestSummary]:
+        """All knowledge tests in catalog order"""
+        return list(self._load(db).values())
+
+    def get_test(self, db: Session, test_id: str) -> Optional[KnowledgeTestSummary]:
+        """A single knowledge test, or None if it does not exist"""
+        return self._load(db).get(test_id)
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def _load(self, db: Session) -> Dict[str, KnowledgeTestSummary]:
+        return self._cache.get_or_load("catalog", lambda: self._query_catalog(db))
+
+    @staticmethod
+    def _query_catalog(db: Session) -> Dict[str, KnowledgeTestSummary]:
+        question_counts = db.query(
+            Question.test_id.label("test_id"),
+            func.count(Question.id).label("question_count")
+        ).group_by(Question.test_id).subquery()
+
+        rows = db.query(
+            Test.id,
+            Test.title,
+            Test.description,
+            Test.duration_minutes,
+            func.coalesce(question_counts.c.question_count, 0).label("question_count")
+        ).outerjoin(
+            question_counts, question_counts.c.test_id == Test.id
+        ).filter(
+            Test.test_type == TestType.SKILL_ASSESSMENT
+        ).order_by(Test.created_at, Test.id).all()
+
+        return {
+            row.id: KnowledgeTestSummary(
+                id=row.id,
+                title=row.title,
+                description=row.description,
+                duration_minutes=row.duration_minutes,
+                question_count=int(row.question_count)
+            )
+            for row in rows
+        }
+
+
+knowledge_test_catalog = KnowledgeTestCatalog()
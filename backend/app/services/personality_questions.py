@@ -0,0 +1,111 @@
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.core.config import settings
+from app.models.personality_test import PersonalityQuestion
+from app.schemas.personality_test import PersonalityQuestionsPage
+
+PAGE_TITLE = "Kariyer Kişilik Değerlendirmesi"
+
+
+@dataclass(frozen=True)
+class PersonalityQuestionPage:
+    """Serialized `PersonalityQuestionsPage` body of one page and its entity tag"""
+    page: int
+    payload: bytes
+    etag: str
+
+
+@dataclass(frozen=True)
+class PersonalityQuestionBankEntry:
+    """The paginated personality questions of one content version"""
+    version: int
+    total_questions: int
+    question_ids: FrozenSet[str]
+    pages: Tuple[PersonalityQuestionPage, ...]
+
+    @property
+    def total_pages(self) -> int:
+        return len(self.pages)
+
+
+class PersonalityQuestionBank:
+    """
+    Read-mostly cache of the personality questions. A miss loads every
+    question with one ordered query and serializes all pages up front, so
+    serving a page or the question count does not touch the question table.
+    The bank is rebuilt after any personality question is committed.
+    """
+
+    def __init__(self, questions_per_page: int = settings.PERSONALITY_QUESTIONS_PER_PAGE):
+        self.questions_per_page = questions_per_page
+        self._cache = InProcessCache()
+        invalidate_on_commit(self._cache, PersonalityQuestion)
+
+    @property
+    def version(self) -> int:
+        """Current content version of the question bank"""
+        return self._cache.version
+
+    def get(self, db: Session) -> PersonalityQuestionBankEntry:
+        return self._cache.get_or_load("bank", lambda: self._load(db))
+
+    def page(self, db: Session, page: int) -> Optional[PersonalityQuestionPage]:
+        """A 1-based page, or None if it is out of range"""
+        pages = self.get(db).pages
+        if page < 1 or page > len(pages):
+            return None
+        return pages[page - 1]
+
+    def total_questions(self, db: Session) -> int:
+        return self.get(db).total_questions
+
+    def question_ids(self, db: Session) -> FrozenSet[str]:
+        return self.get(db).question_ids
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def _load(self, db: Session) -> PersonalityQuestionBankEntry:
+        version = self._cache.version
+        questions = db.query(PersonalityQuestion).order_by(PersonalityQuestion.order).all()
+        total_pages = math.ceil(len(questions) / self.questions_per_page)
+
+        pages = []
+        for page in range(1, total_pages + 1):
+            start = (page - 1) * self.questions_per_page
+            payload = PersonalityQuestionsPage(
+                questions=[
+                    {
+                        "id": question.question_id,
+                        "text": question.text,
+                        "category": question.category,
+                        "trait": question.trait,
+                        "subcategory": None
+                    }
+                    for question in questions[start:start + self.questions_per_page]
+                ],
+                current_page=page,
+                total_pages=total_pages,
+                page_title=PAGE_TITLE
+            ).model_dump_json().encode()
+            pages.append(PersonalityQuestionPage(
+                page=page,
+                payload=payload,
+                etag=f'"{hashlib.sha1(payload).hexdigest()}"'
+            ))
+
+        return PersonalityQuestionBankEntry(
+            version=version,
+            total_questions=len(questions),
+            question_ids=frozenset(question.question_id for question in questions),
+            pages=tuple(pages)
+        )
+
+
+personality_question_bank = PersonalityQuestionBank()
@@ -0,0 +1,308 @@
+"""
+Personality test scoring.
+
+The scoring model is built from the personality questions: every answer counts
+towards each career area listed in the question's `trait` (comma separated for
+questions shared by several areas), reversed (6 - answer) when the question is
+`is_reverse_scored`. This gives a questions x careers weight matrix W, so a
+batch of answer vectors A (tests x questions, 0 = unanswered) is scored with a
+single product A @ W. The model is cached and rebuilt after any personality
+question is committed. Only the career areas of `CAREER_EXPLANATIONS` are
+scored; other trait labels are logged and ignored.
+
+The built-in questions the frontend answers as Q1-Q15 are created at startup
+when missing (`seed_personality_questions`), so the model is never empty.
+Questions still holding one of the old short labels (`UI/UX`, `Backend`) are
+rewritten to the career areas the old question_id mapping scored
+(`migrate_legacy_traits`). Scores match the old scorer as long as those
+questions keep their built-in traits and none is `is_reverse_scored`.
+
+`rescore_all` applies the current model to every stored test in chunks of
+tests and only writes the results that changed, e.g. after the question to
+career mapping was edited.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.data.personality_traits import PERSONALITY_QUESTIONS, LEGACY_TRAIT_LABELS
+from app.models.personality_test import PersonalityTest, PersonalityQuestion, PersonalityTestAnswer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+LIKERT_MAX = 5
+NEUTRAL_ANSWER = 3
+
+# Career-specific personality explanations; the order also breaks score ties
+CAREER_EXPLANATIONS = {
+    "UI/UX Designer": "Tasarım sevginiz, kullanıcı deneyimine odaklanmanız ve yaratıcı çözümler üretme beceriniz bu alanla uyumunuzu gösteriyor.",
+    "Backend Developer": "Sistemlerin arkasındaki detaylarla çalışma beceriniz, mantıksal düşünce yapınız ve teknik bağlantıları kurma yeteneğiniz bu alanla uyumunuzu gösteriyor.",
+    "Data Science": "Analitik düşünce yapınız, verileri anlama ve yorumlama beceriniz ile karmaşık problemleri çözme yaklaşımınız bu alanla uyumunuzu gösteriyor.",
+    "Project Management": "Yönetim beceriniz, ekip koordinasyonu yapabilmeniz ve planlama yaklaşımınız bu alanla uyumunuzu gösteriyor."
+}
+
+# (minimum normalized score, level, percentage), highest first
+COMPATIBILITY_LEVELS = [
+    (4.5, "Çok Yüksek Uygunluk", 95),
+    (4.0, "Yüksek Uygunluk", 85),
+    (3.5, "Orta-Yüksek Uygunluk", 75),
+    (3.0, "Orta Uygunluk", 60),
+    (2.5, "Orta-Düşük Uygunluk", 45),
+]
+LOWEST_COMPATIBILITY = ("Düşük Uygunluk", 30)
+
+
+def compatibility(normalized_score: float) -> Tuple[str, int]:
+    """Compatibility level and percentage of a normalized (per question) score"""
+    for minimum, level, percentage in COMPATIBILITY_LEVELS:
+        if normalized_score >= minimum:
+            return level, percentage
+    return LOWEST_COMPATIBILITY
+
+
+def parse_traits(trait: Optional[str]) -> List[str]:
+    """Career areas of a comma separated `trait`"""
+    return [label.strip() for label in (trait or "").split(",") if label.strip()]
+
+
+def seed_personality_questions(db: Session) -> int:
+    """
+    Create the built-in questions missing from the question table. Existing
+    questions are left as they are. Returns the number created; not committed.
+    """
+    existing = {
+        row.question_id for row in db.query(PersonalityQuestion.question_id).filter(
+            PersonalityQuestion.question_id.in_([question["question_id"] for question in PERSONALITY_QUESTIONS])
+        )
+    }
+    missing = [
+        PersonalityQuestion(
+            question_id=question["question_id"],
+            text=question["text"],
+            category="personality",
+            trait=", ".join(question["careers"]),
+            order=order,
+            is_reverse_scored=False
+        )
+        for order, question in enumerate(PERSONALITY_QUESTIONS, start=1)
+        if question["question_id"] not in existing
+    ]
+    db.add_all(missing)
+    return len(missing)
+
+
+def migrate_legacy_traits(db: Session) -> int:
+    """
+    Rewrite the traits still holding one of the old short labels to career
+    areas; a built-in question gets every area the old mapping scored (Q6 and
+    Q14 count for two). Traits that name career areas are never touched.
+    Returns the number of questions changed; not committed.
+    """
+    builtin_careers = {question["question_id"]: question["careers"] for question in PERSONALITY_QUESTIONS}
+    questions = db.query(PersonalityQuestion).filter(
+        PersonalityQuestion.trait.in_(list(LEGACY_TRAIT_LABELS))
+    ).all()
+    for question in questions:
+        career = LEGACY_TRAIT_LABELS[question.trait]
+        careers = builtin_careers.get(question.question_id, [])
+        question.trait = ", ".join(careers if career in careers else [career])
+    return len(questions)
+
+
+@dataclass(frozen=True)
+class PersonalityScoringModel:
+    """Question x career weight matrix of one question bank version"""
+    version: int
+    question_ids: Tuple[str, ...]
+    question_index: Dict[str, int]
+    careers: Tuple[str, ...]
+    weights: np.ndarray
+    reverse_scored: np.ndarray
+
+    @property
+    def questions_per_career(self) -> np.ndarray:
+        return self.weights.sum(axis=0)
+
+    def answer_matrix(self, test_positions: np.ndarray, question_ids: List[str], values: np.ndarray, tests: int) -> np.ndarray:
+        """Dense tests x questions answer matrix; answers to unknown questions are ignored"""
+        columns = np.array([self.question_index.get(question_id, -1) for question_id in question_ids], dtype=np.int64)
+        known = columns >= 0
+        matrix = np.zeros((tests, len(self.question_ids)))
+        matrix[test_positions[known], columns[known]] = values[known]
+        return matrix
+
+    def scores(self, answers: np.ndarray) -> np.ndarray:
+        """tests x careers scores of a tests x questions answer matrix"""
+        adjusted = np.where(self.reverse_scored & (answers > 0), LIKERT_MAX + 1 - answers, answers)
+        return adjusted @ self.weights
+
+
+class PersonalityScorer:
+    """Scores personality answers with the cached, data-driven scoring model"""
+
+    def __init__(self):
+        self._cache = InProcessCache()
+        invalidate_on_commit(self._cache, PersonalityQuestion)
+
+    def model(self, db: Session) -> PersonalityScoringModel:
+        return self._cache.get_or_load("model", lambda: self._load(db))
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def score(self, db: Session, answers: List[Dict]) -> Optional[Dict]:
+        """
+        Career area result of one test's answers (question_id / answer_value
+        dicts), or None if no question is mapped to a career area.
+        """
+        model = self.model(db)
+        if not model.careers:
+            return None
+
+        matrix = model.answer_matrix(
+            np.zeros(len(answers), dtype=np.int64),
+            [answer.get("question_id") for answer in answers],
+            np.array([answer.get("answer_value", NEUTRAL_ANSWER) for answer in answers], dtype=float),
+            tests=1
+        )
+        scores = model.scores(matrix)[0]
+        top = int(np.argmax(scores))
+        career_area = model.careers[top]
+        total_score = float(scores[top])
+        normalized_score = total_score / model.questions_per_career[top]
+        compatibility_level, compatibility_percentage = compatibility(normalized_score)
+        explanation = CAREER_EXPLANATIONS.get(career_area, "")
+
+        return {
+            "career_area": career_area,
+            "score": int(total_score) if total_score.is_integer() else total_score,
+            "normalized_score": round(float(normalized_score), 2),
+            "compatibility_level": compatibility_level,
+            "percentage": compatibility_percentage,
+            "all_scores": {
+                career: int(value) if float(value).is_integer() else float(value)
+                for career, value in zip(model.careers, scores)
+            },
+            "message": f"Kişiliğiniz {career_area} alanına uygun. {explanation} Uygunluk seviyeniz: {compatibility_level}. Bilgi testi aşamasına geçmek için becerilerim sayfasından {career_area} testlerini çözün."
+        }
+
+    def rescore_all(self, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Rescore every stored test that has a result or answers to all
+        questions, committing per chunk. Returns the number of tests scanned,
+        rescored and whose result changed.
+        """
+        model = self.model(db)
+        counts = {"scanned": 0, "rescored": 0, "changed": 0}
+        if not model.careers:
+            return counts
+
+        table = PersonalityTest.__table__
+        update_result = table.update().where(table.c.id == bindparam("test_id")).values(
+            personality_result=bindparam("career_area")
+        )
+        last_test_id = ""
+
+        while True:
+            tests = db.query(
+                PersonalityTest.id, PersonalityTest.answers, PersonalityTest.personality_result
+            ).filter(
+                PersonalityTest.id > last_test_id
+            ).order_by(PersonalityTest.id).limit(chunk_size).all()
+            if not tests:
+                break
+            last_test_id = tests[-1].id
+            test_index = {test.id: i for i, test in enumerate(tests)}
+
+            answers = [
+                (test_index[row.test_id], row.question_id, row.answer_value)
+                for row in db.query(
+                    PersonalityTestAnswer.test_id,
+                    PersonalityTestAnswer.question_id,
+                    PersonalityTestAnswer.answer_value
+                ).filter(PersonalityTestAnswer.test_id.in_(list(test_index)))
+            ]
+            for test in tests:
+                if test.answers:
+                    # Legacy JSON answers; a later answer to the same question wins
+                    legacy = {
+                        answer.get("question_id"): answer.get("answer_value", NEUTRAL_ANSWER)
+                        for answer in json.loads(test.answers)
+                    }
+                    answers.extend((test_index[test.id], question_id, value) for question_id, value in legacy.items())
+
+            matrix = model.answer_matrix(
+                np.array([position for position, _, _ in answers], dtype=np.int64),
+                [question_id for _, question_id, _ in answers],
+                np.array([value for _, _, value in answers], dtype=float),
+                tests=len(tests)
+            )
+            answered = (matrix > 0).sum(axis=1)
+            has_result = np.array([bool(test.personality_result) for test in tests])
+            eligible = (answered > 0) & ((answered >= len(model.question_ids)) | has_result)
+            top = np.argmax(model.scores(matrix), axis=1)
+
+            changes = [
+                {"test_id": test.id, "career_area": model.careers[top[i]]}
+                for i, test in enumerate(tests)
+                if eligible[i] and model.careers[top[i]] != test.personality_result
+            ]
+            if changes:
+                db.execute(update_result, changes)
+            db.commit()
+
+            counts["scanned"] += len(tests)
+            counts["rescored"] += int(eligible.sum())
+            counts["changed"] += len(changes)
+            if len(tests) < chunk_size:
+                break
+
+        logger.info(f"Personality tests rescored: {counts}")
+        return counts
+
+    def _load(self, db: Session) -> PersonalityScoringModel:
+        version = self._cache.version
+        questions = db.query(
+            PersonalityQuestion.question_id,
+            PersonalityQuestion.trait,
+            PersonalityQuestion.is_reverse_scored
+        ).order_by(PersonalityQuestion.order).all()
+
+        traits = []
+        unknown = set()
+        for question in questions:
+            labels = parse_traits(question.trait)
+            unknown.update(label for label in labels if label not in CAREER_EXPLANATIONS)
+            traits.append([label for label in labels if label in CAREER_EXPLANATIONS])
+        if unknown:
+            logger.warning(f"Ignoring unknown personality traits: {', '.join(sorted(unknown))}")
+
+        used = {trait for question_traits in traits for trait in question_traits}
+        careers = [career for career in CAREER_EXPLANATIONS if career in used]
+
+        career_index = {career: i for i, career in enumerate(careers)}
+        weights = np.zeros((len(questions), len(careers)))
+        for q, question_traits in enumerate(traits):
+            for trait in question_traits:
+                weights[q, career_index[trait]] = 1.0
+
+        question_ids = tuple(question.question_id for question in questions)
+        return PersonalityScoringModel(
+            version=version,
+            question_ids=question_ids,
+            question_index={question_id: i for i, question_id in enumerate(question_ids)},
+            careers=tuple(careers),
+            weights=weights,
+            reverse_scored=np.array([bool(question.is_reverse_scored) for question in questions], dtype=bool)
+        )
+
+
+personality_scorer = PersonalityScorer()
@@ -0,0 +1,117 @@
+"""
+Platform counters for the admin usage report.
+
+Registrations, logins, test completions and course enrollments are counted as
+they are written: an ORM `after_flush` listener turns new users, results and
+enrollments (and changes of `User.last_login`) into counter upserts on the
+same connection, so the counters commit or roll back with the data. The
+report reads the small counters table through a short TTL cache instead of
+counting the source tables.
+
+Counters only add to a running total, so each rebuildable counter is seeded
+from a real COUNT of its source table at startup (`prepare_database`), before
+the listener can create its row from the first write.
+
+Only sessions in processes that import this module are counted; writes made
+elsewhere (e.g. by scripts or raw SQL) are picked up by `rebuild`.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache
+from app.crud import counters as counters_crud
+from app.crud.counters import TOTAL_BUCKET, REGISTRATIONS, LOGINS, TEST_COMPLETIONS, COURSE_ENROLLMENTS
+from app.models.user import User
+from app.models.test import UserTestResult
+from app.models.course import UserCourse
+
+# Counted model -> (counter name, timestamp attribute used for the daily bucket)
+_COUNTED_INSERTS = {
+    User: (REGISTRATIONS, "registration_date"),
+    UserTestResult: (TEST_COMPLETIONS, "completion_date"),
+    UserCourse: (COURSE_ENROLLMENTS, "enrollment_date"),
+}
+
+USAGE_REPORT_TTL_SECONDS = 60
+DAILY_HISTORY_DAYS = 30
+
+
+@event.listens_for(Session, "after_flush")
+def _count_platform_events(session, flush_context):
+    events = Counter()
+    for instance in session.new:
+        counted = _COUNTED_INSERTS.get(type(instance))
+        if counted:
+            name, date_attribute = counted
+            events[name, getattr(instance, date_attribute, None) or datetime.utcnow()] += 1
+
+    increments = Counter()
+    for instance in session.deleted:
+        counted = _COUNTED_INSERTS.get(type(instance))
+        if counted:
+            # Deleting rows lowers the running total; daily history is kept
+            increments[counted[0], TOTAL_BUCKET] -= 1
+
+    for instance in session.dirty:
+        # History is still the pre-flush one inside after_flush
+        if isinstance(instance, User) and instance.last_login is not None \
+                and inspect(instance).attrs.last_login.history.has_changes():
+            events[LOGINS, instance.last_login] += 1
+
+    for (name, moment), amount in events.items():
+        increments[name, TOTAL_BUCKET] += amount
+        increments[name, counters_crud.day_key(moment)] += amount
+
+    increments = {key: amount for key, amount in increments.items() if amount}
+    if increments:
+        counters_crud.increment_counters(session.connection(), increments)
+
+
+class PlatformCounters:
+    """Reads the platform counters for the usage report, cached for a short TTL"""
+
+    def __init__(self, ttl_seconds: float = USAGE_REPORT_TTL_SECONDS):
+        self._cache = InProcessCache(ttl_seconds=ttl_seconds)
+
+    def get_usage_report(self, db: Session) -> Dict[str, Any]:
+        return self._cache.get_or_load("usage", lambda: self._build_usage_report(db))
+
+    def rebuild(self, db: Session) -> Dict[str, Any]:
+        totals = counters_crud.rebuild_counters(db)
+        self._cache.invalidate()
+        return totals
+
+    def _build_usage_report(self, db: Session) -> Dict[str, Any]:
+        # Normally seeded at startup; backfill any counter still missing
+        missing = counters_crud.missing_counters(db)
+        if missing:
+            counters_crud.rebuild_counters(db, missing)
+
+        now = datetime.utcnow()
+        totals = counters_crud.get_totals(db)
+        daily = counters_crud.get_daily_counts(db, now - timedelta(days=DAILY_HISTORY_DAYS))
+        new_users = sum(daily.get(REGISTRATIONS, {}).values())
+
+        # Distinct active users cannot be summed from daily counts; this is an
+        # index range scan on users.last_login
+        active_users = db.query(func.count(User.id)).filter(
+            User.last_login >= now - timedelta(days=7)
+        ).scalar() or 0
+
+        return {
+            "total_users": totals.get(REGISTRATIONS, 0),
+            "new_users_last_30_days": new_users,
+            "total_tests_taken": totals.get(TEST_COMPLETIONS, 0),
+            "total_course_enrollments": totals.get(COURSE_ENROLLMENTS, 0),
+            "active_users_last_7_days": active_users,
+            "daily_counts": daily,
+            "report_generated_at": now
+        }
+
+
+platform_counters = PlatformCounters()
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.models.test import Test, Question, Answer
+from app.schemas.knowledge_test import QuestionResponse
+
+_question_list_adapter = TypeAdapter(List[QuestionResponse])
+
+
+@dataclass(frozen=True)
+class QuestionBankEntry:
+    """Fully assembled, immutable question list of a test plus its JSON payload"""
+    test_id: str
+    version: int
+    questions: Tuple[QuestionResponse, ...]
+    payload: bytes
+
+
+class QuestionBank:
+    """
+    Read-mostly cache of knowledge test question banks. A miss loads the
+    questions and their answers with two queries (selectinload), and the entry
+    is dropped when the content version changes, i.e. whenever a test,
+    question or answer is committed.
+    """
+
+    def __init__(self):
+        self._cache = InProcessCache()
+        invalidate_on_commit(self._cache, Test, Question, Answer)
+
+    @property
+    def version(self) -> int:
+        """Current content version of the question banks"""
+        return self._cache.version
+
+    def get(self, db: Session, test_id: str) -> QuestionBankEntry:
+        return self._cache.get_or_load(test_id, lambda: self._load(db, test_id))
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def _load(self, db: Session, test_id: str) -> QuestionBankEntry:
+        version = self._cache.version
+        questions = db.query(Question).options(
+            selectinload(Question.answers)
+        ).filter(
+            Question.test_id == test_id
+        ).order_by(Question.order).all()
+
+        assembled = tuple(
+            QuestionResponse(
+                id=question.id,
+                question_text=question.question_text,
+                order=question.order,
+                difficulty=question.difficulty.value if question.difficulty else "orta",
+                answers=[
+                    {
+                        "id": answer.id,
+                        "text": answer.answer_text
+                    }
+                    for answer in question.answers
+                ]
+            )
+            for question in questions
+        )
+
+        return QuestionBankEntry(
+            test_id=test_id,
+            version=version,
+            questions=assembled,
+            payload=_question_list_adapter.dump_json(list(assembled))
+        )
+
+
+question_bank = QuestionBank()
@@ -0,0 +1,194 @@
+"""
+Set-based migration of user roadmaps to the current roadmap templates.
+
+The work is split in two phases:
+- `sync_templates` brings the shared template steps (career_path_steps) in
+  line with the registry. This touches a handful of rows per career path.
+- `migrate_chunk` moves one range of user roadmaps (by id) to the template
+  layout with a few INSERT ... SELECT / DELETE ... WHERE statements, no
+  matter how many roadmaps the range holds:
+  1. legacy roadmap_steps rows become status rows of the matching template
+     step (same order); duplicates keep the most recently created row
+  2. the migrated legacy rows are deleted
+  3. template steps without a status row get a not-started one
+  4. the step counters and progress of the range are recounted
+
+Nothing is committed here, so callers decide between committing and rolling
+back (dry runs). Chunks are disjoint and can run in parallel sessions.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    String, DateTime, and_, cast, delete, exists, func, insert, literal, select
+)
+from sqlalchemy.orm import Session
+
+from app.crud import roadmaps as roadmap_crud
+from app.models.base import generate_uuid
+from app.models.roadmap import CareerPath, CareerPathStep, UserRoadmap, RoadmapStep, UserRoadmapStep, StepStatus
+from app.services.roadmap_templates import roadmap_template_registry, roadmap_template_resolver
+
+DEFAULT_CHUNK_SIZE = 5000
+
+_STATUS_COLUMNS = ["id", "roadmap_id", "step_id", "status", "completion_date", "created_at", "updated_at"]
+
+
+@dataclass
+class ChunkResult:
+    lower: Optional[str]
+    upper: Optional[str]
+    migrated_statuses: int = 0
+    deleted_legacy_steps: int = 0
+    added_statuses: int = 0
+    recounted_roadmaps: int = 0
+
+
+def _uuid_sql(db: Session):
+    """SQL expression generating a UUID string per row"""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.gen_random_uuid(), String)
+    parts = [func.lower(func.hex(func.randomblob(size)), type_=String) for size in (4, 2, 2, 2, 6)]
+    uuid = parts[0]
+    for part in parts[1:]:
+        uuid = uuid + "-" + part
+    return uuid
+
+
+def _in_range(lower: Optional[str], upper: Optional[str]) -> List:
+    conditions = []
+    if lower is not None:
+        conditions.append(UserRoadmap.id > lower)
+    if upper is not None:
+        conditions.append(UserRoadmap.id <= upper)
+    return conditions
+
+
+def sync_templates(db: Session) -> Dict[str, Dict[str, int]]:
+    """
+    Create missing registry career paths, make their template steps match the
+    registry and seed the template of every other career path in use.
+    Returns insert/update/delete counts per career path title.
+    """
+    changes = {}
+    for title in roadmap_template_registry.titles():
+        template = roadmap_template_registry.get(title)
+        career_path = db.query(CareerPath).filter(CareerPath.title == title).first()
+        if career_path is None:
+            career_path = CareerPath(
+                id=generate_uuid(),
+                title=title,
+                description=template.description,
+                avg_salary=90000.0
+            )
+            career_path.skills = list(template.skills)
+            db.add(career_path)
+            db.flush()
+        changes[title] = roadmap_crud.sync_career_path_steps(db, career_path, template)
+
+    seeded_paths = select(CareerPathStep.career_path_id)
+    unseeded = db.query(CareerPath).filter(
+        CareerPath.id.in_(select(UserRoadmap.career_path_id)),
+        CareerPath.id.not_in(seeded_paths)
+    ).all()
+    for career_path in unseeded:
+        template = roadmap_template_resolver.resolve(db, career_path)
+        changes[career_path.title] = {"updated": 0, "inserted": len(template.steps), "deleted": 0}
+    return changes
+
+
+def chunk_bounds(db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    (lower, upper] roadmap id ranges of at most `chunk_size` roadmaps each,
+    found with one window query instead of paging through the table.
+    """
+    numbered = select(
+        UserRoadmap.id,
+        func.row_number().over(order_by=UserRoadmap.id).label("position")
+    ).subquery()
+    boundaries = [
+        row.id for row in db.execute(
+            select(numbered.c.id).where(numbered.c.position % chunk_size == 0).order_by(numbered.c.id)
+        )
+    ]
+
+    bounds = []
+    lower = None
+    for upper in boundaries:
+        bounds.append((lower, upper))
+        lower = upper
+    bounds.append((lower, None))
+    return bounds
+
+
+def migrate_chunk(db: Session, lower: Optional[str], upper: Optional[str]) -> ChunkResult:
+    """Migrate the roadmaps with lower < id <= upper to the template layout (not committed)"""
+    result = ChunkResult(lower=lower, upper=upper)
+    in_range = _in_range(lower, upper)
+    now = literal(datetime.utcnow(), DateTime)
+    has_statuses = exists().where(UserRoadmapStep.roadmap_id == UserRoadmap.id)
+    has_legacy_steps = exists().where(RoadmapStep.roadmap_id == UserRoadmap.id)
+
+    # 1. Legacy step rows -> status rows of the template step with the same order
+    ranked = select(
+        RoadmapStep.roadmap_id,
+        RoadmapStep.order,
+        RoadmapStep.status,
+        RoadmapStep.completion_date,
+        func.row_number().over(
+            partition_by=(RoadmapStep.roadmap_id, RoadmapStep.order),
+            order_by=(RoadmapStep.created_at.desc(), RoadmapStep.id.desc())
+        ).label("recency")
+    ).join(
+        UserRoadmap, UserRoadmap.id == RoadmapStep.roadmap_id
+    ).where(*in_range, ~has_statuses).subquery()
+
+    legacy_statuses = select(
+        _uuid_sql(db), ranked.c.roadmap_id, CareerPathStep.id, ranked.c.status, ranked.c.completion_date, now, now
+    ).select_from(ranked).join(
+        UserRoadmap, UserRoadmap.id == ranked.c.roadmap_id
+    ).join(
+        CareerPathStep, and_(
+            CareerPathStep.career_path_id == UserRoadmap.career_path_id,
+            CareerPathStep.order == ranked.c.order
+        )
+    ).where(ranked.c.recency == 1)
+    result.migrated_statuses = db.execute(
+        insert(UserRoadmapStep).from_select(_STATUS_COLUMNS, legacy_statuses)
+    ).rowcount
+
+    # 2. Drop the legacy rows of every roadmap that now has status rows
+    result.deleted_legacy_steps = db.execute(
+        delete(RoadmapStep).where(
+            RoadmapStep.roadmap_id.in_(select(UserRoadmap.id).where(*in_range, has_statuses))
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+
+    # 3. Not-started rows for template steps a roadmap has no status for yet
+    missing_statuses = select(
+        _uuid_sql(db),
+        UserRoadmap.id,
+        CareerPathStep.id,
+        literal(StepStatus.NOT_STARTED, UserRoadmapStep.status.type),
+        literal(None, DateTime),
+        now,
+        now
+    ).select_from(UserRoadmap).join(
+        CareerPathStep, CareerPathStep.career_path_id == UserRoadmap.career_path_id
+    ).where(
+        *in_range,
+        ~has_legacy_steps,
+        ~exists().where(
+            UserRoadmapStep.roadmap_id == UserRoadmap.id,
+            UserRoadmapStep.step_id == CareerPathStep.id
+        )
+    )
+    result.added_statuses = db.execute(
+        insert(UserRoadmapStep).from_select(_STATUS_COLUMNS, missing_statuses)
+    ).rowcount
+
+    # 4. Counters and progress of the whole range
+    result.recounted_roadmaps = roadmap_crud.recompute_progress(db, *in_range)
+    return result
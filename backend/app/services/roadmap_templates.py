@@ -0,0 +1,220 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.models.base import generate_uuid
+from app.models.roadmap import CareerPath, CareerPathStep, UserRoadmap, RoadmapStep
+from app.data.roadmap_templates import (
+    ROADMAP_TEMPLATES_VERSION, DEFAULT_CAREER_PATH, roadmap_templates, default_roadmap_steps
+)
+
+
+@dataclass(frozen=True)
+class RoadmapTemplateStep:
+    order: int
+    title: str
+    description: str
+    tasks_count: Optional[int] = None
+    duration: Optional[str] = None
+    # CareerPathStep id once the step is stored
+    id: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RoadmapTemplate:
+    """Canonical steps of a career path roadmap"""
+    career_path_title: str
+    description: str
+    skills: Tuple[str, ...]
+    steps: Tuple[RoadmapTemplateStep, ...]
+
+
+def _build_steps(steps: List[Dict]) -> Tuple[RoadmapTemplateStep, ...]:
+    return tuple(
+        RoadmapTemplateStep(order=i + 1, **step)
+        for i, step in enumerate(steps)
+    )
+
+
+class RoadmapTemplateRegistry:
+    """
+    Roadmap templates keyed by career path title. The registry is built once
+    from app.data.roadmap_templates; `version` changes whenever the templates
+    do, so stored roadmaps can tell which template they were created from.
+    """
+
+    def __init__(self, templates: Dict[str, Dict], fallback_steps: List[Dict], version: int):
+        self.version = version
+        self._templates = {
+            title: RoadmapTemplate(
+                career_path_title=title,
+                description=template["description"],
+                skills=tuple(template["skills"]),
+                steps=_build_steps(template["steps"])
+            )
+            for title, template in templates.items()
+        }
+        self._fallback_steps = _build_steps(fallback_steps)
+
+    def titles(self) -> List[str]:
+        return list(self._templates)
+
+    def get(self, career_path_title: str) -> RoadmapTemplate:
+        """Template of a career path, or the generic steps for paths without one"""
+        template = self._templates.get(career_path_title)
+        if template is None:
+            template = RoadmapTemplate(
+                career_path_title=career_path_title,
+                description=f"{career_path_title} kariyeri için yol haritası",
+                skills=(),
+                steps=self._fallback_steps
+            )
+        return template
+
+    def has_template(self, career_path_title: str) -> bool:
+        return career_path_title in self._templates
+
+    @property
+    def default_template(self) -> RoadmapTemplate:
+        return self._templates[DEFAULT_CAREER_PATH]
+
+
+roadmap_template_registry = RoadmapTemplateRegistry(
+    roadmap_templates, default_roadmap_steps, ROADMAP_TEMPLATES_VERSION
+)
+
+# user_id of the curated per-career-path roadmaps written by update_roadmap_steps.py
+EXAMPLE_ROADMAP_USER = "example"
+
+
+def _template_owner(instance) -> str:
+    return instance.id if isinstance(instance, CareerPath) else instance.career_path_id
+
+
+class RoadmapTemplateResolver:
+    """
+    Template steps of a career path, shared by every roadmap of that path.
+    They are stored once in career_path_steps and cached per career path, so
+    building or creating a roadmap costs the same however many roadmaps
+    already exist, and editing a stored step applies to every user at once.
+
+    The first time a career path is resolved its steps are seeded from the
+    curated example roadmap if there is one, otherwise from the registry.
+    Template edits committed through the ORM drop the entry right away; edits
+    from scripts in another process are picked up after the TTL.
+    """
+
+    def __init__(self, registry: RoadmapTemplateRegistry, ttl_seconds: float = 600):
+        self.registry = registry
+        self._cache = InProcessCache(ttl_seconds=ttl_seconds)
+        invalidate_on_commit(self._cache, CareerPath, CareerPathStep, key=_template_owner)
+
+    def resolve(self, db: Session, career_path: CareerPath) -> RoadmapTemplate:
+        template = self._cache.get_or_load(career_path.id, lambda: self._load(db, career_path))
+        if template is None:
+            # Not cached: the seeded steps only become visible once committed
+            self._cache.invalidate(career_path.id)
+            template = self._seed(db, career_path)
+        return template
+
+    def invalidate(self, career_path_id: Optional[str] = None) -> None:
+        self._cache.invalidate(career_path_id)
+
+    def _load(self, db: Session, career_path: CareerPath) -> Optional[RoadmapTemplate]:
+        steps = db.query(CareerPathStep).filter(
+            CareerPathStep.career_path_id == career_path.id
+        ).order_by(CareerPathStep.order).all()
+        if not steps:
+            return None
+
+        template = self.registry.get(career_path.title)
+        return RoadmapTemplate(
+            career_path_title=career_path.title,
+            description=template.description,
+            skills=template.skills,
+            steps=tuple(
+                RoadmapTemplateStep(
+                    order=step.order,
+                    title=step.title,
+                    description=step.description,
+                    tasks_count=step.tasks_count,
+                    duration=step.duration,
+                    id=step.id
+                )
+                for step in steps
+            )
+        )
+
+    def _seed(self, db: Session, career_path: CareerPath) -> RoadmapTemplate:
+        """
+        Store the initial template steps of a career path (flushed, not
+        committed). Steps another request stored first are kept, and the
+        stored steps are read back so both requests use the same step ids.
+        """
+        template = self._initial_template(db, career_path)
+        if not template.steps:
+            return template
+
+        rows = [
+            {
+                "id": generate_uuid(),
+                "career_path_id": career_path.id,
+                "title": step.title,
+                "description": step.description,
+                "order": step.order,
+                "tasks_count": step.tasks_count,
+                "duration": step.duration,
+                "template_version": self.registry.version
+            }
+            for step in template.steps
+        ]
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(CareerPathStep)
+            db.execute(statement.on_conflict_do_nothing(index_elements=["career_path_id", "order"]), rows)
+        else:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(CareerPathStep), rows)
+            except IntegrityError:
+                pass
+        return self._load(db, career_path)
+
+    def _initial_template(self, db: Session, career_path: CareerPath) -> RoadmapTemplate:
+        template = self.registry.get(career_path.title)
+        steps = db.query(RoadmapStep.title, RoadmapStep.description).join(
+            UserRoadmap, UserRoadmap.id == RoadmapStep.roadmap_id
+        ).filter(
+            UserRoadmap.career_path_id == career_path.id,
+            UserRoadmap.user_id == EXAMPLE_ROADMAP_USER
+        ).order_by(RoadmapStep.order).all()
+        if not steps:
+            return template
+
+        # Keep the registry's step metadata where the example roadmap still matches it
+        known_steps = {step.title: step for step in template.steps}
+        resolved_steps = []
+        for i, step in enumerate(steps):
+            known = known_steps.get(step.title)
+            resolved_steps.append(RoadmapTemplateStep(
+                order=i + 1,
+                title=step.title,
+                description=step.description,
+                tasks_count=known.tasks_count if known else None,
+                duration=known.duration if known else None
+            ))
+
+        return RoadmapTemplate(
+            career_path_title=template.career_path_title,
+            description=template.description,
+            skills=template.skills,
+            steps=tuple(resolved_steps)
+        )
+
+
+roadmap_template_resolver = RoadmapTemplateResolver(roadmap_template_registry)
@@ -0,0 +1,62 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.models.test import Test, Question, Answer
+from app.schemas.test import TestDetailResponse
+
+
+@dataclass(frozen=True)
+class TestDetailEntry:
+    """Serialized detail response of a test and its entity tag"""
+    test_id: str
+    version: int
+    payload: bytes
+    etag: str
+
+
+class TestDetailCache:
+    """
+    Read-mostly cache of serialized `TestDetailResponse` bodies. A miss loads
+    the test with its questions and answers in three queries (selectinload)
+    and serializes it once; the entries are dropped whenever a test, question
+    or answer is committed. Unknown test ids are not cached.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self._cache = InProcessCache(max_entries=max_entries)
+        invalidate_on_commit(self._cache, Test, Question, Answer)
+
+    def get(self, db: Session, test_id: str) -> Optional[TestDetailEntry]:
+        entry = self._cache.get_or_load(test_id, lambda: self._load(db, test_id))
+        if entry is None:
+            self._cache.invalidate(test_id)
+        return entry
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def _load(self, db: Session, test_id: str) -> Optional[TestDetailEntry]:
+        version = self._cache.version
+        test = db.query(Test).options(
+            selectinload(Test.questions).selectinload(Question.answers)
+        ).filter(Test.id == test_id).first()
+        if test is None:
+            return None
+
+        detail = TestDetailResponse.model_validate(test)
+        detail.questions.sort(key=lambda question: question.order)
+        payload = detail.model_dump_json().encode()
+
+        return TestDetailEntry(
+            test_id=test_id,
+            version=version,
+            payload=payload,
+            etag=f'"{hashlib.sha1(payload).hexdigest()}"'
+        )
+
+
+test_detail_cache = TestDetailCache()
@@ -0,0 +1,101 @@
+from typing import List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.models.roadmap import CareerPath, CareerPathStep, UserRoadmap, RoadmapStep, UserRoadmapStep, StepStatus
+from app.schemas.roadmap import UserRoadmapResponse, RoadmapStepResponse, CareerPathResponse
+from app.services.roadmap_templates import roadmap_template_resolver
+
+
+def build_roadmap_response(db: Session, roadmap: UserRoadmap) -> UserRoadmapResponse:
+    """
+    Assemble a roadmap response from the cached template steps of its career
+    path and the user's step statuses. Step ids are template step ids; a step
+    without a status row is not started. Roadmaps created before template
+    steps were shared are served from their own step rows.
+    """
+    statuses = {row.step_id: row for row in roadmap.step_statuses}
+    if statuses:
+        template = roadmap_template_resolver.resolve(db, roadmap.career_path)
+        steps: List[RoadmapStepResponse] = []
+        for step in template.steps:
+            status_row = statuses.get(step.id)
+            steps.append(RoadmapStepResponse(
+                id=step.id,
+                roadmap_id=roadmap.id,
+                title=step.title,
+                description=step.description,
+                order=step.order,
+                status=status_row.status if status_row else StepStatus.NOT_STARTED,
+                completion_date=status_row.completion_date if status_row else None,
+                created_at=status_row.created_at if status_row else roadmap.created_date,
+                updated_at=status_row.updated_at if status_row else roadmap.last_updated
+            ))
+    else:
+        steps = [RoadmapStepResponse.model_validate(step) for step in roadmap.steps]
+
+    return UserRoadmapResponse(
+        id=roadmap.id,
+        user_id=roadmap.user_id,
+        career_path_id=roadmap.career_path_id,
+        progress_percentage=roadmap.progress_percentage or 0.0,
+        created_date=roadmap.created_date,
+        last_updated=roadmap.last_updated,
+        steps=steps,
+        career_path=CareerPathResponse.model_validate(roadmap.career_path)
+    )
+
+
+def _roadmap_owner(instance) -> Optional[str]:
+    """User whose roadmap a written row affects (None = unknown or shared, drop every roadmap)"""
+    if isinstance(instance, UserRoadmap):
+        return instance.user_id
+    if isinstance(instance, (RoadmapStep, UserRoadmapStep)):
+        if "roadmap" in inspect(instance).unloaded or instance.roadmap is None:
+            return None
+        return instance.roadmap.user_id
+    # Career path and template step edits change every roadmap of the path
+    return None
+
+
+class UserRoadmapService:
+    """
+    Serves assembled `UserRoadmapResponse`s per user. A miss loads the roadmap
+    with its career path, status rows and legacy steps eagerly (one joined and
+    two selectin queries, steps ordered in SQL) and adds the cached template
+    steps. Entries are dropped when the user's roadmap or one of its steps is
+    committed, and on any career path or template step edit.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 10000):
+        self._cache = InProcessCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        invalidate_on_commit(
+            self._cache, UserRoadmap, RoadmapStep, UserRoadmapStep, CareerPath, CareerPathStep,
+            key=_roadmap_owner
+        )
+
+    def get(self, db: Session, user_id: str) -> Optional[UserRoadmapResponse]:
+        """The user's roadmap, or None if they do not have one yet"""
+        response = self._cache.get_or_load(user_id, lambda: self._load(db, user_id))
+        if response is None:
+            self._cache.invalidate(user_id)
+        return response
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        self._cache.invalidate(user_id)
+
+    @staticmethod
+    def _load(db: Session, user_id: str) -> Optional[UserRoadmapResponse]:
+        roadmap = db.query(UserRoadmap).options(
+            joinedload(UserRoadmap.career_path),
+            selectinload(UserRoadmap.step_statuses),
+            selectinload(UserRoadmap.steps)
+        ).filter(UserRoadmap.user_id == user_id).first()
+        if roadmap is None:
+            return None
+        return build_roadmap_response(db, roadmap)
+
+
+user_roadmap_service = UserRoadmapService()
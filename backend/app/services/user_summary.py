@@ -0,0 +1,86 @@
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import InProcessCache, invalidate_on_commit
+from app.crud import user_activity as user_activity_crud
+from app.services import achievements
+from app.models.achievement import UserAchievement
+from app.models.test import UserTestResult
+from app.models.course import UserCourse
+from app.models.roadmap import UserRoadmap, RoadmapStep, UserRoadmapStep, CareerPathStep
+from app.schemas.user import (
+    UserProgressResponse,
+    UserStatistics,
+    AchievementResponse,
+    RoadmapSummary,
+    UserHomeSummaryResponse
+)
+
+# For MVP, skills are placeholders; in a real implementation they would be
+# derived from test results and course progress
+BEST_SKILLS = ["Problem Solving", "Python Programming", "Data Structures"]
+AREAS_TO_IMPROVE = ["Algorithms", "System Design", "Front-end Development"]
+
+
+def _summary_owner(instance) -> Optional[str]:
+    """User whose summary a written row affects (None = unknown, drop every summary)"""
+    if isinstance(instance, CareerPathStep):
+        # Template step changes move the step totals of every roadmap of the path
+        return None
+    if isinstance(instance, (RoadmapStep, UserRoadmapStep)):
+        if "roadmap" in inspect(instance).unloaded or instance.roadmap is None:
+            return None
+        return instance.roadmap.user_id
+    return instance.user_id
+
+
+class UserSummaryService:
+    """
+    Assembles the user home summary (progress, statistics, achievements and
+    roadmap) from two aggregate queries and the achievements lookup.
+    Summaries are cached per user for a short TTL and dropped when that
+    user's results, courses, roadmap or achievements are committed.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self._cache = InProcessCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        invalidate_on_commit(
+            self._cache, UserTestResult, UserCourse, UserRoadmap, RoadmapStep, UserRoadmapStep, CareerPathStep, UserAchievement,
+            key=_summary_owner
+        )
+
+    def get(self, db: Session, user_id: str) -> UserHomeSummaryResponse:
+        return self._cache.get_or_load(user_id, lambda: self._load(db, user_id))
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        self._cache.invalidate(user_id)
+
+    @staticmethod
+    def _load(db: Session, user_id: str) -> UserHomeSummaryResponse:
+        counts = user_activity_crud.get_activity_counts(db, user_id)
+        roadmap = user_activity_crud.get_roadmap_summary(db, user_id)
+
+        return UserHomeSummaryResponse(
+            progress=UserProgressResponse(
+                tests_completed=counts["tests_completed"],
+                courses_enrolled=counts["courses_enrolled"],
+                courses_completed=counts["courses_completed"],
+                roadmap_progress=roadmap["progress_percentage"] if roadmap else 0.0
+            ),
+            stats=UserStatistics(
+                tests_taken=counts["tests_completed"],
+                avg_test_score=counts["avg_test_score"],
+                best_skills=BEST_SKILLS,
+                areas_to_improve=AREAS_TO_IMPROVE
+            ),
+            achievements=[
+                AchievementResponse(**achievement)
+                for achievement in achievements.get_user_achievements(db, user_id)
+            ],
+            roadmap=RoadmapSummary(**roadmap) if roadmap else None
+        )
+
+
+user_summary_service = UserSummaryService()
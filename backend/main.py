@@ -10,11 +10,12 @@ from sqlalchemy.exc import SQLAlchemyError
 from jose.exceptions import JWTError
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.services.database_setup import prepare_database
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 from app.api.routes import auth, tests, roadmaps, courses, users, admin, personality_test, knowledge_test, career_paths, weekly_plan, study_plan, chat, analytics
+
+# Create database tables and upgrade existing ones (after the routers have imported every model)
+prepare_database()
 from app.middleware.error_handlers import (
     sqlalchemy_exception_handler,
     jwt_exception_handler,
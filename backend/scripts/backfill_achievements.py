@@ -0,0 +1,61 @@
+"""
+Bu script, mevcut kullanıcıların kazandığı başarımları user_achievements
+tablosuna yazar.
+- Tüm kurallar her kullanıcı için değerlendirilir; kazanılma tarihi verilerden hesaplanır
+- Sadece olay anında kanıtlanabilen başarımlar (ör. silinen tamamlanmış görevler) atlanır
+- Zaten kazanılmış başarımlar atlanır (tekrar çalıştırılabilir)
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, Base, engine
+import app.models  # noqa: F401 - register every model
+from app.models.user import User
+from app.services import achievements
+
+
+def main(chunk_size=500):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print("Başarımlar hesaplanıyor...")
+        last_id = ""
+        users = 0
+        earned = 0
+
+        while True:
+            user_ids = [
+                row.id for row in db.query(User.id).filter(
+                    User.id > last_id
+                ).order_by(User.id).limit(chunk_size)
+            ]
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            for user_id in user_ids:
+                earned += len(achievements.evaluate_achievements(db, user_id, (), all_rules=True))
+            db.commit()
+
+            users += len(user_ids)
+            print(f"{users} kullanıcı işlendi, {earned} başarım eklendi.")
+
+        print("Başarımlar başarıyla güncellendi!")
+
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    main(chunk_size=args.chunk_size)
@@ -0,0 +1,115 @@
+"""
+Bu script, user_test_results.result_data içindeki JSON cevaplarını
+user_test_answers tablosuna taşır.
+- Sadece henüz cevap satırı olmayan sonuçları işler (tekrar çalıştırılabilir)
+- Sonuçları sabit boyutlu parçalar halinde okur ve her parçayı tek commit ile yazar
+"""
+
+import sys
+import os
+import json
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import exists
+
+from app.core.database import SessionLocal, Base, engine
+import app.models  # noqa: F401 - register every model
+from app.models.test import Question, UserTestResult, UserTestAnswer
+
+
+def extract_answers(result_data):
+    """Eski JSON formatlarından (bilgi testi ve genel test) cevap satırlarını çıkarır"""
+    if not result_data:
+        return []
+    try:
+        data = json.loads(result_data)
+    except (TypeError, json.JSONDecodeError):
+        return []
+
+    if isinstance(data, dict):
+        items = data.get("detailed_results") or data.get("answers") or []
+    elif isinstance(data, list):
+        items = data
+    else:
+        return []
+
+    answers = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("question_id"):
+            continue
+        is_correct = item.get("is_correct")
+        answers.append({
+            "question_id": item["question_id"],
+            "answer_id": item.get("answer_id") or item.get("selected_answer_id"),
+            "text_answer": item.get("text_answer"),
+            "is_correct": is_correct,
+            "score": item.get("score", 1.0 if is_correct else 0.0)
+        })
+    return answers
+
+
+def main(chunk_size=1000):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print("user_test_answers tablosu dolduruluyor...")
+        last_id = ""
+        migrated_results = 0
+        migrated_answers = 0
+
+        while True:
+            results = db.query(
+                UserTestResult.id,
+                UserTestResult.user_id,
+                UserTestResult.test_id,
+                UserTestResult.result_data
+            ).filter(
+                UserTestResult.id > last_id,
+                ~exists().where(UserTestAnswer.result_id == UserTestResult.id)
+            ).order_by(UserTestResult.id).limit(chunk_size).all()
+
+            if not results:
+                break
+            last_id = results[-1].id
+
+            parsed = [(result, extract_answers(result.result_data)) for result in results]
+            question_ids = {answer["question_id"] for _, answers in parsed for answer in answers}
+            existing_questions = {
+                row.id for row in db.query(Question.id).filter(Question.id.in_(question_ids))
+            } if question_ids else set()
+
+            rows = [
+                UserTestAnswer(
+                    result_id=result.id,
+                    user_id=result.user_id,
+                    test_id=result.test_id,
+                    **answer
+                )
+                for result, answers in parsed
+                for answer in answers
+                if answer["question_id"] in existing_questions
+            ]
+            db.add_all(rows)
+            db.commit()
+
+            migrated_results += len(results)
+            migrated_answers += len(rows)
+            print(f"{migrated_results} sonuç işlendi, {migrated_answers} cevap satırı eklendi.")
+
+        print("user_test_answers tablosu başarıyla dolduruldu!")
+
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    main(chunk_size=args.chunk_size)
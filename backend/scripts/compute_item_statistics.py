@@ -0,0 +1,50 @@
+"""
+Bu script, bilgi testi sorularının madde istatistiklerini (p değeri, ayırt
+edicilik ve çeldirici seçilme oranları) hesaplayıp question_statistics
+tablosuna yazar.
+- Sonuçları sabit boyutlu parçalar halinde okur, bellek kullanımı sınırlıdır
+- --test-id verilmezse tüm bilgi testleri için çalışır
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, Base, engine
+import app.models  # noqa: F401 - register every model
+from app.services import item_statistics
+
+
+def main(test_id=None, chunk_size=item_statistics.DEFAULT_CHUNK_SIZE):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        print("Madde istatistikleri hesaplanıyor...")
+
+        if test_id:
+            attempts = {test_id: item_statistics.compute_test_statistics(db, test_id, chunk_size)}
+        else:
+            attempts = item_statistics.compute_all_statistics(db, chunk_size)
+
+        for current_test_id, count in attempts.items():
+            print(f"Test {current_test_id}: {count} deneme işlendi.")
+        print(f"Madde istatistikleri {time.monotonic() - started:.1f} saniyede güncellendi!")
+
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--test-id", default=None)
+    parser.add_argument("--chunk-size", type=int, default=item_statistics.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    main(test_id=args.test_id, chunk_size=args.chunk_size)
@@ -0,0 +1,42 @@
+"""
+Bu script, user_roadmaps tablosundaki adım sayaçlarını (completed_steps,
+total_steps) ve ilerleme yüzdesini yeniden hesaplar.
+- Sayaç sütunları olmayan eski veritabanlarına bu sütunları ekler (uygulama
+  da başlangıçta ekler ve sayaçları bir kez hesaplar)
+- Sayaçlar her adım güncellemesinde artımlı tutulur; bu script ilk kurulum,
+  tutarsızlık veya eski veriler için tek bir toplu UPDATE çalıştırır
+"""
+
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, Base, engine
+import app.models  # noqa: F401 - register every model
+from app.crud import roadmaps as roadmap_crud
+from app.services.database_setup import add_missing_columns
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    # create_all mevcut tablolara sütun eklemez
+    for name in add_missing_columns(engine):
+        print(f"{name} sütunu eklendi.")
+    db = SessionLocal()
+    try:
+        print("Roadmap ilerleme sayaçları yeniden hesaplanıyor...")
+        roadmaps = roadmap_crud.recompute_progress(db)
+        db.commit()
+        print(f"{roadmaps} roadmap için sayaçlar başarıyla güncellendi!")
+
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
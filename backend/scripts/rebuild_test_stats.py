@@ -0,0 +1,35 @@
+"""
+Bu script, admin test raporunun okuduğu test_stats tablosunu
+user_test_results tablosundan yeniden hesaplar.
+- Her test için çözülme sayısı, puan toplamı, puan kareleri toplamı ve soru sayısı
+- Tablo her gönderimde artımlı güncellenir; bu script tutarsızlık veya eski veriler için
+"""
+
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, Base, engine
+import app.models  # noqa: F401 - register every model
+from app.crud import test_stats as test_stats_crud
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print("test_stats tablosu yeniden hesaplanıyor...")
+        tests = test_stats_crud.rebuild_test_stats(db)
+        print(f"{tests} test için istatistikler başarıyla güncellendi!")
+
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
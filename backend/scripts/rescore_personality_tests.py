@@ -0,0 +1,46 @@
+"""
+Bu script, kayıtlı tüm kişilik testlerini güncel soru - kariyer eşleşmesiyle
+yeniden puanlar ve değişen sonuçları personality_tests tablosuna yazar.
+- Testleri sabit boyutlu parçalar halinde okur ve NumPy ile toplu puanlar
+- Soruların trait veya is_reverse_scored alanları değiştiğinde çalıştırılır
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, Base, engine
+import app.models  # noqa: F401 - register every model
+from app.services import personality_scoring
+
+
+def main(chunk_size=personality_scoring.DEFAULT_CHUNK_SIZE):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        print("Kişilik testleri yeniden puanlanıyor...")
+
+        counts = personality_scoring.personality_scorer.rescore_all(db, chunk_size)
+
+        print(
+            f"{counts['scanned']} test tarandı, {counts['rescored']} test puanlandı, "
+            f"{counts['changed']} sonuç değişti ({time.monotonic() - started:.1f} saniye)."
+        )
+
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=personality_scoring.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    main(chunk_size=args.chunk_size)
@@ -1,317 +1,192 @@
 """
-Bu script, roadmap_steps tablosunu güncellemek için kullanılır.
-- Backend için olan mükerrer kayıtları siler
-- Proje Yönetimi, Veri Analizi ve UX Tasarımı için yeni roadmap aşamalarını ekler
+Bu script, roadmap'leri güncel şablon aşamalarına taşıyan toplu migration aracıdır.
+- Her kariyer alanının paylaşılan şablon aşamalarını (career_path_steps) şablon kaydıyla eşitler
+- Eski roadmap_steps kayıtlarını (mükerrerler dahil) kullanıcı durum satırlarına taşır ve siler
+- Şablona yeni eklenen aşamalar için eksik durum satırlarını ekler, sayaçları yeniden hesaplar
+
+Roadmap'ler id aralıklarına (chunk) bölünür; her chunk satır satır değil, birkaç
+INSERT ... SELECT / DELETE ... WHERE ifadesiyle tek işlemde (transaction) güncellenir.
+
+Kullanım:
+    python scripts/update_roadmap_steps.py --dry-run
+    python scripts/update_roadmap_steps.py --chunk-size 5000 --checkpoint roadmap_migration.json
+    python scripts/update_roadmap_steps.py --workers 4   # yalnızca PostgreSQL
 """
 
 import sys
 import os
 import json
-from datetime import datetime
-from uuid import uuid4
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import SessionLocal
-from app.models.roadmap import CareerPath, UserRoadmap, RoadmapStep, StepStatus
+from app.core.database import SessionLocal, engine
+import app.models  # noqa: F401 - register every model
+from app.services import roadmap_migration
+from app.services.database_setup import prepare_database
+from app.services.roadmap_templates import roadmap_template_registry
+
+
+def load_checkpoint(path, chunk_size):
+    """Aynı şablon sürümü ve chunk boyutu için kaydedilmiş ilerlemeyi okur"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    if checkpoint.get("template_version") != roadmap_template_registry.version \
+            or checkpoint.get("chunk_size") != chunk_size:
+        print("Checkpoint farklı bir şablon sürümüne veya chunk boyutuna ait, baştan başlanıyor.")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    """Checkpoint dosyasını atomik olarak yazar"""
+    if not path:
+        return
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(temp_path, path)
+
+
+def print_template_changes(changes, dry_run):
+    verb = "değişecek" if dry_run else "eşitlendi"
+    for title, counts in changes.items():
+        print(
+            f"'{title}' şablon aşamaları {verb}: "
+            f"{counts['inserted']} eklenen, {counts['updated']} güncellenen, {counts['deleted']} silinen"
+        )
+
+
+def print_chunk(position, total, result, started):
+    lower = result.lower[:8] if result.lower else "başlangıç"
+    upper = result.upper[:8] if result.upper else "son"
+    elapsed = time.monotonic() - started
+    print(
+        f"[{position}/{total}] {lower}..{upper}: "
+        f"{result.migrated_statuses} durum taşındı, {result.deleted_legacy_steps} eski adım silindi, "
+        f"{result.added_statuses} eksik durum eklendi, {result.recounted_roadmaps} roadmap sayıldı "
+        f"({elapsed:.1f} sn)"
+    )
+
+
+def migrate_chunk(lower, upper):
+    """Bir chunk'ı kendi oturumunda ve kendi işleminde (transaction) taşır"""
+    db = SessionLocal()
+    try:
+        result = roadmap_migration.migrate_chunk(db, lower, upper)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def dry_run(chunk_size):
+    """Tüm değişiklikleri tek işlemde uygular, raporlar ve geri alır"""
+    db = SessionLocal()
+    try:
+        print_template_changes(roadmap_migration.sync_templates(db), dry_run=True)
+        bounds = roadmap_migration.chunk_bounds(db, chunk_size)
+        started = time.monotonic()
+        totals = roadmap_migration.ChunkResult(lower=None, upper=None)
+        for position, (lower, upper) in enumerate(bounds, start=1):
+            result = roadmap_migration.migrate_chunk(db, lower, upper)
+            print_chunk(position, len(bounds), result, started)
+            for field in ("migrated_statuses", "deleted_legacy_steps", "added_statuses", "recounted_roadmaps"):
+                setattr(totals, field, getattr(totals, field) + getattr(result, field))
+        print(
+            f"Dry run: {totals.migrated_statuses} durum taşınacak, {totals.deleted_legacy_steps} eski adım silinecek, "
+            f"{totals.added_statuses} eksik durum eklenecek, {totals.recounted_roadmaps} roadmap yeniden sayılacak."
+        )
+    finally:
+        db.rollback()
+        db.close()
 
-# Roadmap şablonları
-ROADMAP_TEMPLATES = {
-    "Proje Yönetimi": [
-        {
-            "title": "Aşama 1 – Proje Yönetiminin Temelleri",
-            "description": "Öğrenilecekler: Proje nedir, proje yöneticisinin rolü, proje yaşam döngüsü, paydaşlarla iletişim",
-            "tasks_count": 25,
-            "duration": "3 hafta (yaklaşık 18 saat)"
-        },
-        {
-            "title": "Aşama 2 – Proje Başlatma",
-            "description": "Öğrenilecekler: Proje hedefi yazma, kapsam belgesi, proje belgeleri oluşturma",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 3 – Proje Planlama",
-            "description": "Öğrenilecekler: Zaman çizelgesi hazırlama, bütçe planı, risk yönetimi, iletişim planı",
-            "tasks_count": 25,
-            "duration": "4 hafta (20-25 saat)"
-        },
-        {
-            "title": "Aşama 4 – Projeyi Yürütme",
-            "description": "Öğrenilecekler: Takip etme, ilerleme raporları, kalite yönetimi",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 5 – Çevik (Agile) Proje Yönetimi",
-            "description": "Öğrenilecekler: Agile yaklaşımı, Scrum, sprint planlama",
-            "tasks_count": 25,
-            "duration": "4 hafta (20 saat)"
-        },
-        {
-            "title": "Aşama 6 – Bitirme Projesi (Capstone)",
-            "description": "Öğrenilecekler: Gerçek senaryoya dayalı proje planı hazırlama",
-            "tasks_count": 15,
-            "duration": "2 hafta (10-12 saat)"
-        }
-    ],
-    "Veri Analizi": [
-        {
-            "title": "Aşama 1 – Veri Bilimine Giriş",
-            "description": "Öğrenilecekler: Veri toplama, temizleme, temel analiz süreci",
-            "tasks_count": 25,
-            "duration": "3 hafta (18-20 saat)"
-        },
-        {
-            "title": "Aşama 2 – Python'a Başlangıç",
-            "description": "Öğrenilecekler: Python temelleri, veri yapıları, fonksiyonlar, pandas",
-            "tasks_count": 30,
-            "duration": "4 hafta (25 saat)"
-        },
-        {
-            "title": "Aşama 3 – Sayıların Ötesine Geçmek",
-            "description": "Öğrenilecekler: Veriyi hikâyeye dönüştürme, iş kararları için yorumlama",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 4 – İstatistiğin Gücü",
-            "description": "Öğrenilecekler: Temel istatistik, olasılık, hipotez testleri",
-            "tasks_count": 25,
-            "duration": "4 hafta (20-25 saat)"
-        },
-        {
-            "title": "Aşama 5 – Regresyon Analizi",
-            "description": "Öğrenilecekler: Doğrusal regresyon, çoklu regresyon, modellerin yorumlanması",
-            "tasks_count": 20,
-            "duration": "3 hafta (18-20 saat)"
-        },
-        {
-            "title": "Aşama 6 – Makine Öğrenmesine Giriş",
-            "description": "Öğrenilecekler: Temel algoritmalar, model kurma ve doğrulama",
-            "tasks_count": 25,
-            "duration": "4 hafta (22-25 saat)"
-        },
-        {
-            "title": "Aşama 7 – Bitirme Projesi",
-            "description": "Öğrenilecekler: Gerçek veri ile sıfırdan analiz projesi",
-            "tasks_count": 15,
-            "duration": "2 hafta (10-12 saat)"
-        }
-    ],
-    "UX Tasarımı": [
-        {
-            "title": "Aşama 1 – UX Tasarımına Giriş",
-            "description": "Öğrenilecekler: UX nedir, kullanıcı odaklı tasarım",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 2 – UX Tasarım Sürecine Başlamak",
-            "description": "Öğrenilecekler: Empati haritaları, kullanıcı hikâyeleri, problem tanımı",
-            "tasks_count": 25,
-            "duration": "3 hafta (18-20 saat)"
-        },
-        {
-            "title": "Aşama 3 – Wireframe ve Düşük Detaylı Prototip",
-            "description": "Öğrenilecekler: Basit çizimler, temel prototipler",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 4 – Araştırma ve Test",
-            "description": "Öğrenilecekler: Kullanıcı araştırması, test yapmak, geri bildirim",
-            "tasks_count": 25,
-            "duration": "4 hafta (20-22 saat)"
-        },
-        {
-            "title": "Aşama 5 – Figma ile Yüksek Detaylı Tasarım",
-            "description": "Öğrenilecekler: Renk, tipografi, responsive tasarım",
-            "tasks_count": 25,
-            "duration": "4 hafta (20-25 saat)"
-        },
-        {
-            "title": "Aşama 6 – Dinamik Arayüz Oluşturma",
-            "description": "Öğrenilecekler: Basit HTML/CSS/JS, etkileşimli prototipler",
-            "tasks_count": 20,
-            "duration": "3 hafta (18-20 saat)"
-        },
-        {
-            "title": "Aşama 7 – Bitirme Projesi",
-            "description": "Öğrenilecekler: Sosyal fayda odaklı bir ürün tasarlama",
-            "tasks_count": 15,
-            "duration": "2 hafta (10-12 saat)"
-        }
-    ],
-    "Backend Geliştirme": [
-        {
-            "title": "Aşama 1 – Backend Geliştirmenin Temelleri",
-            "description": "Öğrenilecekler: Programlama temelleri, veri yapıları, algoritmalar, HTTP protokolü",
-            "tasks_count": 25,
-            "duration": "3 hafta (18-20 saat)"
-        },
-        {
-            "title": "Aşama 2 – Veritabanı Yönetimi",
-            "description": "Öğrenilecekler: SQL, NoSQL, veritabanı tasarımı, ORM kullanımı",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 3 – API Geliştirme",
-            "description": "Öğrenilecekler: RESTful API tasarımı, FastAPI/Django/Flask, endpoint yapılandırması",
-            "tasks_count": 25,
-            "duration": "4 hafta (20-25 saat)"
-        },
-        {
-            "title": "Aşama 4 – Güvenlik ve Performans",
-            "description": "Öğrenilecekler: Kimlik doğrulama, yetkilendirme, güvenlik açıkları, performans optimizasyonu",
-            "tasks_count": 20,
-            "duration": "3 hafta (15-18 saat)"
-        },
-        {
-            "title": "Aşama 5 – Deployment ve DevOps",
-            "description": "Öğrenilecekler: Docker, CI/CD, bulut hizmetleri, ölçeklendirme",
-            "tasks_count": 25,
-            "duration": "4 hafta (20-25 saat)"
-        },
-        {
-            "title": "Aşama 6 – Mikroservisler ve İleri Konular",
-            "description": "Öğrenilecekler: Mikroservis mimarisi, mesaj kuyrukları, GraphQL, WebSockets",
-            "tasks_count": 20,
-            "duration": "3 hafta (18-20 saat)"
-        },
-        {
-            "title": "Aşama 7 – Gerçek Dünya Projeleri",
-            "description": "Öğrenilecekler: Büyük ölçekli projeler, takım çalışması, kod kalitesi, test yazımı",
-            "tasks_count": 15,
-            "duration": "2 hafta (10-12 saat)"
-        }
-    ]
-}
 
 def main():
+    parser = argparse.ArgumentParser(description="Roadmap'leri güncel şablon aşamalarına toplu olarak taşır")
+    parser.add_argument("--dry-run", action="store_true", help="Değişiklikleri uygulamadan raporla")
+    parser.add_argument("--chunk-size", type=int, default=roadmap_migration.DEFAULT_CHUNK_SIZE,
+                        help="Bir işlemde taşınacak roadmap sayısı")
+    parser.add_argument("--checkpoint", help="Tamamlanan chunk'ların kaydedileceği JSON dosyası")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Paralel chunk işçisi sayısı (yalnızca PostgreSQL)")
+    args = parser.parse_args()
+
+    # create_all mevcut tablolara sütun eklemez; uygulamanın başlangıçta yaptığı
+    # şema güncellemeleri (ör. completed_steps sütunları) --dry-run'da da gerekir
+    prepare_database(engine)
+    print(f"Roadmap migration başlatılıyor (şablon sürümü {roadmap_template_registry.version})...")
+
+    if args.dry_run:
+        try:
+            dry_run(args.chunk_size)
+        except Exception as e:
+            print(f"Hata oluştu: {e}")
+        return
+
+    workers = args.workers
+    if workers > 1 and engine.dialect.name != "postgresql":
+        print("Paralel işçiler yalnızca PostgreSQL'de desteklenir, tek işçiyle devam ediliyor.")
+        workers = 1
+
     db = SessionLocal()
     try:
-        print("Roadmap steps tablosunu güncelleme işlemi başlatılıyor...")
-        
-        # 1. Kariyer alanlarını kontrol et ve gerekirse oluştur
-        career_paths = {}
-        for career_title in ROADMAP_TEMPLATES.keys():
-            career_path = db.query(CareerPath).filter(CareerPath.title == career_title).first()
-            
-            if not career_path:
-                print(f"'{career_title}' kariyer alanı oluşturuluyor...")
-                skills = []
-                if career_title == "Backend Geliştirme":
-                    skills = ["Python", "API Geliştirme", "Veritabanı", "Güvenlik"]
-                elif career_title == "UX Tasarımı":
-                    skills = ["UI/UX", "Figma", "Kullanıcı Araştırması", "Prototipleme"]
-                elif career_title == "Veri Analizi":
-                    skills = ["Python", "İstatistik", "Veri Görselleştirme", "Makine Öğrenmesi"]
-                elif career_title == "Proje Yönetimi":
-                    skills = ["Agile", "Scrum", "Takım Yönetimi", "Risk Yönetimi"]
-                
-                career_path = CareerPath(
-                    id=str(uuid4()),
-                    title=career_title,
-                    description=f"{career_title} kariyeri için yol haritası",
-                    skills_required=json.dumps(skills),
-                    avg_salary=90000.0
-                )
-                db.add(career_path)
-                db.commit()
-                db.refresh(career_path)
-                print(f"'{career_title}' kariyer alanı oluşturuldu. ID: {career_path.id}")
-            else:
-                print(f"'{career_title}' kariyer alanı zaten mevcut. ID: {career_path.id}")
-            
-            career_paths[career_title] = career_path
-        
-        # 2. Backend için olan mükerrer roadmap kayıtlarını temizle
-        # Önce tüm kullanıcıların roadmap'lerini al
-        user_roadmaps = db.query(UserRoadmap).all()
-        
-        for roadmap in user_roadmaps:
-            # Kariyer alanını kontrol et
-            career_path = db.query(CareerPath).filter(CareerPath.id == roadmap.career_path_id).first()
-            if career_path and career_path.title == "Backend Geliştirme":
-                # Bu roadmap'in adımlarını al
-                steps = db.query(RoadmapStep).filter(RoadmapStep.roadmap_id == roadmap.id).all()
-                
-                # Adım sayısını kontrol et, eğer 7'den fazla adım varsa mükerrer olabilir
-                if len(steps) > 7:
-                    print(f"Backend roadmap ID: {roadmap.id} için mükerrer adımlar temizleniyor...")
-                    
-                    # Adımları sıraya göre grupla ve her sıra için en son oluşturulanı tut
-                    steps_by_order = {}
-                    for step in steps:
-                        if step.order not in steps_by_order or step.created_at > steps_by_order[step.order].created_at:
-                            steps_by_order[step.order] = step
-                    
-                    # Gruplandırılmış adımlar dışındakileri sil
-                    for step in steps:
-                        if step != steps_by_order.get(step.order):
-                            db.delete(step)
-                    
-                    db.commit()
-                    print(f"Backend roadmap ID: {roadmap.id} için mükerrer adımlar temizlendi.")
-        
-        # 3. Her kariyer alanı için örnek roadmap oluştur (eğer yoksa)
-        for career_title, career_path in career_paths.items():
-            # Örnek kullanıcı roadmap'i oluştur (eğer yoksa)
-            example_roadmap = db.query(UserRoadmap).filter(
-                UserRoadmap.career_path_id == career_path.id,
-                UserRoadmap.user_id == "example"
-            ).first()
-            
-            if not example_roadmap:
-                print(f"'{career_title}' için örnek roadmap oluşturuluyor...")
-                example_roadmap = UserRoadmap(
-                    id=str(uuid4()),
-                    user_id="example",  # Örnek kullanıcı ID'si
-                    career_path_id=career_path.id,
-                    progress_percentage=0.0,
-                    created_date=datetime.utcnow(),
-                    last_updated=datetime.utcnow()
-                )
-                db.add(example_roadmap)
-                db.commit()
-                db.refresh(example_roadmap)
-                print(f"'{career_title}' için örnek roadmap oluşturuldu. ID: {example_roadmap.id}")
-            else:
-                print(f"'{career_title}' için örnek roadmap zaten mevcut. ID: {example_roadmap.id}")
-                
-                # Mevcut adımları temizle
-                existing_steps = db.query(RoadmapStep).filter(RoadmapStep.roadmap_id == example_roadmap.id).all()
-                for step in existing_steps:
-                    db.delete(step)
-                db.commit()
-                print(f"'{career_title}' için mevcut adımlar temizlendi.")
-            
-            # Şablondan adımları ekle
-            template = ROADMAP_TEMPLATES[career_title]
-            for i, stage in enumerate(template):
-                step = RoadmapStep(
-                    id=str(uuid4()),
-                    roadmap_id=example_roadmap.id,
-                    title=stage["title"],
-                    description=stage["description"],
-                    order=i + 1,  # 1'den başla
-                    status=StepStatus.NOT_STARTED
-                )
-                db.add(step)
-            
+        checkpoint = load_checkpoint(args.checkpoint, args.chunk_size)
+        if checkpoint is None:
+            print_template_changes(roadmap_migration.sync_templates(db), dry_run=False)
             db.commit()
-            print(f"'{career_title}' için {len(template)} aşama eklendi.")
-        
-        print("Roadmap steps tablosu başarıyla güncellendi!")
-    
+            checkpoint = {
+                "template_version": roadmap_template_registry.version,
+                "chunk_size": args.chunk_size,
+                "bounds": roadmap_migration.chunk_bounds(db, args.chunk_size),
+                "completed": []
+            }
+            save_checkpoint(args.checkpoint, checkpoint)
+        else:
+            print(f"Checkpoint'ten devam ediliyor: {len(checkpoint['completed'])}/{len(checkpoint['bounds'])} chunk tamamlanmış.")
     except Exception as e:
         print(f"Hata oluştu: {e}")
         db.rollback()
+        return
     finally:
         db.close()
 
+    bounds = checkpoint["bounds"]
+    completed = set(checkpoint["completed"])
+    pending = [index for index in range(len(bounds)) if index not in completed]
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    def finish(index, result):
+        with lock:
+            checkpoint["completed"].append(index)
+            save_checkpoint(args.checkpoint, checkpoint)
+            print_chunk(len(checkpoint["completed"]), len(bounds), result, started)
+
+    try:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(migrate_chunk, *bounds[index]): index for index in pending}
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+        else:
+            for index in pending:
+                finish(index, migrate_chunk(*bounds[index]))
+        print("Roadmap migration başarıyla tamamlandı!")
+    except Exception as e:
+        print(f"Hata oluştu: {e}")
+        if args.checkpoint:
+            print(f"Tamamlanan chunk'lar {args.checkpoint} dosyasında; script aynı argümanlarla yeniden çalıştırılabilir.")
+
+
 if __name__ == "__main__":
     main()